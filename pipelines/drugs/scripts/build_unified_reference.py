@@ -3,14 +3,19 @@
 """
 Build unified drug reference tables - LEAN version.
 
-Tables produced (no explosions except valid form×route×dose combos):
-    unified_generics.csv     - drugbank_id → generic_name (lean, one per drug)
-    unified_synonyms.csv     - drugbank_id → synonyms (pipe-separated)
-    unified_atc.csv          - drugbank_id → atc_code (one row per valid combo)
-    unified_dosages.csv      - drugbank_id × form × route × dose (valid combos only)
-    unified_brands.csv       - brand_name → generic_name, drugbank_id
-    unified_salts.csv        - drugbank_id → salt forms
-    unified_mixtures.csv     - mixture components with component_key
+Tables produced (no explosions except valid form×route×dose combos), each as
+typed zstd Parquet plus an optional CSV export:
+    unified_generics         - drugbank_id → generic_name (lean, one per drug)
+    unified_synonyms         - drugbank_id → synonyms (pipe-separated)
+    unified_atc              - drugbank_id → atc_code (one row per valid combo)
+    unified_dosages          - drugbank_id × form × route × dose (valid combos only)
+    unified_brands           - brand_name → generic_name, drugbank_id
+    unified_salts            - drugbank_id → salt forms
+    unified_mixtures         - mixture components with component_key
+
+All tables are also written to a typed, indexed unified_reference.duckdb that
+UnifiedTagger attaches read-only, plus unified_tagger_snapshot.pkl holding the
+tagger's prebuilt synonym/brand/multiword lookup structures.
 
 Usage:
     python -m pipelines.drugs.scripts.build_unified_reference_v2
@@ -25,6 +30,7 @@ from typing import Optional
 import duckdb
 import pandas as pd
 
+from .reference_store import write_lookup_snapshot, write_parquet_table, write_reference_db
 from .unified_constants import CANONICAL_GENERICS, CANONICAL_ATC_MAPPINGS
 from .tokenizer import extract_drug_details
 
@@ -55,21 +61,40 @@ INPUTS_DIR = PROJECT_DIR / "inputs" / "drugs"
 OUTPUTS_DIR = PROJECT_DIR / "outputs" / "drugs"
 
 
-def _save_table(df: pd.DataFrame, outputs_dir: Path, name: str, verbose: bool = True):
-    """Save dataframe as CSV (canonical format)."""
-    csv_path = outputs_dir / f"{name}.csv"
-    df.to_csv(csv_path, index=False)
+def _save_table(
+    df: pd.DataFrame,
+    outputs_dir: Path,
+    name: str,
+    verbose: bool = True,
+    export_csv: bool = True,
+):
+    """Save dataframe as typed Parquet (canonical format), optionally also as CSV."""
+    parquet_path = write_parquet_table(df, outputs_dir / f"{name}.parquet", name)
+    if export_csv:
+        df.to_csv(outputs_dir / f"{name}.csv", index=False)
     if verbose:
         print(f"  ✓ {name}: {len(df):,} rows")
-    return csv_path
+    return parquet_path
 
 
 def build_unified_reference(
     inputs_dir: Optional[Path] = None,
     outputs_dir: Optional[Path] = None,
     verbose: bool = True,
+    export_csv: bool = True,
 ) -> dict:
-    """Build lean unified_* reference tables."""
+    """
+    Build lean unified_* reference tables.
+    
+    Args:
+        inputs_dir: Directory with the lean DrugBank/WHO/FDA/PNF inputs
+        outputs_dir: Directory receiving the unified_* tables
+        verbose: Print progress
+        export_csv: Also write CSV copies next to the Parquet tables
+    
+    Returns:
+        Dict of table name -> written path
+    """
     inputs_dir = Path(inputs_dir or INPUTS_DIR)
     outputs_dir = Path(outputs_dir or OUTPUTS_DIR)
     outputs_dir.mkdir(parents=True, exist_ok=True)
@@ -507,17 +532,32 @@ def build_unified_reference(
     
     output_paths = {}
     # Core lookup tables
-    output_paths['unified_generics'] = _save_table(generics_df, outputs_dir, 'unified_generics', verbose)
-    output_paths['unified_synonyms'] = _save_table(synonyms_df, outputs_dir, 'unified_synonyms', verbose)
-    output_paths['unified_atc'] = _save_table(atc_map_df, outputs_dir, 'unified_atc', verbose)
+    output_paths['unified_generics'] = _save_table(generics_df, outputs_dir, 'unified_generics', verbose, export_csv)
+    output_paths['unified_synonyms'] = _save_table(synonyms_df, outputs_dir, 'unified_synonyms', verbose, export_csv)
+    output_paths['unified_atc'] = _save_table(atc_map_df, outputs_dir, 'unified_atc', verbose, export_csv)
     
     # Dosages table (VALID form × route × dose combos per drugbank_id)
-    output_paths['unified_dosages'] = _save_table(dosages_df, outputs_dir, 'unified_dosages', verbose)
+    output_paths['unified_dosages'] = _save_table(dosages_df, outputs_dir, 'unified_dosages', verbose, export_csv)
     
     # Other tables
-    output_paths['unified_brands'] = _save_table(brands_df, outputs_dir, 'unified_brands', verbose)
-    output_paths['unified_salts'] = _save_table(salts_df, outputs_dir, 'unified_salts', verbose)
-    output_paths['unified_mixtures'] = _save_table(mixtures_df, outputs_dir, 'unified_mixtures', verbose)
+    output_paths['unified_brands'] = _save_table(brands_df, outputs_dir, 'unified_brands', verbose, export_csv)
+    output_paths['unified_salts'] = _save_table(salts_df, outputs_dir, 'unified_salts', verbose, export_csv)
+    output_paths['unified_mixtures'] = _save_table(mixtures_df, outputs_dir, 'unified_mixtures', verbose, export_csv)
+    
+    # Typed, indexed DuckDB copy for fast tagger startup
+    output_paths['unified_reference'] = write_reference_db({
+        'unified_generics': generics_df,
+        'unified_synonyms': synonyms_df,
+        'unified_atc': atc_map_df,
+        'unified_dosages': dosages_df,
+        'unified_brands': brands_df,
+        'unified_salts': salts_df,
+        'unified_mixtures': mixtures_df,
+    }, outputs_dir, verbose)
+    # Prebuilt tagger lookup structures, fingerprinted against the database
+    output_paths['unified_tagger_snapshot'] = write_lookup_snapshot(
+        output_paths['unified_reference'], verbose
+    )
     
     if verbose:
         print("\n" + "=" * 60)
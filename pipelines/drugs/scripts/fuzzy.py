@@ -0,0 +1,149 @@
+"""
+Batched fuzzy matching of generic tokens against reference generic names.
+
+Equivalent to running rapidfuzz.process.extract(token, names, scorer=fuzz.ratio,
+limit=1, score_cutoff=threshold) per token, but prunes candidates with two
+lossless upper bounds on fuzz.ratio before scoring:
+
+    ratio = 200 * LCS / (len_a + len_b)
+    LCS  <= min(len_a, len_b)                       (length bound)
+    LCS  <= sum_c min(count_a(c), count_b(c))       (character-bag bound)
+
+Reference names are bucketed by length and pre-counted per character. Queries
+of equal length share buckets and are scored together in one multi-threaded
+rapidfuzz.process.cdist call.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from rapidfuzz import fuzz, process as rapidfuzz_process
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+    fuzz = None
+    rapidfuzz_process = None
+
+
+# Slack for float rounding when comparing bounds against the cutoff
+_BOUND_EPSILON = 1e-9
+
+
+class FuzzyMatcher:
+    """
+    Indexed, batched best-match search over a fixed list of names.
+
+    Usage:
+        matcher = FuzzyMatcher(cached_generics_list, threshold=85)
+        best = matcher.best_many(["PARACETMOL", "AMOXICILIN"])
+        # {"PARACETMOL": ("PARACETAMOL", 95.2...), ...}
+    """
+
+    def __init__(self, names: List[str], threshold: float = 85):
+        self.names: List[str] = list(names)
+        self.threshold = threshold
+        self.queries = 0
+        self.comparisons = 0
+        self.skipped_comparisons = 0
+
+        alphabet = sorted({c for name in self.names for c in name})
+        self._char_index: Dict[str, int] = {c: i for i, c in enumerate(alphabet)}
+        self._lengths = np.array([len(name) for name in self.names], dtype=np.int64)
+        counts = np.zeros((len(self.names), max(len(alphabet), 1)), dtype=np.int32)
+        for row, name in enumerate(self.names):
+            for c in name:
+                counts[row, self._char_index[c]] += 1
+        self._counts = counts
+
+        # Length buckets: length -> ascending indices into self.names
+        self._buckets: Dict[int, np.ndarray] = {}
+        for length in np.unique(self._lengths):
+            self._buckets[int(length)] = np.flatnonzero(self._lengths == length)
+
+    def _length_feasible(self, query_len: int) -> List[int]:
+        """Reference lengths whose length bound can reach the threshold."""
+        return [
+            length for length in self._buckets
+            if 200.0 * min(query_len, length) / (query_len + length) >= self.threshold - _BOUND_EPSILON
+        ]
+
+    def _query_counts(self, query: str) -> np.ndarray:
+        counts = np.zeros(self._counts.shape[1], dtype=np.int32)
+        for c in query:
+            idx = self._char_index.get(c)
+            if idx is not None:
+                counts[idx] += 1
+        return counts
+
+    def best_many(self, queries: List[str]) -> Dict[str, Tuple[str, float]]:
+        """
+        Best match per query at or above the threshold.
+
+        Ties resolve to the earliest name in the original list, as
+        process.extract(limit=1) does. Queries without a match are omitted.
+
+        Returns:
+            Dict of query -> (matched name, score)
+        """
+        results: Dict[str, Tuple[str, float]] = {}
+        if not RAPIDFUZZ_AVAILABLE or not self.names:
+            return results
+
+        unique_queries = list(dict.fromkeys(q for q in queries if q))
+        self.queries += len(unique_queries)
+
+        by_length: Dict[int, List[str]] = {}
+        for query in unique_queries:
+            by_length.setdefault(len(query), []).append(query)
+
+        for query_len, group in by_length.items():
+            lengths = self._length_feasible(query_len)
+            if not lengths:
+                self.skipped_comparisons += len(group) * len(self.names)
+                continue
+            pool = np.sort(np.concatenate([self._buckets[length] for length in lengths]))
+            pool_counts = self._counts[pool]
+            denom = (query_len + self._lengths[pool]).astype(np.float64)
+
+            # Character-bag bound per query; the union keeps original order
+            keep = np.zeros(len(pool), dtype=bool)
+            for query in group:
+                overlap = np.minimum(pool_counts, self._query_counts(query)).sum(axis=1)
+                keep |= 200.0 * overlap / denom >= self.threshold - _BOUND_EPSILON
+            candidates = pool[keep]
+
+            self.comparisons += len(group) * len(candidates)
+            self.skipped_comparisons += len(group) * (len(self.names) - len(candidates))
+            if len(candidates) == 0:
+                continue
+
+            choices = [self.names[i] for i in candidates]
+            scores = rapidfuzz_process.cdist(
+                group, choices,
+                scorer=fuzz.ratio,
+                score_cutoff=self.threshold,
+                dtype=np.float64,
+                workers=-1,
+            )
+            best = scores.argmax(axis=1)  # first maximum == earliest name
+            for row, query in enumerate(group):
+                score = float(scores[row, best[row]])
+                if score >= self.threshold and score > 0:
+                    results[query] = (choices[best[row]], score)
+        return results
+
+    def best(self, query: str) -> Optional[Tuple[str, float]]:
+        """Best match for a single query, or None."""
+        return self.best_many([query]).get(query)
+
+    def stats(self) -> Dict[str, int]:
+        """Queries scored and comparisons performed/skipped by pruning."""
+        return {
+            "queries": self.queries,
+            "comparisons": self.comparisons,
+            "skipped_comparisons": self.skipped_comparisons,
+        }
@@ -5,14 +5,20 @@ Reference data lookup functions for drug tagging.
 from __future__ import annotations
 
 import os
+import re
+from bisect import bisect_left
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple
 
 import duckdb
 import pandas as pd
 
+from .fuzzy import FuzzyMatcher
+from .reference_store import GENERIC_ATC_TABLE
 from .unified_constants import PURE_SALT_COMPOUNDS
-from .tokenizer import strip_salt_suffix
+from .tokenizer import HELPER_MEMO_SIZE, _strip_default_salt_suffix, strip_salt_suffix
 
 # Import rapidfuzz at module level for performance
 try:
@@ -31,6 +37,222 @@ INPUTS_DIR = PROJECT_DIR / "inputs" / "drugs"
 OUTPUTS_DIR = PROJECT_DIR / "outputs" / "drugs"
 
 
+# Columns of every generic lookup record (unified LEFT JOIN atc)
+GENERIC_RECORD_COLUMNS = ["generic_name", "drugbank_id", "atc_code", "source", "reference_text"]
+
+# All lookups read the materialized unified_generic_atc join (see reference_store),
+# filtering on its precomputed, indexed uppercase name_key
+_GENERIC_RECORD_SELECT = f"""
+    SELECT generic_name, drugbank_id, atc_code, source, generic_name as reference_text
+    FROM {GENERIC_ATC_TABLE}
+"""
+
+
+class GenericIndex:
+    """
+    In-memory index over the unified_generic_atc table.
+    
+    Built once per tagger; exact, synonym, prefix and fuzzy-confirmation
+    lookups become dict probes or bisects instead of SQL round trips. Records
+    keep the table's (name_key, seq) order so results match the SQL path.
+    """
+    
+    _QUERY = f"""
+        SELECT name_key, generic_name, drugbank_id, atc_code, source, generic_name as reference_text
+        FROM {GENERIC_ATC_TABLE}
+        ORDER BY name_key, seq
+    """
+    
+    def __init__(self, rows: List[Tuple[Any, ...]]):
+        """
+        Args:
+            rows: (name_key, *GENERIC_RECORD_COLUMNS) tuples in (name_key, seq) order
+        """
+        self.by_upper: Dict[str, List[Tuple[Any, ...]]] = {}
+        self.by_name: Dict[str, List[Tuple[Any, ...]]] = {}
+        for name_key, *record in rows:
+            record = tuple(record)
+            self.by_upper.setdefault(name_key, []).append(record)
+            self.by_name.setdefault(record[0], []).append(record)
+        # Sorted keys for prefix range scans (code-point order == DuckDB binary order)
+        self.sorted_keys: List[str] = sorted(self.by_upper)
+    
+    @classmethod
+    def from_connection(cls, con: duckdb.DuckDBPyConnection) -> "GenericIndex":
+        """Build the index from the unified_generic_atc table on a connection."""
+        try:
+            rows = con.execute(cls._QUERY).fetchall()
+        except Exception:
+            rows = []
+        return cls(rows)
+    
+    def __len__(self) -> int:
+        return len(self.by_upper)
+    
+    def exact(self, name_upper: str) -> List[Dict[str, Any]]:
+        """Records whose uppercase generic_name equals name_upper."""
+        return [dict(zip(GENERIC_RECORD_COLUMNS, row)) for row in self.by_upper.get(name_upper, ())]
+    
+    def named(self, names: List[str]) -> List[Dict[str, Any]]:
+        """Records whose generic_name is exactly one of names (case-sensitive)."""
+        return [
+            dict(zip(GENERIC_RECORD_COLUMNS, row))
+            for name in dict.fromkeys(names)
+            for row in self.by_name.get(name, ())
+        ]
+    
+    def prefix(self, token_upper: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Records whose name starts with "TOKEN " (the next word boundary),
+        shortest name first - same ordering and limit as lookup_generic_prefix.
+        """
+        prefix = token_upper + " "
+        keys = self.sorted_keys
+        rows = []
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            rows.extend(self.by_upper[keys[i]])
+            i += 1
+        # Stable sort keeps (name_key, seq) order among equal lengths
+        rows.sort(key=lambda row: len(row[0]))
+        return [dict(zip(GENERIC_RECORD_COLUMNS, row)) for row in rows[:limit]]
+    
+    def prefix_many(self, tokens: List[str], limit: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+        """Prefix-resolve many uppercase tokens in one pass; misses are omitted."""
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        for token in sorted(set(tokens)):
+            matches = self.prefix(token, limit)
+            if matches:
+                results[token] = matches
+        return results
+
+
+class MixtureIndex:
+    """
+    In-memory index over the mixtures table.
+    
+    Replaces per-row SQL in the tagger's mixture lookups with dict probes,
+    keyed by component_key and by uppercase mixture_name. The first row in
+    table order wins for duplicate keys.
+    """
+    
+    _QUERY = """
+        SELECT drugbank_id, mixture_name, component_generics, component_key
+        FROM mixtures
+    """
+    
+    def __init__(self, rows: List[Tuple[Any, ...]]):
+        """
+        Args:
+            rows: (drugbank_id, mixture_name, component_generics, component_key) tuples
+        """
+        self.by_component_key: Dict[str, Tuple[Any, ...]] = {}
+        self.by_name_upper: Dict[str, Tuple[Any, ...]] = {}
+        for drugbank_id, mixture_name, component_generics, component_key in rows:
+            record = (drugbank_id, mixture_name, component_generics)
+            if component_key is not None:
+                self.by_component_key.setdefault(component_key, record)
+            if mixture_name is not None:
+                self.by_name_upper.setdefault(mixture_name.upper(), record)
+    
+    @classmethod
+    def from_connection(cls, con: duckdb.DuckDBPyConnection) -> "MixtureIndex":
+        """Build the index from the mixtures table on a connection."""
+        try:
+            rows = con.execute(cls._QUERY).fetchall()
+        except Exception:
+            rows = []
+        return cls(rows)
+    
+    def __len__(self) -> int:
+        return len(self.by_component_key)
+    
+    def by_components(self, component_key: str) -> Optional[Tuple[Any, ...]]:
+        """(drugbank_id, mixture_name, component_generics) for a component_key, or None."""
+        return self.by_component_key.get(component_key)
+    
+    def by_name(self, name_upper: str) -> Optional[Tuple[Any, ...]]:
+        """(drugbank_id, mixture_name, component_generics) for an uppercase mixture_name, or None."""
+        return self.by_name_upper.get(name_upper)
+
+
+class GenericLookupCache:
+    """
+    Bounded LRU cache of uppercase token -> generic lookup matches.
+    
+    Lives on the tagger so tokens resolved in one chunk (or call) are not
+    re-resolved in the next. Misses are stored as empty lists (negative
+    entries), so hopeless tokens skip the prefix and fuzzy tiers too.
+    
+    Usage:
+        cache = GenericLookupCache(max_size=100_000)
+        found, missing = cache.get_many(tokens)
+        cache.put_many(batch_lookup_generics(missing, ...), missing)
+    """
+    
+    def __init__(self, max_size: int = 100_000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, token: str) -> bool:
+        return token in self._entries
+    
+    def get_many(self, tokens: Set[str]) -> Tuple[Dict[str, List[Dict[str, Any]]], Set[str]]:
+        """
+        Split tokens into cached matches and tokens still to resolve.
+    
+        Returns:
+            ({token_upper: matches} for cached tokens, set of uncached tokens_upper)
+        """
+        found: Dict[str, List[Dict[str, Any]]] = {}
+        missing: Set[str] = set()
+        for token in {t.upper() for t in tokens if t}:
+            matches = self._entries.get(token)
+            if matches is None:
+                missing.add(token)
+                self.misses += 1
+                continue
+            self._entries.move_to_end(token)
+            found[token] = matches
+            self.hits += 1
+            if not matches:
+                self.negative_hits += 1
+        return found, missing
+    
+    def put_many(self, results: Dict[str, List[Dict[str, Any]]], tokens: Set[str]) -> None:
+        """Store results for tokens; tokens absent from results are cached as misses."""
+        if self.max_size <= 0:
+            return
+        for token in tokens:
+            self._entries[token] = results.get(token, [])
+            self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def clear(self) -> None:
+        """Drop all entries (e.g. when the synonym map changes); counters are kept."""
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size."""
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "negative_entries": sum(1 for matches in self._entries.values() if not matches),
+        }
+
+
 def swap_brand_to_generic(
     token: str,
     brand_map: Dict[str, str],
@@ -49,6 +271,7 @@ def swap_brand_to_generic(
     return token_upper, False
 
 
+@lru_cache(maxsize=HELPER_MEMO_SIZE)
 def _singularize(word: str) -> str:
     """Convert a plural word to singular form."""
     word_upper = word.upper()
@@ -94,17 +317,52 @@ def apply_synonym(
     return generic_upper
 
 
+def resolve_generic(
+    generic: str,
+    synonyms: Dict[str, str],
+    multiword_generics: Set[str],
+) -> Tuple[str, str]:
+    """
+    (base, canonical) for a brand-swapped generic token: pure salt compounds
+    are kept whole, anything else is salt-stripped (except known multiword
+    generics such as ISOSORBIDE DINITRATE) and mapped through the synonym map.
+    """
+    generic_upper = generic.upper()
+    if generic_upper in PURE_SALT_COMPOUNDS:
+        return generic_upper, generic_upper
+    if generic_upper in multiword_generics:
+        base = generic_upper
+    else:
+        base, _ = strip_salt_suffix(generic)
+    return base, apply_synonym(base, synonyms)
+
+
+def build_generic_resolution(
+    generic_names: List[str],
+    synonyms: Dict[str, str],
+    brand_map: Dict[str, str],
+    multiword_generics: Set[str],
+) -> Dict[str, Tuple[str, str]]:
+    """
+    resolve_generic for every surface form the reference data knows: generic
+    names, synonym forms and targets, brand_map targets and multiword generics.
+    """
+    surfaces = {str(name).upper() for name in generic_names}
+    surfaces.update(synonyms, synonyms.values(), brand_map.values(), multiword_generics)
+    return {
+        surface: resolve_generic(surface, synonyms, multiword_generics)
+        for surface in surfaces
+    }
+
+
 def lookup_generic_exact(
     token: str,
     con: duckdb.DuckDBPyConnection,
 ) -> List[Dict[str, Any]]:
-    """Exact match lookup for a generic token using unified + atc tables."""
-    query = """
-        SELECT DISTINCT u.generic_name, u.drugbank_id, a.atc_code, u.source,
-               u.generic_name as reference_text
-        FROM unified u
-        LEFT JOIN atc a ON u.generic_name = a.generic_name
-        WHERE UPPER(u.generic_name) = ?
+    """Exact match lookup for a generic token using unified_generic_atc."""
+    query = _GENERIC_RECORD_SELECT + """
+        WHERE name_key = ?
+        ORDER BY seq
     """
     try:
         rows = con.execute(query, [token.upper()]).fetchall()
@@ -119,14 +377,10 @@ def lookup_generic_prefix(
     con: duckdb.DuckDBPyConnection,
     limit: int = 5,
 ) -> List[Dict[str, Any]]:
-    """Prefix match lookup for a generic token using unified + atc tables."""
-    query = """
-        SELECT DISTINCT u.generic_name, u.drugbank_id, a.atc_code, u.source,
-               u.generic_name as reference_text
-        FROM unified u
-        LEFT JOIN atc a ON u.generic_name = a.generic_name
-        WHERE UPPER(u.generic_name) LIKE ?
-        ORDER BY LENGTH(u.generic_name) ASC
+    """Prefix match lookup for a generic token using unified_generic_atc."""
+    query = _GENERIC_RECORD_SELECT + """
+        WHERE name_key LIKE ?
+        ORDER BY LENGTH(generic_name) ASC, name_key, seq
         LIMIT ?
     """
     try:
@@ -142,15 +396,10 @@ def lookup_generic_contains(
     con: duckdb.DuckDBPyConnection,
     limit: int = 3,
 ) -> List[Dict[str, Any]]:
-    """Contains match lookup for a generic token using unified + atc tables."""
-    # Join unified_generics with unified_atc to get ATC codes
-    query = """
-        SELECT DISTINCT u.generic_name, u.drugbank_id, a.atc_code, u.source,
-               u.generic_name as reference_text
-        FROM unified u
-        LEFT JOIN atc a ON u.generic_name = a.generic_name
-        WHERE UPPER(u.generic_name) LIKE ?
-        ORDER BY LENGTH(u.generic_name) ASC
+    """Contains match lookup for a generic token using unified_generic_atc."""
+    query = _GENERIC_RECORD_SELECT + """
+        WHERE name_key LIKE ?
+        ORDER BY LENGTH(generic_name) ASC, name_key, seq
         LIMIT ?
     """
     try:
@@ -167,9 +416,13 @@ def lookup_generic_fuzzy(
     threshold: int = 85,
     limit: int = 3,
     cached_generics: Optional[List[str]] = None,
+    generic_index: Optional[GenericIndex] = None,
 ) -> List[Dict[str, Any]]:
     """
     Fuzzy match lookup for a generic token using rapidfuzz.
+    
+    Matched names are confirmed against generic_index when given,
+    otherwise with a SQL query.
     """
     if not RAPIDFUZZ_AVAILABLE:
         return []
@@ -194,24 +447,34 @@ def lookup_generic_fuzzy(
     if not matches:
         return []
     
-    # Batch lookup matched generics
-    match_names = [m[0] for m in matches]
-    match_scores = {m[0]: m[1] for m in matches}
+    return _confirm_fuzzy_matches({m[0]: m[1] for m in matches}, con, generic_index)
+
+
+def _confirm_fuzzy_matches(
+    match_scores: Dict[str, float],
+    con: duckdb.DuckDBPyConnection,
+    generic_index: Optional[GenericIndex] = None,
+) -> List[Dict[str, Any]]:
+    """Fetch reference records for fuzzy-matched names and tag them with their score."""
+    match_names = list(match_scores)
+    
+    if generic_index is not None:
+        results = generic_index.named(match_names)
+        for rec in results:
+            rec["fuzzy_score"] = match_scores.get(rec.get("generic_name"), 0)
+            rec["fuzzy_match"] = True
+        return results
     
     placeholders = ",".join(["?" for _ in match_names])
-    query = f"""
-        SELECT DISTINCT u.generic_name, u.drugbank_id, a.atc_code, u.source,
-               u.generic_name as reference_text
-        FROM unified u
-        LEFT JOIN atc a ON u.generic_name = a.generic_name
-        WHERE u.generic_name IN ({placeholders})
+    query = _GENERIC_RECORD_SELECT + f"""
+        WHERE generic_name IN ({placeholders})
+        ORDER BY name_key, seq
     """
     try:
         rows = con.execute(query, match_names).fetchall()
-        cols = ["generic_name", "drugbank_id", "atc_code", "source", "reference_text"]
         results = []
         for row in rows:
-            rec = dict(zip(cols, row))
+            rec = dict(zip(GENERIC_RECORD_COLUMNS, row))
             rec["fuzzy_score"] = match_scores.get(rec.get("generic_name"), 0)
             rec["fuzzy_match"] = True
             results.append(rec)
@@ -226,9 +489,15 @@ def batch_lookup_generics(
     synonyms: Optional[Dict[str, str]] = None,
     enable_fuzzy: bool = True,
     cached_generics: Optional[List[str]] = None,
+    generic_index: Optional[GenericIndex] = None,
+    fuzzy_matcher: Optional[FuzzyMatcher] = None,
 ) -> Dict[str, List[Dict[str, Any]]]:
     """
-    Batch lookup for multiple generic tokens using optimized SQL.
+    Batch lookup for multiple generic tokens.
+    
+    Exact and synonym matches are dict probes into generic_index when given,
+    otherwise a single batched SQL query. With a fuzzy_matcher (built over
+    cached_generics), all fuzzy fallbacks are scored in one batched call.
     
     Returns dict of {token: [matches]}.
     """
@@ -251,16 +520,18 @@ def batch_lookup_generics(
         if syn and syn != t:
             all_lookups.add(syn)
     
+    if generic_index is not None:
+        for lookup in all_lookups:
+            records = generic_index.exact(lookup)
+            if records:
+                cache[lookup] = records
+    
     # BATCH EXACT MATCH - single SQL query for all tokens
-    # Join unified with atc table to get ATC codes
-    if all_lookups:
+    elif all_lookups:
         placeholders = ",".join(["?" for _ in all_lookups])
-        query = f"""
-            SELECT DISTINCT u.generic_name, u.drugbank_id, a.atc_code, u.source,
-                   u.generic_name as reference_text
-            FROM unified u
-            LEFT JOIN atc a ON u.generic_name = a.generic_name
-            WHERE UPPER(u.generic_name) IN ({placeholders})
+        query = _GENERIC_RECORD_SELECT + f"""
+            WHERE name_key IN ({placeholders})
+            ORDER BY name_key, seq
         """
         try:
             rows = con.execute(query, list(all_lookups)).fetchall()
@@ -287,22 +558,43 @@ def batch_lookup_generics(
     # For tokens still missing, try prefix/fuzzy (slower path)
     missing = [t for t in token_list if t not in cache]
     
+    # Resolve prefixes for all missing tokens in one pass over the index.
+    # Tokens containing LIKE wildcards keep the SQL path for identical semantics.
+    prefix_matches: Dict[str, List[Dict[str, Any]]] = {}
+    if generic_index is not None:
+        prefix_matches = generic_index.prefix_many(
+            [t for t in missing if "%" not in t and "_" not in t], limit=3
+        )
+    
+    fuzzy_tokens = []
     for token in missing:
         # Try prefix match
-        matches = lookup_generic_prefix(token, con, limit=3)
+        if generic_index is not None and "%" not in token and "_" not in token:
+            matches = prefix_matches.get(token, [])
+        else:
+            matches = lookup_generic_prefix(token, con, limit=3)
         if matches:
             cache[token] = matches
             continue
         
         # Try fuzzy match (last resort)
         if enable_fuzzy and len(token) >= 4:
-            matches = lookup_generic_fuzzy(
-                token, con, threshold=85, limit=1, cached_generics=cached_generics
-            )
-            cache[token] = matches
+            fuzzy_tokens.append(token)
         else:
             cache[token] = []
     
+    if fuzzy_matcher is not None:
+        best = fuzzy_matcher.best_many(fuzzy_tokens)
+        for token in fuzzy_tokens:
+            hit = best.get(token)
+            cache[token] = _confirm_fuzzy_matches({hit[0]: hit[1]}, con, generic_index) if hit else []
+    else:
+        for token in fuzzy_tokens:
+            cache[token] = lookup_generic_fuzzy(
+                token, con, threshold=85, limit=1, cached_generics=cached_generics,
+                generic_index=generic_index,
+            )
+    
     return cache
 
 
@@ -313,7 +605,18 @@ def build_combination_keys(
     Build combination lookup keys from generic tokens.
     
     E.g., ["ALUMINUM HYDROXIDE", "MAGNESIUM HYDROXIDE"] -> ["ALUMINUM + MAGNESIUM"]
+    
+    Keys are memoized per token tuple (the same few token lists recur
+    across rows); each call returns a fresh list.
     """
+    return list(_combination_keys(tuple(generic_tokens)))
+
+
+_COMBINATION_SPLIT = re.compile(r'\s*\+\s*')
+
+
+@lru_cache(maxsize=HELPER_MEMO_SIZE)
+def _combination_keys(generic_tokens: Tuple[str, ...]) -> Tuple[str, ...]:
     # Filter junk
     junk = {"+", "MG/5", "MG", "G", "MCG", "ML", "L", "PCT"}
     clean = []
@@ -338,8 +641,7 @@ def build_combination_keys(
         # e.g., "SALBUTAMOL SULFATE + IPRATROPIUM BROMIDE" or "IBUPROFEN+PARACETAMOL"
         if "+" in g_clean:
             # Split on + with optional surrounding spaces
-            import re
-            parts = re.split(r'\s*\+\s*', g_clean)
+            parts = _COMBINATION_SPLIT.split(g_clean)
             for part in parts:
                 part = part.strip()
                 if part and part not in junk:
@@ -348,7 +650,7 @@ def build_combination_keys(
             clean.append(g_clean)
     
     if len(clean) < 2:
-        return []
+        return ()
     
     # Strip salt suffixes (including HYDROXIDE, CHLORIDE, etc.)
     salt_suffixes = {"HYDROXIDE", "CHLORIDE", "SULFATE", "SULPHATE", "CARBONATE", "PHOSPHATE", "ACETATE", "CITRATE"}
@@ -366,7 +668,7 @@ def build_combination_keys(
             base_parts.append(stripped)
     
     if len(base_parts) < 2:
-        return []
+        return ()
     
     # Deduplicate while preserving order
     seen = set()
@@ -377,7 +679,7 @@ def build_combination_keys(
             unique_parts.append(p)
     
     if len(unique_parts) < 2:
-        return []
+        return ()
     
     # Build keys in multiple formats
     keys = set()
@@ -399,4 +701,20 @@ def build_combination_keys(
     keys.add(" ".join(unique_parts))
     keys.add(" ".join(unique_parts[::-1]))  # Reverse order too
     
-    return list(keys)
+    return tuple(keys)
+
+
+def memo_stats(memo) -> Dict[str, int]:
+    """Hit/miss counters and size of an lru_cache-wrapped helper."""
+    info = memo.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+
+
+def helper_memo_stats() -> Dict[str, Dict[str, int]]:
+    """memo_stats of the memoized module-level string helpers (this process)."""
+    memos = {
+        "singularize": _singularize,
+        "strip_salt_suffix": _strip_default_salt_suffix,
+        "build_combination_keys": _combination_keys,
+    }
+    return {name: memo_stats(memo) for name, memo in memos.items()}
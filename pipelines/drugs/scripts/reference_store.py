@@ -0,0 +1,597 @@
+"""
+Persistent DuckDB store for the unified_* reference tables.
+
+build_unified_reference writes each table as typed Parquet (zstd), optionally
+exports CSV, and writes a typed, indexed unified_reference.duckdb; UnifiedTagger
+attaches it read-only instead of re-ingesting the CSVs on every load. Read-only
+attachment lets several processes share the file.
+
+The tagger's derived lookup structures (synonym map, brand map, generic list,
+multiword set) are precomputed into a versioned, fingerprinted snapshot so a
+cold start only unpickles them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import duckdb
+import pandas as pd
+
+from .unified_constants import MULTIWORD_GENERICS, REGIONAL_TO_US, SPELLING_SYNONYMS
+
+
+REFERENCE_DB_NAME = "unified_reference.duckdb"
+SNAPSHOT_NAME = "unified_tagger_snapshot.pkl"
+# Bump when the snapshot payload or its derivation changes
+SNAPSHOT_VERSION = 2
+
+# DuckDB table name -> (CSV/table basename, ordered column schema)
+# Table names match the ones UnifiedTagger queries (unified, brands, ...).
+UNIFIED_SCHEMAS: Dict[str, Tuple[str, List[Tuple[str, str]]]] = {
+    "unified": ("unified_generics", [
+        ("drugbank_id", "VARCHAR"),
+        ("generic_name", "VARCHAR"),
+        ("name_key", "VARCHAR"),
+        ("source", "VARCHAR"),
+        ("salt_details", "VARCHAR"),
+        ("brand_details", "VARCHAR"),
+        ("indication_details", "VARCHAR"),
+        ("alias_details", "VARCHAR"),
+        ("type_details", "VARCHAR"),
+        ("release_details", "VARCHAR"),
+        ("form_details", "VARCHAR"),
+        ("diluent_details", "VARCHAR"),
+    ]),
+    "synonyms": ("unified_synonyms", [
+        ("drugbank_id", "VARCHAR"),
+        ("generic_name", "VARCHAR"),
+        ("synonyms", "VARCHAR"),
+    ]),
+    "atc": ("unified_atc", [
+        ("drugbank_id", "VARCHAR"),
+        ("generic_name", "VARCHAR"),
+        ("atc_code", "VARCHAR"),
+    ]),
+    "dosages": ("unified_dosages", [
+        ("drugbank_id", "VARCHAR"),
+        ("generic_name", "VARCHAR"),
+        ("form", "VARCHAR"),
+        ("route", "VARCHAR"),
+        ("dose", "VARCHAR"),
+        ("source", "VARCHAR"),
+    ]),
+    "brands": ("unified_brands", [
+        ("brand_name", "VARCHAR"),
+        ("generic_name", "VARCHAR"),
+        ("drugbank_id", "VARCHAR"),
+        ("source", "VARCHAR"),
+    ]),
+    "salts": ("unified_salts", [
+        ("drugbank_id", "VARCHAR"),
+        ("salt_form", "VARCHAR"),
+        ("salt_key", "VARCHAR"),
+    ]),
+    "mixtures": ("unified_mixtures", [
+        ("drugbank_id", "VARCHAR"),
+        ("mixture_name", "VARCHAR"),
+        ("component_generics", "VARCHAR"),
+        ("component_keys", "VARCHAR"),
+        ("component_key", "VARCHAR"),
+        ("component_count", "BIGINT"),
+    ]),
+}
+
+SCHEMAS_BY_BASENAME: Dict[str, List[Tuple[str, str]]] = {
+    basename: schema for basename, schema in UNIFIED_SCHEMAS.values()
+}
+
+# Denormalized unified ⟕ atc join with a precomputed uppercase name_key.
+# Rows are sorted by name_key; seq numbers the rows in an explicit column order
+# so "first record per generic" is the same in every build and backend.
+GENERIC_ATC_TABLE = "unified_generic_atc"
+GENERIC_ATC_SELECT_SQL = """
+    SELECT UPPER(generic_name) AS name_key, generic_name, drugbank_id, atc_code, source,
+           row_number() OVER (
+               ORDER BY generic_name, drugbank_id NULLS LAST, atc_code NULLS LAST, source NULLS LAST
+           ) AS seq
+    FROM (
+        SELECT DISTINCT u.generic_name, u.drugbank_id, a.atc_code, u.source
+        FROM unified u
+        LEFT JOIN atc a ON u.generic_name = a.generic_name
+        WHERE u.generic_name IS NOT NULL
+    )
+"""
+
+# (index name, table, column) created after loading
+UNIFIED_INDEXES: List[Tuple[str, str, str]] = [
+    ("idx_unified_generic", "unified", "generic_name"),
+    ("idx_atc_generic", "atc", "generic_name"),
+    ("idx_brands_brand", "brands", "brand_name"),
+    ("idx_mixtures_key", "mixtures", "component_key"),
+]
+
+
+def create_generic_atc_table(con: duckdb.DuckDBPyConnection) -> None:
+    """Materialize unified_generic_atc (sorted and indexed on name_key)."""
+    con.execute(
+        f"CREATE TABLE {GENERIC_ATC_TABLE} AS {GENERIC_ATC_SELECT_SQL} ORDER BY name_key, seq"
+    )
+    con.execute(f"CREATE INDEX IF NOT EXISTS idx_generic_atc_key ON {GENERIC_ATC_TABLE}(name_key)")
+
+
+def _typed_select(source: str, schema: List[Tuple[str, str]], available: List[str]) -> str:
+    """
+    Build a SELECT that casts a source relation to the explicit schema.
+
+    Empty strings become NULL, mirroring how read_csv_auto reads the CSV
+    exports, so queries behave the same against either backend.
+    """
+    exprs = []
+    for col, col_type in schema:
+        if col not in available:
+            exprs.append(f"CAST(NULL AS {col_type}) AS {col}")
+        elif col_type == "VARCHAR":
+            exprs.append(f"NULLIF(CAST({col} AS VARCHAR), '') AS {col}")
+        else:
+            exprs.append(
+                f"TRY_CAST(TRY_CAST(NULLIF(CAST({col} AS VARCHAR), '') AS DOUBLE) AS {col_type}) AS {col}"
+            )
+    return f"SELECT {', '.join(exprs)} FROM {source}"
+
+
+def write_parquet_table(df: pd.DataFrame, path: Path, basename: str) -> Path:
+    """
+    Write a unified_* table to zstd Parquet using its explicit schema.
+
+    Tables without a registered schema are written with inferred types.
+    """
+    schema = SCHEMAS_BY_BASENAME.get(basename)
+    con = duckdb.connect(":memory:")
+    try:
+        con.register("_src", df)
+        if schema is not None:
+            query = _typed_select("_src", schema, list(df.columns))
+        else:
+            query = "SELECT * FROM _src"
+        con.execute(f"COPY ({query}) TO '{path}' (FORMAT PARQUET, COMPRESSION ZSTD)")
+    finally:
+        con.close()
+    return Path(path)
+
+
+def table_source_sql(outputs_dir: Path, basename: str) -> Optional[str]:
+    """
+    Return a DuckDB table function reading a unified_* table, preferring the
+    typed Parquet file over the CSV export; None if neither exists.
+    """
+    parquet_path = Path(outputs_dir) / f"{basename}.parquet"
+    if parquet_path.exists():
+        return f"read_parquet('{parquet_path}')"
+    csv_path = Path(outputs_dir) / f"{basename}.csv"
+    if csv_path.exists():
+        return f"read_csv_auto('{csv_path}')"
+    return None
+
+
+def source_files_fingerprint(outputs_dir: Path) -> str:
+    """Content hash of the unified_* files table_source_sql would read."""
+    digest = hashlib.sha256()
+    for basename in sorted(SCHEMAS_BY_BASENAME):
+        for ext in ("parquet", "csv"):
+            path = Path(outputs_dir) / f"{basename}.{ext}"
+            if path.exists():
+                digest.update(path.name.encode())
+                with open(path, "rb") as f:
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(block)
+                break
+    return digest.hexdigest()
+
+
+def compute_data_fingerprint(tables: Dict[str, pd.DataFrame]) -> str:
+    """Content hash of the reference tables (column names + row hashes)."""
+    digest = hashlib.sha256()
+    for basename in sorted(tables):
+        df = tables[basename]
+        digest.update(basename.encode())
+        digest.update("|".join(map(str, df.columns)).encode())
+        if not df.empty:
+            row_hashes = pd.util.hash_pandas_object(df.astype(str), index=False)
+            digest.update(row_hashes.values.tobytes())
+    return digest.hexdigest()
+
+
+def write_reference_db(
+    tables: Dict[str, pd.DataFrame],
+    outputs_dir: Path,
+    verbose: bool = True,
+) -> Path:
+    """
+    Write unified_* DataFrames into a typed, indexed DuckDB file.
+
+    The database is built under a temporary name and atomically renamed, so
+    readers never see a half-written file.
+
+    Args:
+        tables: Mapping of basename (e.g. "unified_generics") to DataFrame
+        outputs_dir: Directory receiving unified_reference.duckdb
+        verbose: Print progress
+
+    Returns:
+        Path to the written database
+    """
+    outputs_dir = Path(outputs_dir)
+    db_path = outputs_dir / REFERENCE_DB_NAME
+    tmp_path = outputs_dir / f"{REFERENCE_DB_NAME}.tmp"
+    for stale in (tmp_path, Path(f"{tmp_path}.wal")):
+        if stale.exists():
+            stale.unlink()
+
+    con = duckdb.connect(str(tmp_path))
+    try:
+        for table, (basename, schema) in UNIFIED_SCHEMAS.items():
+            df = tables.get(basename)
+            if df is None:
+                continue
+            columns = ", ".join(f"{col} {col_type}" for col, col_type in schema)
+            con.execute(f"CREATE TABLE {table} ({columns})")
+            if not df.empty:
+                con.register("_src", df)
+                con.execute(f"INSERT INTO {table} {_typed_select('_src', schema, list(df.columns))}")
+                con.unregister("_src")
+
+        if {"unified", "atc"} <= list_tables(con):
+            create_generic_atc_table(con)
+
+        con.execute("CREATE TABLE reference_meta (key VARCHAR, value VARCHAR)")
+        con.execute(
+            "INSERT INTO reference_meta VALUES ('data_fingerprint', ?)",
+            [compute_data_fingerprint(tables)],
+        )
+
+        existing = {row[0] for row in con.execute("SHOW TABLES").fetchall()}
+        for index_name, table, column in UNIFIED_INDEXES:
+            if table in existing:
+                con.execute(f"CREATE INDEX {index_name} ON {table}({column})")
+        con.execute("CHECKPOINT")
+    finally:
+        con.close()
+
+    os.replace(tmp_path, db_path)
+    if verbose:
+        print(f"  ✓ {REFERENCE_DB_NAME}: {len(UNIFIED_SCHEMAS) + 1} tables")
+    return db_path
+
+
+def reference_db_path(outputs_dir: Path) -> Optional[Path]:
+    """
+    Return the reference database path if it exists and is not older than
+    the Parquet/CSV exports it was built alongside, else None.
+    """
+    db_path = Path(outputs_dir) / REFERENCE_DB_NAME
+    if not db_path.exists():
+        return None
+    db_mtime = db_path.stat().st_mtime
+    for basename in SCHEMAS_BY_BASENAME:
+        for ext in ("parquet", "csv"):
+            table_path = Path(outputs_dir) / f"{basename}.{ext}"
+            if table_path.exists() and table_path.stat().st_mtime > db_mtime:
+                return None
+    return db_path
+
+
+def export_database(con: duckdb.DuckDBPyConnection, db_path: Path) -> Path:
+    """Copy every table and index of a connection's database into a new DuckDB file."""
+    source = con.execute("SELECT current_database()").fetchone()[0]
+    con.execute(f"ATTACH '{db_path}' AS export_db")
+    try:
+        con.execute(f"COPY FROM DATABASE {source} TO export_db")
+    finally:
+        con.execute("DETACH export_db")
+    return Path(db_path)
+
+
+def open_reference_db(db_path: Path) -> duckdb.DuckDBPyConnection:
+    """Open the reference database read-only (safe to share across processes)."""
+    return duckdb.connect(str(db_path), read_only=True)
+
+
+def list_tables(con: duckdb.DuckDBPyConnection) -> set:
+    """Return the set of table names visible on a connection."""
+    return {row[0] for row in con.execute("SHOW TABLES").fetchall()}
+
+
+def read_data_fingerprint(con: duckdb.DuckDBPyConnection) -> Optional[str]:
+    """Return the data fingerprint stored in the reference database, if any."""
+    try:
+        row = con.execute(
+            "SELECT value FROM reference_meta WHERE key = 'data_fingerprint'"
+        ).fetchone()
+    except Exception:
+        return None
+    return row[0] if row else None
+
+
+def constants_fingerprint() -> str:
+    """Hash of the unified_constants tables that feed the derived structures."""
+    digest = hashlib.sha256()
+    digest.update(repr(sorted(SPELLING_SYNONYMS.items())).encode())
+    digest.update(repr(sorted(REGIONAL_TO_US.items())).encode())
+    digest.update(repr(sorted(MULTIWORD_GENERICS)).encode())
+    return digest.hexdigest()
+
+
+# =============================================================================
+# Derived lookup structures (shared by build-time snapshot and tagger fallback)
+# =============================================================================
+
+def resolve_synonym_chains(
+    synonyms: Dict[str, str],
+) -> Tuple[Dict[str, str], List[List[str]]]:
+    """
+    Point every surface form at the end of its synonym chain, so one lookup
+    gives the canonical generic (LRS → LACTATED RINGER'S → RINGER'S SOLUTION,
+    LACTATED becomes LRS → RINGER'S SOLUTION, LACTATED).
+    
+    Forms on a cycle have no canonical end and keep their direct mapping;
+    forms leading into a cycle stop at the first cycle form they reach.
+    
+    Returns (resolved map, cycles as lists of surface forms in chain order).
+    """
+    resolved: Dict[str, str] = {}
+    cycles: List[List[str]] = []
+    on_cycle: Set[str] = set()
+    for start in synonyms:
+        if start in resolved:
+            continue
+        # Walk until a fixed point, an already resolved form, or a repeat
+        path: List[str] = []
+        position: Dict[str, int] = {}
+        current = start
+        while current in synonyms and current not in resolved and current not in position:
+            position[current] = len(path)
+            path.append(current)
+            target = synonyms[current]
+            if target == current:
+                break
+            current = target
+        if current in position and synonyms[current] != current:
+            cycle = path[position[current]:]
+            cycles.append(cycle)
+            on_cycle.update(cycle)
+            for name in cycle:
+                resolved[name] = synonyms[name]
+            end = current
+            path = path[:position[current]]
+        elif current in on_cycle:
+            end = current
+        else:
+            end = resolved.get(current, current)
+        for name in path:
+            resolved[name] = end
+    return resolved, cycles
+
+
+def build_synonym_map(
+    con: duckdb.DuckDBPyConnection,
+    report: Optional[Dict[str, list]] = None,
+) -> Dict[str, str]:
+    """
+    Spelling corrections + regional→US names + unified_synonyms (pipe-separated),
+    with chains resolved to their canonical generic (see resolve_synonym_chains).
+    
+    Later sources win when a surface form maps to different generics. Pass a
+    dict as report to collect those as "conflicts" (form, dropped, kept) and
+    the synonym "cycles".
+    """
+    synonyms = dict(SPELLING_SYNONYMS)
+    conflicts: List[Tuple[str, str, str]] = []
+    
+    # Add regional→US mappings (PARACETAMOL → ACETAMINOPHEN for lookups)
+    for regional, us in REGIONAL_TO_US.items():
+        if synonyms.get(regional, us) != us:
+            conflicts.append((regional, synonyms[regional], us))
+        synonyms[regional] = us
+    
+    # Parse unified_synonyms (format: drugbank_id, generic_name, synonyms pipe-separated)
+    try:
+        synonym_rows = con.execute("""
+            SELECT generic_name, synonyms FROM synonyms
+            WHERE synonyms IS NOT NULL AND synonyms != ''
+        """).fetchall()
+        for generic_name, synonyms_str in synonym_rows:
+            if generic_name and synonyms_str:
+                generic_upper = generic_name.upper()
+                for syn in synonyms_str.split('|'):
+                    syn = syn.strip().upper()
+                    if syn and syn != generic_upper:
+                        if synonyms.get(syn, generic_upper) != generic_upper:
+                            conflicts.append((syn, synonyms[syn], generic_upper))
+                        synonyms[syn] = generic_upper
+    except Exception:
+        pass
+    synonyms, cycles = resolve_synonym_chains(synonyms)
+    if report is not None:
+        report["conflicts"] = conflicts
+        report["cycles"] = cycles
+    return synonyms
+
+
+def build_brand_map(con: duckdb.DuckDBPyConnection) -> Dict[str, str]:
+    """Brand → generic map from unified_brands, undoing FDA brand/generic swaps."""
+    brand_map: Dict[str, str] = {}
+    all_generics = set(row[0].upper() for row in con.execute(
+        "SELECT DISTINCT generic_name FROM unified"
+    ).fetchall())
+    
+    # Also check synonyms that map to generics (e.g., ASPIRIN -> ACETYLSALICYLIC ACID)
+    synonym_generics = set(k.upper() for k in SPELLING_SYNONYMS.keys())
+    
+    try:
+        # Count rows per generic to prefer more common associations
+        brand_rows = con.execute("""
+            SELECT brand_name, generic_name, COUNT(*) as cnt
+            FROM brands
+            GROUP BY brand_name, generic_name
+            ORDER BY cnt DESC
+        """).fetchall()
+        for brand, generic, _ in brand_rows:
+            if brand and generic:
+                brand_upper = brand.upper()
+                generic_upper = generic.upper()
+                
+                # FDA often swaps brand/generic - if brand_name is a known generic,
+                # treat it as the generic and use generic_name as the brand
+                if brand_upper in all_generics or brand_upper in synonym_generics:
+                    # Swap: the "brand" is actually a generic, "generic" is the brand
+                    if generic_upper not in all_generics and generic_upper not in brand_map:
+                        brand_map[generic_upper] = brand_upper
+                elif brand_upper not in brand_map:
+                    brand_map[brand_upper] = generic_upper
+    except Exception:
+        pass
+    return brand_map
+
+
+def load_generic_names(con: duckdb.DuckDBPyConnection) -> List[str]:
+    """Distinct non-null generic names (candidate list for fuzzy matching)."""
+    return [row[0] for row in con.execute(
+        "SELECT DISTINCT generic_name FROM unified WHERE generic_name IS NOT NULL"
+    ).fetchall()]
+
+
+def build_multiword_generics(generic_names: List[str]) -> Set[str]:
+    """Multiword generics from data + constants, plus plural first-word variants."""
+    multiword: Set[str] = set()
+    for name in generic_names:
+        if " " in str(name):
+            multiword.add(str(name).upper())
+    
+    # Add multiword generics from unified_constants.py
+    multiword.update(MULTIWORD_GENERICS)
+    
+    # Add plural forms of multiword generics for detection
+    plural_forms = set()
+    for mw in multiword:
+        words = mw.split()
+        if words and not words[0].endswith("S"):
+            plural_first = words[0] + "S"
+            plural_forms.add(" ".join([plural_first] + words[1:]))
+    multiword.update(plural_forms)
+    return multiword
+
+
+def derive_lookup_structures(
+    con: duckdb.DuckDBPyConnection,
+    report: Optional[Dict[str, list]] = None,
+) -> Dict[str, Any]:
+    """Compute every derived tagger structure from the reference tables."""
+    # lookup imports this module
+    from .lookup import build_generic_resolution
+    
+    generic_names = load_generic_names(con)
+    synonyms = build_synonym_map(con, report)
+    brand_map = build_brand_map(con)
+    multiword_generics = build_multiword_generics(generic_names)
+    return {
+        "synonyms": synonyms,
+        "brand_map": brand_map,
+        "cached_generics_list": generic_names,
+        "multiword_generics": multiword_generics,
+        "generic_resolution": build_generic_resolution(
+            generic_names, synonyms, brand_map, multiword_generics,
+        ),
+    }
+
+
+# =============================================================================
+# Snapshot I/O
+# =============================================================================
+
+def _snapshot_header(data_fingerprint: str) -> Dict[str, Any]:
+    return {
+        "version": SNAPSHOT_VERSION,
+        "data_fingerprint": data_fingerprint,
+        "constants_fingerprint": constants_fingerprint(),
+    }
+
+
+def write_lookup_snapshot(db_path: Path, verbose: bool = True) -> Optional[Path]:
+    """
+    Derive the tagger lookup structures from a reference database and pickle
+    them next to it (header first, so staleness checks skip the payload).
+
+    Args:
+        db_path: Path to unified_reference.duckdb
+        verbose: Print progress
+
+    Returns:
+        Path to the snapshot, or None if the database has no fingerprint
+    """
+    db_path = Path(db_path)
+    con = open_reference_db(db_path)
+    try:
+        data_fingerprint = read_data_fingerprint(con)
+        if data_fingerprint is None:
+            return None
+        report: Dict[str, list] = {}
+        payload = derive_lookup_structures(con, report)
+    finally:
+        con.close()
+    
+    snapshot_path = db_path.parent / SNAPSHOT_NAME
+    tmp_path = db_path.parent / f"{SNAPSHOT_NAME}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(_snapshot_header(data_fingerprint), f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, snapshot_path)
+    if verbose:
+        print(f"  ✓ {SNAPSHOT_NAME}: {len(payload['synonyms']):,} synonyms, "
+              f"{len(payload['brand_map']):,} brands")
+        _print_synonym_report(report)
+    return snapshot_path
+
+
+def _print_synonym_report(report: Dict[str, list], limit: int = 10) -> None:
+    """Summarize synonym conflicts and cycles found while building the map."""
+    conflicts, cycles = report.get("conflicts", []), report.get("cycles", [])
+    if conflicts:
+        print(f"    - {len(conflicts):,} synonym conflicts (later source kept):")
+        for form, dropped, kept in conflicts[:limit]:
+            print(f"        {form}: {dropped} -> {kept}")
+    if cycles:
+        print(f"    - {len(cycles):,} synonym cycles (left unresolved):")
+        for cycle in cycles[:limit]:
+            print(f"        {' -> '.join(cycle + cycle[:1])}")
+
+
+def load_lookup_snapshot(
+    outputs_dir: Path,
+    con: duckdb.DuckDBPyConnection,
+    log: Optional[Callable[[str], None]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Load the lookup snapshot if it matches the attached reference database
+    and the current constants; return None when missing or stale.
+    """
+    snapshot_path = Path(outputs_dir) / SNAPSHOT_NAME
+    if not snapshot_path.exists():
+        return None
+    data_fingerprint = read_data_fingerprint(con)
+    if data_fingerprint is None:
+        return None
+    try:
+        with open(snapshot_path, "rb") as f:
+            header = pickle.load(f)
+            if header != _snapshot_header(data_fingerprint):
+                if log:
+                    log(f"  - {SNAPSHOT_NAME} is stale, rebuilding lookup structures")
+                return None
+            return pickle.load(f)
+    except Exception:
+        return None
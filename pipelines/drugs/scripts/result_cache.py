@@ -0,0 +1,180 @@
+"""
+Persistent, content-addressed cache of UnifiedTagger results.
+
+Successive eSOA drops share most of their descriptions. Tagging results are
+stored as JSON in a DuckDB file keyed by (input text, reference fingerprint,
+tagger code version), so a re-run only tags descriptions it has not seen
+against the same reference data, code and libraries.
+
+Entries for other fingerprints can never hit again and are pruned on the
+first write of a run.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sys
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import duckdb
+import pandas as pd
+
+
+RESULT_CACHE_NAME = "tag_result_cache.duckdb"
+# Bump when the stored payload changes shape
+RESULT_CACHE_VERSION = 2
+
+# pipelines package: drug scripts, constants and pipeline modules
+_PIPELINES_DIR = Path(__file__).resolve().parents[2]
+# Libraries whose behaviour reaches tagging output
+_DEPENDENCIES = ("pandas", "numpy", "duckdb", "pyahocorasick")
+
+
+def tagger_code_version() -> str:
+    """
+    Hash of the pipelines package sources, the Python version and the
+    installed versions of _DEPENDENCIES (any change invalidates).
+    """
+    digest = hashlib.sha256(f"v{RESULT_CACHE_VERSION}|{sys.version}".encode())
+    for name in _DEPENDENCIES:
+        try:
+            version = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            version = "absent"
+        digest.update(f"|{name}={version}".encode())
+    for path in sorted(_PIPELINES_DIR.rglob("*.py")):
+        digest.update(path.relative_to(_PIPELINES_DIR).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _json_default(value: Any) -> Any:
+    """Encode numpy scalars (e.g. match scores) as plain Python values."""
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class TagResultCache:
+    """
+    DuckDB-backed store of tagging results for one reference/code version.
+
+    Each result is stored as a JSON array of its values, in the order of the
+    fields the cache was created with.
+
+    Usage:
+        cache = TagResultCache(outputs_dir / RESULT_CACHE_NAME, reference_fingerprint, RESULT_COLUMNS)
+        hits = cache.get_many(texts)      # {text: result dict}
+        cache.put_many(new_columns)       # {field: values} (ResultColumns.columns)
+        cache.close()
+
+    The cache is best-effort: if the file cannot be opened (e.g. another
+    process holds the write lock) it behaves as empty.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        reference_fingerprint: str,
+        fields: Sequence[str],
+        code_version: Optional[str] = None,
+    ):
+        self.path = Path(path)
+        self.reference_fingerprint = reference_fingerprint
+        self.fields = list(fields)
+        # Stored arrays only read back under the same field order
+        self.code_version = hashlib.sha256(
+            "|".join([code_version or tagger_code_version(), *self.fields]).encode()
+        ).hexdigest()
+        self.hits = 0
+        self.writes = 0
+        self._con: Optional[duckdb.DuckDBPyConnection] = None
+        self._pruned = False
+        self._disabled = False
+
+    def _connection(self) -> Optional[duckdb.DuckDBPyConnection]:
+        if self._con is not None or self._disabled:
+            return self._con
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            con = duckdb.connect(str(self.path))
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS tag_results (
+                    reference_fingerprint VARCHAR,
+                    code_version VARCHAR,
+                    input_text VARCHAR,
+                    result VARCHAR,
+                    PRIMARY KEY (reference_fingerprint, code_version, input_text)
+                )
+            """)
+        except Exception:
+            self._disabled = True
+            return None
+        self._con = con
+        return con
+
+    def get_many(self, texts: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Cached results for the given texts (misses are omitted)."""
+        con = self._connection()
+        if con is None or not texts:
+            return {}
+        con.register("_texts", pd.DataFrame({"input_text": list(dict.fromkeys(texts))}))
+        try:
+            rows = con.execute("""
+                SELECT r.input_text, r.result
+                FROM tag_results r
+                JOIN _texts t ON r.input_text = t.input_text
+                WHERE r.reference_fingerprint = ? AND r.code_version = ?
+            """, [self.reference_fingerprint, self.code_version]).fetchall()
+        finally:
+            con.unregister("_texts")
+        fields = self.fields
+        hits = {text: dict(zip(fields, json.loads(payload))) for text, payload in rows}
+        self.hits += len(hits)
+        return hits
+
+    def put_many(self, columns: Dict[str, List[Any]]) -> None:
+        """
+        Store column-oriented results keyed by their input_text; existing
+        entries are kept.
+
+        Per-call fields (id, row_idx) are stored as-is and overwritten by
+        the caller on a hit.
+        """
+        con = self._connection()
+        if con is None or not columns.get("input_text"):
+            return
+        if not self._pruned:
+            con.execute("""
+                DELETE FROM tag_results
+                WHERE reference_fingerprint != ? OR code_version != ?
+            """, [self.reference_fingerprint, self.code_version])
+            self._pruned = True
+
+        payloads: Dict[str, str] = {}
+        rows = zip(*(columns[field] for field in self.fields))
+        for text, row in zip(columns["input_text"], rows):
+            if text is None or text in payloads:
+                continue
+            payloads[text] = json.dumps(row, default=_json_default)
+
+        con.register("_new", pd.DataFrame({
+            "input_text": list(payloads),
+            "result": list(payloads.values()),
+        }))
+        try:
+            con.execute("""
+                INSERT OR IGNORE INTO tag_results
+                SELECT ?, ?, input_text, result FROM _new
+            """, [self.reference_fingerprint, self.code_version])
+        finally:
+            con.unregister("_new")
+        self.writes += len(payloads)
+
+    def close(self) -> None:
+        if self._con is not None:
+            self._con.close()
+            self._con = None
@@ -6,9 +6,11 @@ These functions are called by the run_* scripts in the project root.
 
 from __future__ import annotations
 
+import itertools
 import os
+from collections import Counter
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 import pandas as pd
 
@@ -147,15 +149,102 @@ def run_annex_f_tagging(
     return results
 
 
+# Rows read per eSOA chunk when run_esoa_tagging streams its input
+ESOA_STREAM_ROWS = 100_000
+
+# eSOA description columns, in order of preference
+ESOA_TEXT_COLUMNS = ["raw_text", "ITEM_DESCRIPTION", "DESCRIPTION", "Drug Description", "description"]
+
+# Tagger result columns carried onto eSOA rows
+ESOA_RESULT_COLUMNS = [
+    "atc_code", "drugbank_id", "generic_name", "reference_text",
+    "match_score", "match_reason", "sources",
+    # Extracted form/route/dose
+    "dose", "form", "route",
+    # Extracted qualifiers
+    "type_details", "release_details", "form_details",
+    "salt_details", "brand_details", "indication_details", "alias_details",
+    "diluent_details",
+    # IV solution fields
+    "iv_diluent_type", "iv_diluent_amount",
+    # Structured dose information
+    "dose_values", "dose_units", "dose_types", "total_volume_ml",
+    # Computed amounts (w/v calculation for IV solutions)
+    "drug_amount_mg", "diluent_amount_mg", "concentration_mg_per_ml",
+]
+
+
+def _merge_esoa_results(
+    esoa_df: pd.DataFrame,
+    results_df: pd.DataFrame,
+    text_column: str,
+) -> pd.DataFrame:
+    """Map tagger results (one row per unique text) back onto eSOA rows."""
+    # results_df has 'input_text' column with the original text
+    results_df = results_df.rename(columns={"input_text": "_tag_text"})
+    esoa_df = esoa_df.copy()
+    esoa_df["_tag_text"] = esoa_df[text_column].fillna("").astype(str)
+    
+    # Only include columns that exist in results_df
+    merge_cols = ["_tag_text"] + [c for c in ESOA_RESULT_COLUMNS if c in results_df.columns]
+    merged = esoa_df.merge(
+        # NaN and "" descriptions both tag as ""; keep one result per text
+        results_df[merge_cols].drop_duplicates("_tag_text"),
+        on="_tag_text",
+        how="left",
+    ).drop(columns=["_tag_text"])
+    
+    # Rename columns (standardized with annex_f_with_atc)
+    merged = merged.rename(columns={
+        "generic_name": "matched_generic_name",
+        "reference_text": "matched_reference_text",
+        "sources": "matched_source",
+    })
+    
+    # Reorder columns
+    return reorder_columns_after(merged, text_column, "matched_reference_text")
+
+
+def _esoa_match_counts(merged: pd.DataFrame) -> Tuple[int, int, Counter]:
+    """(rows with ATC, rows with DrugBank ID, match_reason counts) for merged eSOA rows."""
+    matched_atc = merged["atc_code"].notna() & (merged["atc_code"] != "")
+    matched_drugbank = merged["drugbank_id"].notna() & (merged["drugbank_id"] != "")
+    reasons = Counter({
+        str(reason): int(count)
+        for reason, count in merged["match_reason"].value_counts().items()
+        if pd.notna(reason)
+    })
+    return int(matched_atc.sum()), int(matched_drugbank.sum()), reasons
+
+
 def run_esoa_tagging(
     esoa_path: Optional[Path] = None,
     output_path: Optional[Path] = None,
     verbose: bool = True,
     show_progress: bool = True,
+    workers: Optional[int] = 1,
+    use_result_cache: bool = False,
+    stream: bool = False,
+    profile_stages: bool = False,
 ) -> dict:
     """
     Run ESOA tagging (Part 3).
     
+    Tags serially by default. workers > 1 tags chunks in forked worker
+    processes, and workers=None sizes the pool by workload (ESOA_MAX_WORKERS
+    overrides either).
+    
+    With use_result_cache=True descriptions tagged in earlier runs against
+    the same reference and code are reused from tag_result_cache.duckdb in
+    the outputs directory, and new results are added to it.
+    
+    With stream=True the eSOA is read ESOA_STREAM_ROWS rows at a time, tagged
+    through UnifiedTagger.tag_stream (serially) and appended to the output,
+    so memory stays flat and rows written before a crash are kept.
+    
+    With profile_stages=True the tagger times each tagging stage; the
+    breakdown (StageTimer.stats()) is returned under "stage_timings".
+    
     Returns dict with results summary.
     """
     if esoa_path is None:
@@ -169,88 +258,73 @@ def run_esoa_tagging(
     if not esoa_path.exists():
         raise FileNotFoundError(f"ESOA not found: {esoa_path}")
     
-    esoa_df = pd.read_csv(esoa_path)
+    esoa_columns = list(pd.read_csv(esoa_path, nrows=0).columns)
     
     # Determine text column
     text_column = None
-    for col in ["raw_text", "ITEM_DESCRIPTION", "DESCRIPTION", "Drug Description", "description"]:
-        if col in esoa_df.columns:
+    for col in ESOA_TEXT_COLUMNS:
+        if col in esoa_columns:
             text_column = col
             break
     
     if not text_column:
-        raise ValueError(f"No text column found. Columns: {list(esoa_df.columns)}")
+        raise ValueError(f"No text column found. Columns: {esoa_columns}")
     
     # Initialize and load tagger
     tagger = UnifiedTagger(
         outputs_dir=PIPELINE_OUTPUTS_DIR,
         inputs_dir=PIPELINE_INPUTS_DIR,
         verbose=False,
+        profile_stages=profile_stages,
     )
     tagger.load()
-    
-    # Use tag_batch with deduplication for performance
-    total = len(esoa_df)
-    results_df = tagger.tag_batch(
-        esoa_df,
-        text_column=text_column,
-        chunk_size=10000,
-        show_progress=show_progress,
-        deduplicate=True,
-    )
-    
-    # Map results back to original rows by text
-    # results_df has 'input_text' column with the original text
-    results_df = results_df.rename(columns={"input_text": "_tag_text"})
-    esoa_df["_tag_text"] = esoa_df[text_column].fillna("").astype(str)
-    
-    # Include all columns from the tagger results
-    merge_cols = [
-        "_tag_text", "atc_code", "drugbank_id", "generic_name", "reference_text",
-        "match_score", "match_reason", "sources",
-        # Extracted form/route/dose
-        "dose", "form", "route",
-        # Extracted qualifiers
-        "type_details", "release_details", "form_details",
-        "salt_details", "brand_details", "indication_details", "alias_details",
-        "diluent_details",
-        # IV solution fields
-        "iv_diluent_type", "iv_diluent_amount",
-        # Structured dose information
-        "dose_values", "dose_units", "dose_types", "total_volume_ml",
-        # Computed amounts (w/v calculation for IV solutions)
-        "drug_amount_mg", "diluent_amount_mg", "concentration_mg_per_ml",
-    ]
-    # Only include columns that exist in results_df
-    merge_cols = [c for c in merge_cols if c in results_df.columns]
-    merged = esoa_df.merge(
-        results_df[merge_cols],
-        on="_tag_text",
-        how="left",
-    ).drop(columns=["_tag_text"])
-    
-    # Rename columns (standardized with annex_f_with_atc)
-    merged = merged.rename(columns={
-        "generic_name": "matched_generic_name",
-        "reference_text": "matched_reference_text",
-        "sources": "matched_source",
-    })
-    
-    # Reorder columns
-    merged = reorder_columns_after(merged, text_column, "matched_reference_text")
-    
-    # Write outputs
     PIPELINE_OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
-    run_with_spinner("Write outputs", lambda: write_csv_and_parquet(merged, output_path))
+    
+    if stream:
+        total = matched_atc_count = matched_drugbank_count = 0
+        reason_counts: Counter = Counter()
+        # tag_stream yields one frame per chunk (chunk_size matches the read
+        # size); tee hands every chunk both to it and to the merge below
+        esoa_chunks, tag_chunks = itertools.tee(pd.read_csv(esoa_path, chunksize=ESOA_STREAM_ROWS))
+        result_frames = tagger.tag_stream(
+            tag_chunks, text_column, chunk_size=ESOA_STREAM_ROWS, use_result_cache=use_result_cache,
+        )
+        for chunk_num, esoa_chunk in enumerate(esoa_chunks):
+            label = f"Chunk {chunk_num + 1:02d} ({total + len(esoa_chunk):,} rows)"
+            tag_chunk = lambda c=esoa_chunk: _merge_esoa_results(c, next(result_frames), text_column)
+            merged = run_with_spinner(label, tag_chunk) if show_progress else tag_chunk()
+            merged.to_csv(output_path, mode="w" if chunk_num == 0 else "a", header=chunk_num == 0, index=False)
+            atc, drugbank, reasons = _esoa_match_counts(merged)
+            total += len(merged)
+            matched_atc_count += atc
+            matched_drugbank_count += drugbank
+            reason_counts.update(reasons)
+        reason_counts = dict(reason_counts.most_common())
+    else:
+        esoa_df = pd.read_csv(esoa_path)
+        
+        # Use tag_batch with deduplication for performance
+        total = len(esoa_df)
+        results_df = tagger.tag_batch(
+            esoa_df,
+            text_column=text_column,
+            chunk_size=10000,
+            show_progress=show_progress,
+            deduplicate=True,
+            workers=workers,
+            use_result_cache=use_result_cache,
+        )
+        merged = _merge_esoa_results(esoa_df, results_df, text_column)
+        
+        # Write outputs
+        run_with_spinner("Write outputs", lambda: write_csv_and_parquet(merged, output_path))
+        
+        matched_atc_count, matched_drugbank_count, reasons = _esoa_match_counts(merged)
+        reason_counts = dict(reasons)
     
     tagger.close()
     
     # Summary
-    matched_atc = merged["atc_code"].notna() & (merged["atc_code"] != "")
-    matched_atc_count = matched_atc.sum()
-    matched_drugbank = merged["drugbank_id"].notna() & (merged["drugbank_id"] != "")
-    matched_drugbank_count = matched_drugbank.sum()
-    
     results = {
         "total": total,
         "matched_atc": matched_atc_count,
@@ -259,9 +333,9 @@ def run_esoa_tagging(
         "matched_drugbank_pct": 100 * matched_drugbank_count / total if total else 0,
         "output_path": output_path,
     }
+    if profile_stages:
+        results["stage_timings"] = tagger.stage_timer.stats()
     
-    reason_counts = {str(reason): int(count) for reason, count in merged["match_reason"].value_counts().items() if pd.notna(reason)}
-
     if verbose:
         print(f"\nESOA tagging complete: {output_path}")
         print(f"  Total: {total:,}")
@@ -271,6 +345,10 @@ def run_esoa_tagging(
         for reason, count in list(reason_counts.items())[:10]:
             pct = 100 * count / total if total else 0
             print(f"  {reason}: {count:,} ({pct:.1f}%)")
+        if profile_stages:
+            print("\nStage timings:")
+            for line in tagger.stage_timer.table():
+                print(line)
     
     # Log metrics
     log_metrics("esoa", {
@@ -337,20 +415,24 @@ def run_esoa_to_drug_code(
         return str(s).upper().strip()
     
     # Build synonym mappings from generics_master and merge with static constants
-    generics_master_path = PIPELINE_OUTPUTS_DIR / "generics_master.csv"
+    # Prefer the columnar file and read only the two columns used here
+    generics_master_path = PIPELINE_OUTPUTS_DIR / "generics_master.parquet"
     if not generics_master_path.exists():
-        generics_master_path = PIPELINE_OUTPUTS_DIR / "generics_master.parquet"
+        generics_master_path = PIPELINE_OUTPUTS_DIR / "generics_master.csv"
     all_synonyms = dict(ALL_DRUG_SYNONYMS)  # Start with static synonyms from unified_constants
     
     if generics_master_path.exists():
+        gm_columns = ['generic_name', 'synonyms']
         if str(generics_master_path).endswith('.parquet'):
-            gm = pd.read_parquet(generics_master_path)
+            import pyarrow.parquet as pq
+            available = set(pq.read_schema(generics_master_path).names)
+            gm = pd.read_parquet(generics_master_path, columns=[c for c in gm_columns if c in available])
         else:
-            gm = pd.read_csv(generics_master_path)
-        for _, row in gm.iterrows():
-            generic = str(row['generic_name']).upper().strip()
-            synonyms_str = row.get('synonyms', '')
-            if synonyms_str:
+            gm = pd.read_csv(generics_master_path, usecols=lambda c: c in gm_columns)
+        gm_synonyms = gm['synonyms'] if 'synonyms' in gm.columns else [None] * len(gm)
+        for generic_name, synonyms_str in zip(gm['generic_name'], gm_synonyms):
+            generic = str(generic_name).upper().strip()
+            if pd.notna(synonyms_str) and synonyms_str:
                 for syn in str(synonyms_str).split('|'):
                     syn = syn.upper().strip()
                     if syn and syn != generic:
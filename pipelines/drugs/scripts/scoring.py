@@ -14,7 +14,8 @@ Rules (in order of priority):
 from __future__ import annotations
 
 import re
-from typing import Any, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 
 from .unified_constants import (
     # Categories
@@ -39,17 +40,25 @@ from .form_route_mapping import (
 )
 
 
+_ATC_COMBINATION_PREFIXES = tuple(ATC_COMBINATION_PATTERNS)
+
+# Rank of each generics_match reason (lower is better; unknown reasons rank 4)
+_MATCH_PRIORITY = {
+    "exact": 0,
+    "exact_with_subtype": 0,
+    "combo_match": 1,
+    "substring": 2,
+    "combo_partial": 3,
+}
+
+_COMBO_SPLIT = re.compile(r'\s*\+\s*|\s+AND\s+')
+
+
 def is_combination_atc(atc_code: str) -> bool:
     """Check if an ATC code represents a combination product."""
     if not atc_code:
         return False
-    
-    atc_upper = atc_code.upper()
-    for pattern in ATC_COMBINATION_PATTERNS:
-        if atc_upper.startswith(pattern):
-            return True
-    
-    return False
+    return atc_code.upper().startswith(_ATC_COMBINATION_PREFIXES)
 
 
 def sort_atc_codes(
@@ -105,6 +114,65 @@ def parse_generic_with_subtype(generic: str) -> Tuple[str, Optional[str]]:
     return generic, None
 
 
+@dataclass(frozen=True)
+class CandidateFeatures:
+    """Input-independent facts about a candidate, computed once when it is built."""
+    generic: str                      # Uppercase generic_name
+    normalized: str                   # generic after synonyms
+    base: str                         # generic before a ", subtype" suffix
+    base_normalized: str
+    subtype: Optional[str]
+    is_combo: bool                    # Components joined by + or AND
+    parts_normalized: FrozenSet[str]  # Combination components after synonyms
+    reference: str                    # Uppercase reference_text
+    form: str                         # Uppercase form
+    atc: str
+    atc_is_combo: bool
+
+
+def candidate_features(cand: Dict[str, Any], apply_synonyms_fn) -> CandidateFeatures:
+    """Precompute the CandidateFeatures select_best_candidate reads from cand."""
+    generic = str(cand.get("generic_name", "")).upper()
+    base, subtype = parse_generic_with_subtype(generic)
+    # Check if candidate is a combination (using + or AND, not comma)
+    is_combo = " + " in generic or " AND " in generic
+    parts_normalized: FrozenSet[str] = frozenset()
+    if is_combo:
+        # Split candidate into parts (don't split on comma for combos)
+        parts_normalized = frozenset(
+            apply_synonyms_fn(p.strip()) for p in _COMBO_SPLIT.split(generic) if p.strip()
+        )
+    atc = str(cand.get("atc_code", ""))
+    return CandidateFeatures(
+        generic=generic,
+        normalized=apply_synonyms_fn(generic),
+        base=base,
+        base_normalized=apply_synonyms_fn(base),
+        subtype=subtype,
+        is_combo=is_combo,
+        parts_normalized=parts_normalized,
+        reference=str(cand.get("reference_text", "")).upper(),
+        form=str(cand.get("form", "")).upper(),
+        atc=atc,
+        atc_is_combo=is_combination_atc(atc),
+    )
+
+
+class _InputGenerics:
+    """Synonym-normalized views of a row's input generics, shared by all its candidates."""
+    
+    def __init__(self, input_generics: Iterable[str], apply_synonyms_fn):
+        self.generics = list(input_generics)
+        self.normalized = {apply_synonyms_fn(g) for g in self.generics}
+        # (input, normalized, base, subtype, normalized base) in input order
+        self.parsed = []
+        for inp in self.generics:
+            inp_base, inp_subtype = parse_generic_with_subtype(inp)
+            self.parsed.append(
+                (inp, apply_synonyms_fn(inp), inp_base, inp_subtype, apply_synonyms_fn(inp_base))
+            )
+
+
 def generics_match(
     input_generics: Set[str],
     candidate_generic: str,
@@ -124,31 +192,28 @@ def generics_match(
     """
     if not input_generics or not candidate_generic:
         return False, "missing_generic"
+    return _features_match(
+        _InputGenerics(input_generics, apply_synonyms_fn),
+        candidate_features({"generic_name": candidate_generic}, apply_synonyms_fn),
+    )
+
+
+def _features_match(inputs: _InputGenerics, cand: CandidateFeatures) -> Tuple[bool, str]:
+    """generics_match on precomputed input and candidate features."""
+    if not inputs.generics or not cand.generic:
+        return False, "missing_generic"
     
-    cand_upper = candidate_generic.upper()
-    cand_normalized = apply_synonyms_fn(cand_upper)
-    
-    # Parse candidate for base name and subtype
-    cand_base, cand_subtype = parse_generic_with_subtype(cand_upper)
-    cand_base_normalized = apply_synonyms_fn(cand_base)
-    
-    # Check if candidate is a combination (using + or AND, not comma)
-    cand_is_combo = " + " in cand_upper or " AND " in cand_upper
+    cand_upper = cand.generic
+    cand_normalized = cand.normalized
+    cand_base, cand_subtype = cand.base, cand.subtype
+    cand_base_normalized = cand.base_normalized
     
-    if cand_is_combo:
-        # Split candidate into parts (don't split on comma for combos)
-        cand_parts = set(
-            p.strip() for p in re.split(r'\s*\+\s*|\s+AND\s+', cand_upper) 
-            if p.strip()
-        )
-        cand_parts_normalized = {apply_synonyms_fn(p) for p in cand_parts}
-        
-        # Normalize input generics
-        input_normalized = {apply_synonyms_fn(g) for g in input_generics}
+    if cand.is_combo:
+        cand_parts_normalized = cand.parts_normalized
+        input_normalized = inputs.normalized
         
         # Check overlap
-        overlap = input_normalized & cand_parts_normalized
-        if overlap:
+        if not input_normalized.isdisjoint(cand_parts_normalized):
             return True, "combo_match"
         
         # Try substring matching for partial names
@@ -160,13 +225,7 @@ def generics_match(
         return False, "combo_no_match"
     else:
         # Single drug - check exact or substring match
-        for inp in input_generics:
-            inp_normalized = apply_synonyms_fn(inp)
-            
-            # Parse input for base name and subtype
-            inp_base, inp_subtype = parse_generic_with_subtype(inp)
-            inp_base_normalized = apply_synonyms_fn(inp_base)
-            
+        for inp, inp_normalized, inp_base, inp_subtype, inp_base_normalized in inputs.parsed:
             # Step 1: Base name must match
             base_matches = (
                 inp_base_normalized == cand_base_normalized or
@@ -223,6 +282,9 @@ def select_best_candidate(
     5. Salt is flexible (same base drug regardless of salt form)
     6. Tie-break using _details (type, release, form, indication, etc.)
     
+    Candidates may carry precomputed CandidateFeatures under "_features"
+    (see candidate_features); they are computed here otherwise.
+    
     Returns the best candidate or None.
     """
     input_details = input_details or {}
@@ -233,26 +295,26 @@ def select_best_candidate(
     
     # Filter candidates by generic match (REQUIRED)
     valid_candidates = []
+    inputs = _InputGenerics(input_generics_normalized, apply_synonyms_fn)
+    
+    # For IV solutions: prefer active ingredient over vehicle
+    check_vehicle = is_iv_solution and stripped_generics and len(stripped_generics) > 1
+    if check_vehicle:
+        active_normalized = apply_synonyms_fn(stripped_generics[0].upper())
+        vehicle_normalized = apply_synonyms_fn(stripped_generics[1].upper())
     
     for cand in candidates:
-        cand_generic = str(cand.get("generic_name", "")).upper()
-        cand_atc = str(cand.get("atc_code", ""))
+        features = cand.get("_features") or candidate_features(cand, apply_synonyms_fn)
+        cand_generic = features.generic
         
         # Rule 1: Generic must match
-        matches, match_reason = generics_match(
-            input_generics_normalized, cand_generic, apply_synonyms_fn
-        )
+        matches, match_reason = _features_match(inputs, features)
         
         if not matches:
             continue
         
-        # For IV solutions: prefer active ingredient over vehicle
-        if is_iv_solution and stripped_generics and len(stripped_generics) > 1:
-            active = stripped_generics[0].upper()
-            vehicle = stripped_generics[1].upper()
-            active_normalized = apply_synonyms_fn(active)
-            vehicle_normalized = apply_synonyms_fn(vehicle)
-            cand_normalized = apply_synonyms_fn(cand_generic)
+        if check_vehicle:
+            cand_normalized = features.normalized
             
             # Skip if matches vehicle but not active
             is_vehicle_match = (vehicle_normalized in cand_generic or 
@@ -266,11 +328,10 @@ def select_best_candidate(
                 continue
         
         # For combinations: prefer combo candidates
-        cand_is_combo = " + " in cand_generic or " AND " in cand_generic
-        if is_combination and not cand_is_combo:
+        if is_combination and not features.is_combo:
             continue
         
-        valid_candidates.append((cand, match_reason))
+        valid_candidates.append((cand, features, match_reason))
     
     if not valid_candidates:
         return None
@@ -291,26 +352,18 @@ def select_best_candidate(
     input_iv_type = str(input_details.get("iv_diluent_type") or "").upper()
     
     # Rank valid candidates by preference
-    def rank_candidate(item: Tuple[Dict[str, Any], str]) -> Tuple[int, int, int, int, int, str]:
-        cand, match_reason = item
-        cand_atc = str(cand.get("atc_code", ""))
-        cand_form = str(cand.get("form", "")).upper()
-        cand_route = str(cand.get("route", "")).upper()
-        cand_source = str(cand.get("source", "")).lower()
-        cand_generic = str(cand.get("generic_name", "")).upper()
-        cand_ref = str(cand.get("reference_text", "")).upper()
+    def rank_candidate(item: Tuple[Dict[str, Any], CandidateFeatures, str]) -> Tuple[int, int, int, int, int, str]:
+        _, features, match_reason = item
+        cand_atc = features.atc
+        cand_form = features.form
+        cand_generic = features.generic
+        cand_ref = features.reference
         
         # Priority 1: Match type (exact > substring > combo)
-        match_priority = {
-            "exact": 0,
-            "exact_with_subtype": 0,
-            "combo_match": 1,
-            "substring": 2,
-            "combo_partial": 3,
-        }.get(match_reason, 4)
+        match_priority = _MATCH_PRIORITY.get(match_reason, 4)
         
         # Priority 2: ATC type preference
-        is_combo_atc = is_combination_atc(cand_atc)
+        is_combo_atc = features.atc_is_combo
         if is_single_drug:
             atc_priority = 0 if not is_combo_atc else 1
         elif is_combination:
@@ -382,6 +435,5 @@ def select_best_candidate(
         
         return (match_priority, atc_priority, form_priority, details_score, length_priority, cand_atc)
     
-    # Sort by rank and return best
-    valid_candidates.sort(key=rank_candidate)
-    return valid_candidates[0][0]
+    # Best rank wins (first in input order on ties, as a stable sort would give)
+    return min(valid_candidates, key=rank_candidate)[0]
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Aggregated wall-clock timers for the stages of a tagging run."""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, List, Optional
+
+
+def _zero_clock() -> float:
+    return 0.0
+
+
+class StageTimer:
+    """
+    Seconds and item counts per named stage, summed over a run.
+
+    Callers read `clock` around each stage and `add()` the totals once per
+    batch. A disabled timer has a clock that always returns 0.0 and ignores
+    add(), so instrumented code pays almost nothing when profiling is off.
+    Timers from worker processes are combined with merge().
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.clock = time.perf_counter if enabled else _zero_clock
+        self.seconds: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    def add(self, stage: str, seconds: float, count: int = 1) -> None:
+        """Add seconds spent on count items of stage."""
+        if not self.enabled:
+            return
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+        self.counts[stage] = self.counts.get(stage, 0) + count
+
+    def merge(self, other: Optional["StageTimer"]) -> None:
+        """Fold another timer's totals (e.g. from a worker) into this one."""
+        if other is None:
+            return
+        for stage, seconds in other.seconds.items():
+            self.add(stage, seconds, other.counts.get(stage, 0))
+
+    def reset(self) -> None:
+        self.seconds.clear()
+        self.counts.clear()
+
+    def total(self) -> float:
+        return sum(self.seconds.values())
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage seconds, counts and share of the timed total."""
+        total = self.total()
+        return {
+            stage: {
+                "seconds": seconds,
+                "count": self.counts.get(stage, 0),
+                "pct": 100 * seconds / total if total else 0.0,
+            }
+            for stage, seconds in self.seconds.items()
+        }
+
+    def table(self, indent: str = "  ") -> List[str]:
+        """Breakdown lines, slowest stage first."""
+        if not self.seconds:
+            return []
+        lines = [f"{indent}{'Stage':<12} {'Seconds':>9} {'Share':>7} {'Items':>11} {'us/item':>9}"]
+        for stage, row in sorted(self.stats().items(), key=lambda item: -item[1]["seconds"]):
+            per_item = 1e6 * row["seconds"] / row["count"] if row["count"] else 0.0
+            lines.append(
+                f"{indent}{stage:<12} {row['seconds']:9.2f} {row['pct']:6.1f}% "
+                f"{row['count']:11,} {per_item:9.1f}"
+            )
+        lines.append(f"{indent}{'total':<12} {self.total():9.2f}")
+        return lines
@@ -4,9 +4,15 @@ Main tagger interface for drug descriptions.
 
 from __future__ import annotations
 
+import gc
+import multiprocessing
 import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
 
 import duckdb
 import pandas as pd
@@ -18,17 +24,28 @@ from .unified_constants import (
     # Vaccine acronym bidirectional lookup
     match_vaccine_text, expand_vaccine_acronym, get_vaccine_acronym,
 )
+from .concurrency import resolve_worker_count
+from .fuzzy import FuzzyMatcher
 from .lookup import (
-    apply_synonym, batch_lookup_generics, build_combination_keys,
-    swap_brand_to_generic,
+    GenericIndex, GenericLookupCache, MixtureIndex, apply_synonym,
+    batch_lookup_generics, build_combination_keys, build_generic_resolution,
+    helper_memo_stats, memo_stats, swap_brand_to_generic,
 )
-from .scoring import select_best_candidate, sort_atc_codes
+from .reference_store import (
+    GENERIC_ATC_TABLE, REFERENCE_DB_NAME, SNAPSHOT_NAME, build_brand_map, create_generic_atc_table,
+    build_multiword_generics, build_synonym_map, export_database, list_tables, load_generic_names,
+    load_lookup_snapshot, open_reference_db, read_data_fingerprint, reference_db_path,
+    source_files_fingerprint, table_source_sql,
+)
+from .result_cache import RESULT_CACHE_NAME, TagResultCache
+from .scoring import candidate_features, select_best_candidate, sort_atc_codes
 from .spinner import run_with_spinner
+from .stage_timing import StageTimer
 from .tokenizer import (
-    categorize_tokens, detect_compound_salts, extract_drug_details,
-    extract_generic_tokens, extract_form_detail, extract_release_detail,
-    extract_type_detail, normalize_tokens, split_with_parentheses,
-    strip_salt_suffix,
+    HELPER_MEMO_SIZE, analyze_generic_tokens, canonicalize_description, detect_compound_salts,
+    extract_drug_details, extract_release_and_form_detail, MultiwordScanner,
+    normalize_tokens, TokenAnalysis,
+    split_with_parentheses, strip_salt_suffix,
 )
 
 
@@ -66,56 +83,213 @@ DRUG_DETAILS_COLUMNS = [
 ]
 
 
-def _build_result_dict(
-    row_id: Any,
-    input_text: str,
-    row_idx: int,
-    drug_details: Dict[str, Any],
-    atc_code: Optional[str] = None,
-    drugbank_id: Optional[str] = None,
-    generic_name: Optional[str] = None,
-    reference_text: Optional[str] = None,
-    dose: Optional[str] = None,
-    form: Optional[str] = None,
-    route: Optional[str] = None,
-    type_details: Optional[str] = None,
-    release_details: Optional[str] = None,
-    form_details: Optional[str] = None,
-    match_score: int = 0,
-    match_reason: str = "no_match",
-    sources: Optional[str] = None,
-) -> Dict[str, Any]:
+# Tagger table name -> unified_* file basename (ingested on demand)
+_TABLE_FILES = {
+    "unified": "unified_generics",
+    "brands": "unified_brands",
+    "synonyms": "unified_synonyms",
+    "mixtures": "unified_mixtures",
+    "atc": "unified_atc",
+}
+
+# Tables indexed on generic_name after ingestion
+_TABLE_INDEXES = {
+    "unified": "idx_unified_generic",
+    "atc": "idx_atc_generic",
+}
+
+# Values returned for derived structures before load()
+_EMPTY_STRUCTURES = {
+    "synonyms": dict,
+    "brand_map": dict,
+    "cached_generics_list": list,
+    "multiword_generics": set,
+    "generic_resolution": dict,
+    "multiword_scanner": lambda: MultiwordScanner(()),
+    "generic_index": lambda: GenericIndex([]),
+    "fuzzy_matcher": lambda: FuzzyMatcher([]),
+    "mixture_index": lambda: MixtureIndex([]),
+}
+
+
+# drug_details fields that select_best_candidate reads for tie-breaking
+_SIGNATURE_DETAIL_FIELDS = (
+    "type_details", "release_details", "form_details", "indication_details", "salt_details",
+    "brand_details", "alias_details", "diluent_details", "iv_diluent_type",
+)
+
+
+# Tagger and inputs shared with forked tag_batch workers (inherited copy-on-write)
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def _init_tag_worker() -> None:
+    """Give each forked worker its own DuckDB handle on the inherited tagger."""
+    _WORKER_STATE["tagger"]._open_worker_connection(_WORKER_STATE["db_path"])
+
+
+def _tag_worker_chunk(bounds: tuple) -> tuple:
     """
-    Build a standardized result dict with all drug_details fields propagated.
+    Tag texts[start:end] of the shared inputs in a worker.
     
-    This ensures all extracted fields from extract_drug_details() are included
-    in every result, providing consistent output columns across all datasets.
+    Returns (results, stage timings of this chunk or None).
+    """
+    start, end = bounds
+    tagger = _WORKER_STATE["tagger"]
+    tagger.stage_timer.reset()
+    results = tagger._tag_batch(_WORKER_STATE["texts"][start:end], _WORKER_STATE["ids"][start:end])
+    return results, tagger.stage_timer if tagger.stage_timer.enabled else None
+
+
+def _merge_cached_results(
+    texts: List[str],
+    ids: List[Any],
+    tagged: "ResultColumns",
+    cached: Dict[str, Dict[str, Any]],
+    chunk_size: int,
+) -> "ResultColumns":
     """
-    result = {
-        "id": row_id,
-        "input_text": input_text,
-        "row_idx": row_idx,
-        "atc_code": atc_code,
-        "drugbank_id": drugbank_id,
-        "generic_name": generic_name,
-        "reference_text": reference_text,
-        "dose": dose,
-        "form": form,
-        "route": route,
-        "type_details": type_details or drug_details.get("type_details"),
-        "release_details": release_details or drug_details.get("release_details"),
-        "form_details": form_details or drug_details.get("form_details"),
-        "match_score": match_score,
-        "match_reason": match_reason,
-        "sources": sources,
-    }
+    Interleave freshly tagged and cached results back into input order.
     
-    # Add all drug_details fields
-    for col in DRUG_DETAILS_COLUMNS:
-        if col not in result:  # Don't overwrite if already set
-            result[col] = drug_details.get(col)
+    id and row_idx are reassigned as an uncached run would have produced them.
+    """
+    merged = ResultColumns()
+    fresh = 0
+    for text in texts:
+        if text in cached:
+            merged.append_row(cached[text])
+        else:
+            merged.append_from(tagged, fresh)
+            fresh += 1
+    merged.columns["id"] = list(ids)
+    merged.columns["row_idx"] = [k % chunk_size for k in range(len(texts))]
+    return merged
+
+
+def _fan_out_results(
+    raw_texts: List[str],
+    class_codes: Any,
+    class_results: "ResultColumns",
+    chunk_size: int,
+) -> "ResultColumns":
+    """
+    Expand one result per dedup class into one per original text.
     
-    return result
+    input_text keeps the original text; id and row_idx follow its position
+    among the unique texts.
+    """
+    results = class_results.take(class_codes)
+    results.columns["id"] = list(range(len(raw_texts)))
+    results.columns["input_text"] = list(raw_texts)
+    results.columns["row_idx"] = [k % chunk_size for k in range(len(raw_texts))]
+    return results
+
+
+# Output columns of tag_batch, in order (drug_details fields not set by the matcher last)
+RESULT_COLUMNS = [
+    "id", "input_text", "row_idx",
+    "atc_code", "drugbank_id", "generic_name", "reference_text",
+    "dose", "form", "route",
+    "type_details", "release_details", "form_details",
+    "match_score", "match_reason", "sources",
+]
+_DETAIL_ONLY_COLUMNS = [col for col in DRUG_DETAILS_COLUMNS if col not in RESULT_COLUMNS]
+RESULT_COLUMNS += _DETAIL_ONLY_COLUMNS
+
+
+class ResultColumns:
+    """
+    Column-oriented tagging results: one list per RESULT_COLUMNS entry.
+    
+    _tag_batch appends each row's fields straight into the column lists, so
+    no per-row dict is built and tag_batch hands the columns to pandas
+    directly; the result cache stores the columns as they are. Rows are
+    materialized as dicts only on demand (tag_single, result cache hits).
+    
+    Usage:
+        results = ResultColumns()
+        results.append(row_id, text, row_idx, drug_details, atc_code=..., ...)
+        df = results.to_frame()
+    """
+    
+    def __init__(self, columns: Optional[Dict[str, List[Any]]] = None):
+        self.columns: Dict[str, List[Any]] = columns if columns is not None else {col: [] for col in RESULT_COLUMNS}
+    
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+    
+    def append(
+        self,
+        row_id: Any,
+        input_text: str,
+        row_idx: int,
+        drug_details: Dict[str, Any],
+        atc_code: Optional[str] = None,
+        drugbank_id: Optional[str] = None,
+        generic_name: Optional[str] = None,
+        reference_text: Optional[str] = None,
+        dose: Optional[str] = None,
+        form: Optional[str] = None,
+        route: Optional[str] = None,
+        type_details: Optional[str] = None,
+        release_details: Optional[str] = None,
+        form_details: Optional[str] = None,
+        match_score: int = 0,
+        match_reason: str = "no_match",
+        sources: Optional[str] = None,
+    ) -> None:
+        """
+        Append one result with all drug_details fields propagated.
+        
+        This ensures all extracted fields from extract_drug_details() are included
+        in every result, providing consistent output columns across all datasets.
+        """
+        columns = self.columns
+        columns["id"].append(row_id)
+        columns["input_text"].append(input_text)
+        columns["row_idx"].append(row_idx)
+        columns["atc_code"].append(atc_code)
+        columns["drugbank_id"].append(drugbank_id)
+        columns["generic_name"].append(generic_name)
+        columns["reference_text"].append(reference_text)
+        columns["dose"].append(dose)
+        columns["form"].append(form)
+        columns["route"].append(route)
+        columns["type_details"].append(type_details or drug_details.get("type_details"))
+        columns["release_details"].append(release_details or drug_details.get("release_details"))
+        columns["form_details"].append(form_details or drug_details.get("form_details"))
+        columns["match_score"].append(match_score)
+        columns["match_reason"].append(match_reason)
+        columns["sources"].append(sources)
+        for col in _DETAIL_ONLY_COLUMNS:
+            columns[col].append(drug_details.get(col))
+    
+    def append_row(self, row: Dict[str, Any]) -> None:
+        """Append a result dict (as returned by row())."""
+        for col, values in self.columns.items():
+            values.append(row.get(col))
+    
+    def append_from(self, other: "ResultColumns", k: int) -> None:
+        """Append row k of another ResultColumns."""
+        for col, values in self.columns.items():
+            values.append(other.columns[col][k])
+    
+    def extend(self, other: "ResultColumns") -> None:
+        for col, values in self.columns.items():
+            values.extend(other.columns[col])
+    
+    def take(self, indices: Iterable[int]) -> "ResultColumns":
+        """New ResultColumns with rows at the given positions (repeats allowed)."""
+        indices = list(indices)
+        return ResultColumns({
+            col: [values[k] for k in indices] for col, values in self.columns.items()
+        })
+    
+    def row(self, k: int) -> Dict[str, Any]:
+        return {col: values[k] for col, values in self.columns.items()}
+    
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns)
 
 
 class UnifiedTagger:
@@ -134,170 +308,317 @@ class UnifiedTagger:
         outputs_dir: Optional[Path] = None,
         inputs_dir: Optional[Path] = None,
         verbose: bool = False,
+        lookup_cache_size: int = 100_000,
+        profile_stages: bool = False,
+        resolution_cache_size: int = 100_000,
     ):
+        """
+        Args:
+            outputs_dir: Directory with unified_* reference files
+            inputs_dir: Directory with raw inputs
+            verbose: Log loading progress
+            lookup_cache_size: Max tokens kept in the cross-chunk generic
+                lookup cache (0 disables caching)
+            profile_stages: Time each tagging stage into stage_timer;
+                tag_batch then prints a per-stage breakdown
+            resolution_cache_size: Max molecule signatures whose generic/ATC
+                resolution is kept across chunks and calls (0 resolves every
+                description on its own)
+        """
         self.outputs_dir = Path(outputs_dir or os.environ.get("PIPELINE_OUTPUTS_DIR", OUTPUTS_DIR))
         self.inputs_dir = Path(inputs_dir or os.environ.get("PIPELINE_INPUTS_DIR", INPUTS_DIR))
         self.verbose = verbose
         
         self.con: Optional[duckdb.DuckDBPyConnection] = None
-        self.synonyms: Dict[str, str] = {}
-        self.brand_map: Dict[str, str] = {}
-        self.multiword_generics: Set[str] = set()
-        self.cached_generics_list: List[str] = []
+        # Derived lookup structures, materialized on first access
+        # (synonyms, brand_map, cached_generics_list, multiword_generics,
+        # generic_index, fuzzy_matcher, mixture_index)
+        self._structures: Dict[str, Any] = {}
+        self._snapshot_pending = False
+        # Tables present on self.con / known to be unavailable
+        self._tables: Set[str] = set()
+        self._missing_tables: Set[str] = set()
+        self._attached = False
+        self._db_path: Optional[Path] = None
         self._loaded = False
+        # Token -> generic matches, shared across chunks and calls
+        self.lookup_cache = GenericLookupCache(max_size=lookup_cache_size)
+        # Generic match -> scoring candidates with precomputed features
+        self._candidate_cache: Dict[tuple, List[Dict[str, Any]]] = {}
+        # Memoized synonym/brand resolution, cleared whenever the maps change
+        self._synonym_memo = lru_cache(maxsize=HELPER_MEMO_SIZE)(
+            lambda generic: apply_synonym(generic, self.synonyms)
+        )
+        self._brand_memo = lru_cache(maxsize=HELPER_MEMO_SIZE)(
+            lambda token: swap_brand_to_generic(token, self.brand_map)
+        )
+        # Generic token -> (salt-stripped base, canonical generic)
+        self._generic_memo = lru_cache(maxsize=HELPER_MEMO_SIZE)(self._resolve_generic_uncached)
+        # Molecule signature -> generic/ATC resolution (see _resolution_signature)
+        self._resolution_cache_size = resolution_cache_size
+        self._resolution_cache: Dict[tuple, tuple] = {}
+        self._resolution_stats = {"hits": 0, "misses": 0}
+        self._result_cache: Optional[TagResultCache] = None
+        # Seconds per tagging stage, summed across chunks and calls
+        self.stage_timer = StageTimer(enabled=profile_stages)
     
     def _log(self, msg: str) -> None:
         if self.verbose:
             print(f"[UnifiedTagger] {msg}")
     
+    def _attach_reference_db(self, db_path: Path) -> bool:
+        """
+        Attach the prebuilt unified_reference.duckdb read-only.
+        
+        Returns False (and detaches) if the database predates a required table.
+        """
+        con = open_reference_db(db_path)
+        tables = list_tables(con)
+        missing = {"unified", GENERIC_ATC_TABLE} - tables
+        if missing:
+            con.close()
+            self._log(f"  - {db_path.name} lacks {', '.join(sorted(missing))}; using table files")
+            return False
+        self.con = con
+        self._tables = tables
+        self._attached = True
+        self._db_path = db_path
+        self._log(f"  - attached {db_path.name} ({len(tables)} tables)")
+        return True
+    
+    def _ensure_table(self, name: str) -> bool:
+        """
+        Materialize a reference table on first use.
+        
+        With the prebuilt database attached every table is already present;
+        otherwise the table is ingested from its Parquet (or CSV) file.
+        Returns False if the table is unavailable.
+        """
+        if name in self._tables:
+            return True
+        if self._attached or name in self._missing_tables or self.con is None:
+            return False
+        
+        if name == GENERIC_ATC_TABLE:
+            # Derived join table: built from unified + atc
+            if not (self._ensure_table("unified") and self._ensure_table("atc")):
+                self._missing_tables.add(name)
+                return False
+            create_generic_atc_table(self.con)
+            self._tables.add(name)
+            return True
+        
+        source = table_source_sql(self.outputs_dir, _TABLE_FILES[name])
+        if source is None:
+            self._missing_tables.add(name)
+            return False
+        
+        self.con.execute(f"CREATE TABLE {name} AS SELECT * FROM {source}")
+        if name in _TABLE_INDEXES:
+            self.con.execute(
+                f"CREATE INDEX IF NOT EXISTS {_TABLE_INDEXES[name]} ON {name}(generic_name)"
+            )
+        self._tables.add(name)
+        
+        # Counts exist only for logging
+        if self.verbose:
+            count = self.con.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+            if name == "unified":
+                unique_generics = self.con.execute(
+                    "SELECT COUNT(DISTINCT generic_name) FROM unified"
+                ).fetchone()[0]
+                self._log(f"  - {_TABLE_FILES[name]}: {count:,} rows ({unique_generics:,} unique)")
+            else:
+                self._log(f"  - {_TABLE_FILES[name]}: {count:,} rows")
+        return True
+    
     def load(self) -> None:
-        """Load unified_* reference tables into DuckDB."""
+        """
+        Prepare reference data access.
+        
+        Attaches unified_reference.duckdb when available, otherwise opens an
+        in-memory DuckDB that ingests unified_* files on demand. Tables and
+        derived lookup structures materialize the first time they are needed.
+        """
         if self._loaded:
             return
         
         self._log("Loading unified_* tables...")
         
-        # Create in-memory DuckDB
-        self.con = duckdb.connect(":memory:")
-        
-        # Load unified_generics (main reference) - CSV is canonical format
-        generics_path = self.outputs_dir / "unified_generics.csv"
-        if not generics_path.exists():
-            raise FileNotFoundError(f"unified_generics.csv not found: {generics_path}")
-        self.con.execute(f"CREATE TABLE unified AS SELECT * FROM read_csv_auto('{generics_path}')")
-        # Create index for faster lookups
-        self.con.execute("CREATE INDEX IF NOT EXISTS idx_unified_generic ON unified(generic_name)")
-        count = self.con.execute("SELECT COUNT(*) FROM unified").fetchone()[0]
-        unique_generics = self.con.execute("SELECT COUNT(DISTINCT generic_name) FROM unified").fetchone()[0]
-        self._log(f"  - unified_generics: {count:,} rows ({unique_generics:,} unique)")
-        
-        # Load unified_brands
-        brands_path = self.outputs_dir / "unified_brands.csv"
-        if brands_path.exists():
-            self.con.execute(f"CREATE TABLE brands AS SELECT * FROM read_csv_auto('{brands_path}')")
-            brand_count = self.con.execute("SELECT COUNT(*) FROM brands").fetchone()[0]
-            self._log(f"  - unified_brands: {brand_count:,} rows")
-        
-        # Load unified_synonyms
-        synonyms_path = self.outputs_dir / "unified_synonyms.csv"
-        if synonyms_path.exists():
-            self.con.execute(f"CREATE TABLE synonyms AS SELECT * FROM read_csv_auto('{synonyms_path}')")
-            syn_count = self.con.execute("SELECT COUNT(*) FROM synonyms").fetchone()[0]
-            self._log(f"  - unified_synonyms: {syn_count:,} rows")
-        
-        # Load unified_mixtures (queried on-demand for multi-generic inputs)
-        mixtures_path = self.outputs_dir / "unified_mixtures.csv"
-        self._mixtures_loaded = False
-        if mixtures_path.exists():
-            self.con.execute(f"CREATE TABLE mixtures AS SELECT * FROM read_csv_auto('{mixtures_path}')")
-            mix_count = self.con.execute("SELECT COUNT(*) FROM mixtures").fetchone()[0]
-            self._log(f"  - unified_mixtures: {mix_count:,} rows")
-            self._mixtures_loaded = True
-        
-        # Load unified_atc (for ATC selection with form/route/dose)
-        atc_path = self.outputs_dir / "unified_atc.csv"
-        self._atc_loaded = False
-        if atc_path.exists():
-            self.con.execute(f"CREATE TABLE atc AS SELECT * FROM read_csv_auto('{atc_path}')")
-            self.con.execute("CREATE INDEX IF NOT EXISTS idx_atc_generic ON atc(generic_name)")
-            atc_count = self.con.execute("SELECT COUNT(*) FROM atc").fetchone()[0]
-            self._log(f"  - unified_atc: {atc_count:,} rows")
-            self._atc_loaded = True
-        
-        # Build synonyms dict from unified_synonyms table + spelling corrections + regional
-        from .unified_constants import SPELLING_SYNONYMS, REGIONAL_TO_US
-        self.synonyms = dict(SPELLING_SYNONYMS)
-        
-        # Add regional→US mappings (PARACETAMOL → ACETAMINOPHEN for lookups)
-        for regional, us in REGIONAL_TO_US.items():
-            self.synonyms[regional] = us
-        
-        # Parse unified_synonyms (format: drugbank_id, generic_name, synonyms pipe-separated)
-        try:
-            synonym_rows = self.con.execute("""
-                SELECT generic_name, synonyms FROM synonyms
-                WHERE synonyms IS NOT NULL AND synonyms != ''
-            """).fetchall()
-            for generic_name, synonyms_str in synonym_rows:
-                if generic_name and synonyms_str:
-                    generic_upper = generic_name.upper()
-                    for syn in synonyms_str.split('|'):
-                        syn = syn.strip().upper()
-                        if syn and syn != generic_upper:
-                            self.synonyms[syn] = generic_upper
-        except Exception:
-            pass
-        self._log(f"  - synonym mappings: {len(self.synonyms):,}")
-        
-        # Build brand → generic map from unified_brands table
-        self.brand_map = {}
-        all_generics = set(row[0].upper() for row in self.con.execute(
-            "SELECT DISTINCT generic_name FROM unified"
-        ).fetchall())
-        
-        # Also check synonyms that map to generics (e.g., ASPIRIN -> ACETYLSALICYLIC ACID)
-        from .unified_constants import SPELLING_SYNONYMS
-        synonym_generics = set(k.upper() for k in SPELLING_SYNONYMS.keys())
-        
-        try:
-            # Count rows per generic to prefer more common associations
-            brand_rows = self.con.execute("""
-                SELECT brand_name, generic_name, COUNT(*) as cnt
-                FROM brands
-                GROUP BY brand_name, generic_name
-                ORDER BY cnt DESC
-            """).fetchall()
-            for brand, generic, _ in brand_rows:
-                if brand and generic:
-                    brand_upper = brand.upper()
-                    generic_upper = generic.upper()
-                    
-                    # FDA often swaps brand/generic - if brand_name is a known generic,
-                    # treat it as the generic and use generic_name as the brand
-                    if brand_upper in all_generics or brand_upper in synonym_generics:
-                        # Swap: the "brand" is actually a generic, "generic" is the brand
-                        if generic_upper not in all_generics and generic_upper not in self.brand_map:
-                            self.brand_map[generic_upper] = brand_upper
-                    elif brand_upper not in self.brand_map:
-                        self.brand_map[brand_upper] = generic_upper
-        except Exception:
-            pass
-        self._log(f"  - brand mappings: {len(self.brand_map):,}")
-        
-        # Cache generics list for fuzzy matching
-        self.cached_generics_list = [row[0] for row in self.con.execute(
-            "SELECT DISTINCT generic_name FROM unified WHERE generic_name IS NOT NULL"
-        ).fetchall()]
-        
-        # Build multiword generics set from data + constants
-        from .unified_constants import MULTIWORD_GENERICS
-        
-        self.multiword_generics = set()
-        for name in self.cached_generics_list:
-            if " " in str(name):
-                self.multiword_generics.add(str(name).upper())
-        
-        # Add multiword generics from unified_constants.py
-        self.multiword_generics.update(MULTIWORD_GENERICS)
-        
-        # Add plural forms of multiword generics for detection
-        plural_forms = set()
-        for mw in self.multiword_generics:
-            words = mw.split()
-            if words and not words[0].endswith("S"):
-                plural_first = words[0] + "S"
-                plural_forms.add(" ".join([plural_first] + words[1:]))
-        self.multiword_generics.update(plural_forms)
+        db_path = reference_db_path(self.outputs_dir)
+        if db_path is not None and self._attach_reference_db(db_path):
+            # Prebuilt lookup structures are only valid against the database
+            self._snapshot_pending = True
+        else:
+            if table_source_sql(self.outputs_dir, "unified_generics") is None:
+                raise FileNotFoundError(
+                    f"unified_generics.parquet/.csv not found in: {self.outputs_dir}"
+                )
+            # Create in-memory DuckDB
+            self.con = duckdb.connect(":memory:")
         
         self._loaded = True
+        # Anything resolved against the empty pre-load maps is stale now
+        self._clear_map_memos()
         self._log("Reference data loaded.")
     
+    def _structure(self, key: str) -> Any:
+        """Return a derived lookup structure, building it on first access."""
+        if key in self._structures:
+            return self._structures[key]
+        if self.con is None:
+            return _EMPTY_STRUCTURES[key]()
+        
+        if self._snapshot_pending:
+            self._snapshot_pending = False
+            snapshot = load_lookup_snapshot(self.outputs_dir, self.con, log=self._log)
+            if snapshot is not None:
+                for name, value in snapshot.items():
+                    self._structures.setdefault(name, value)
+                self._log(f"  - loaded {SNAPSHOT_NAME}")
+                if key in self._structures:
+                    return self._structures[key]
+        
+        if key == "synonyms":
+            self._ensure_table("synonyms")
+            value = build_synonym_map(self.con)
+            self._log(f"  - synonym mappings: {len(value):,}")
+        elif key == "brand_map":
+            self._ensure_table("unified")
+            self._ensure_table("brands")
+            value = build_brand_map(self.con)
+            self._log(f"  - brand mappings: {len(value):,}")
+        elif key == "cached_generics_list":
+            self._ensure_table("unified")
+            value = load_generic_names(self.con)
+        elif key == "generic_index":
+            self._ensure_table(GENERIC_ATC_TABLE)
+            value = GenericIndex.from_connection(self.con)
+            self._log(f"  - generic index: {len(value):,} names")
+        elif key == "fuzzy_matcher":
+            value = FuzzyMatcher(self.cached_generics_list, threshold=85)
+        elif key == "multiword_scanner":
+            value = MultiwordScanner(self.multiword_generics)
+        elif key == "generic_resolution":
+            value = build_generic_resolution(
+                self.cached_generics_list, self.synonyms, self.brand_map, self.multiword_generics,
+            )
+        elif key == "mixture_index":
+            self._ensure_table("mixtures")
+            value = MixtureIndex.from_connection(self.con)
+            self._log(f"  - mixture index: {len(value):,} component keys")
+        else:
+            value = build_multiword_generics(self.cached_generics_list)
+        self._structures[key] = value
+        return value
+    
+    @property
+    def synonyms(self) -> Dict[str, str]:
+        return self._structure("synonyms")
+    
+    @synonyms.setter
+    def synonyms(self, value: Dict[str, str]) -> None:
+        self._structures["synonyms"] = value
+        self._structures.pop("generic_resolution", None)
+        # Cached matches and candidate features depend on synonym mapping
+        self.lookup_cache.clear()
+        self._clear_map_memos()
+    
+    @property
+    def brand_map(self) -> Dict[str, str]:
+        return self._structure("brand_map")
+    
+    @brand_map.setter
+    def brand_map(self, value: Dict[str, str]) -> None:
+        self._structures["brand_map"] = value
+        self._clear_map_memos()
+    
+    @property
+    def cached_generics_list(self) -> List[str]:
+        return self._structure("cached_generics_list")
+    
+    @cached_generics_list.setter
+    def cached_generics_list(self, value: List[str]) -> None:
+        self._structures["cached_generics_list"] = value
+        # Fuzzy matches (and everything resolved from them) used the old list
+        self._structures.pop("fuzzy_matcher", None)
+        self.lookup_cache.clear()
+        self._resolution_cache.clear()
+    
+    @property
+    def multiword_generics(self) -> Set[str]:
+        return self._structure("multiword_generics")
+    
+    @multiword_generics.setter
+    def multiword_generics(self, value: Set[str]) -> None:
+        self._structures["multiword_generics"] = value
+        self._structures.pop("multiword_scanner", None)
+        # Multiword generics are never salt-stripped
+        self._structures.pop("generic_resolution", None)
+        self._generic_memo.cache_clear()
+        self._resolution_cache.clear()
+    
+    @property
+    def generic_resolution(self) -> Dict[str, tuple]:
+        """Known reference surface form -> (base, canonical), see build_generic_resolution."""
+        return self._structure("generic_resolution")
+    
+    @property
+    def multiword_scanner(self) -> MultiwordScanner:
+        """Automaton over multiword_generics shared by every extract_generic_tokens call."""
+        return self._structure("multiword_scanner")
+    
+    @property
+    def generic_index(self) -> GenericIndex:
+        """In-memory unified+atc index used for exact/synonym/fuzzy lookups."""
+        return self._structure("generic_index")
+    
+    @property
+    def fuzzy_matcher(self) -> FuzzyMatcher:
+        """Batched fuzzy matcher over cached_generics_list (threshold 85)."""
+        return self._structure("fuzzy_matcher")
+    
+    @property
+    def mixture_index(self) -> MixtureIndex:
+        """In-memory mixtures index keyed by component_key and uppercase mixture_name."""
+        return self._structure("mixture_index")
+    
+    @property
+    def result_cache(self) -> Optional[TagResultCache]:
+        """On-disk tagging result cache for the loaded reference data (None before load)."""
+        if self._result_cache is None and self.con is not None:
+            fingerprint = read_data_fingerprint(self.con) if self._attached else None
+            self._result_cache = TagResultCache(
+                self.outputs_dir / RESULT_CACHE_NAME,
+                fingerprint or source_files_fingerprint(self.outputs_dir),
+                RESULT_COLUMNS,
+            )
+        return self._result_cache
+    
     def _apply_synonyms(self, generic: str) -> str:
-        return apply_synonym(generic, self.synonyms)
+        return self._synonym_memo(generic)
     
     def _swap_brand(self, token: str) -> tuple:
         """Swap brand to generic if found in brand_map."""
-        return swap_brand_to_generic(token, self.brand_map)
+        return self._brand_memo(token)
+    
+    def _clear_map_memos(self) -> None:
+        """Drop everything memoized against the synonym or brand map."""
+        self._synonym_memo.cache_clear()
+        self._brand_memo.cache_clear()
+        self._generic_memo.cache_clear()
+        self._candidate_cache.clear()
+        self._resolution_cache.clear()
+    
+    def helper_memo_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters and sizes of the memoized string helpers."""
+        return {
+            "apply_synonym": memo_stats(self._synonym_memo),
+            "swap_brand_to_generic": memo_stats(self._brand_memo),
+            "resolve_generic": memo_stats(self._generic_memo),
+            "molecule_signature": dict(self._resolution_stats, size=len(self._resolution_cache)),
+            **helper_memo_stats(),
+        }
     
     def _strip_salt(self, generic: str) -> tuple:
         # Don't strip from known multiword generics (e.g., ISOSORBIDE DINITRATE)
@@ -306,10 +627,82 @@ class UnifiedTagger:
             return generic_upper, None
         return strip_salt_suffix(generic)
     
+    def _resolve_generic(self, generic: str) -> tuple:
+        """
+        (base, canonical) for a brand-swapped generic token: pure salt
+        compounds are kept whole, anything else is salt-stripped and mapped
+        through the (chain-resolved) synonym map. Reference surface forms are
+        read from the precomputed generic_resolution table; other tokens are
+        resolved once and memoized.
+        """
+        resolved = self.generic_resolution.get(generic)
+        if resolved is not None:
+            return resolved
+        return self._generic_memo(generic)
+    
+    def _resolve_generic_uncached(self, generic: str) -> tuple:
+        generic_upper = generic.upper()
+        if generic_upper in PURE_SALT_COMPOUNDS:
+            return generic_upper, generic_upper
+        base, _ = self._strip_salt(generic)
+        return base, self._apply_synonyms(base)
+    
+    @staticmethod
+    def _resolution_signature(
+        text: str,
+        generic_tokens: List[str],
+        drug_details: Dict[str, Any],
+        categories: Dict[str, Dict[str, int]],
+    ) -> tuple:
+        """
+        Everything _tag_batch reads to resolve a description to a generic and
+        ATC code. Doses are not part of it, so descriptions that differ only
+        in strength or pack size share one resolution.
+        """
+        return (
+            tuple(generic_tokens),
+            tuple(drug_details["_clean_tokens"]),
+            "+" in text,
+            " IN " in text.upper(),
+            frozenset(categories.get(CATEGORY_FORM, ())),
+            tuple(drug_details.get(field) for field in _SIGNATURE_DETAIL_FIELDS),
+            drug_details.get("generic_name") if drug_details.get("_is_vaccine") else None,
+        )
+    
+    def _candidates_for(self, match: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Scoring candidates for a generic match: one per ATC code (single-agent
+        codes first), or one without ATC for DrugBank-only entries such as
+        mixtures. Built once per distinct match and shared read-only by rows.
+        """
+        key = tuple(match.get(field) for field in ("generic_name", "drugbank_id", "atc_code", "reference_text", "source"))
+        candidates = self._candidate_cache.get(key)
+        if candidates is not None:
+            return candidates
+        
+        atc_codes = sort_atc_codes(str(match.get("atc_code", "")).split("|"))
+        if not atc_codes and match.get("drugbank_id"):
+            # This allows matching combination drugs that don't have specific ATC codes
+            atc_codes = [None]
+        candidates = []
+        for atc in atc_codes:
+            candidate = {
+                "atc_code": atc,
+                "drugbank_id": match.get("drugbank_id"),
+                "generic_name": match.get("generic_name"),
+                "reference_text": match.get("reference_text"),
+                "source": match.get("source"),
+                "form": None,
+                "route": None,
+                "doses": None,
+            }
+            candidate["_features"] = candidate_features(candidate, self._apply_synonyms)
+            candidates.append(candidate)
+        self._candidate_cache[key] = candidates
+        return candidates
+    
     def _lookup_mixture(self, generics: List[str]) -> Optional[Dict[str, Any]]:
-        """Look up a mixture by its component generics using component_key index."""
-        if not self._mixtures_loaded:
-            return None
+        """Look up a mixture by its component generics using the component_key map."""
         
         # Filter out junk tokens like "+" and tokens starting with "+"
         junk = {"+", "MG", "ML", "MCG", "G", "L", ""}
@@ -334,28 +727,19 @@ class UnifiedTagger:
         component_key = '|'.join(sorted(unique))
         
         # Fast lookup by component_key
-        try:
-            rows = self.con.execute("""
-                SELECT drugbank_id, mixture_name, component_generics
-                FROM mixtures
-                WHERE component_key = ?
-                LIMIT 1
-            """, [component_key]).fetchall()
-            
-            if rows:
-                drugbank_id, mixture_name, component_generics = rows[0]
-                # Use uppercase for display name
-                display_name = ' + '.join(sorted([n.upper() for n in unique]))
-                return {
-                    'drugbank_id': drugbank_id,
-                    'generic_name': display_name,
-                    'mixture_name': mixture_name,
-                    'atc_code': None,
-                    'source': 'drugbank_mixture',
-                    'reference_text': component_generics,
-                }
-        except Exception:
-            pass
+        row = self.mixture_index.by_components(component_key)
+        if row:
+            drugbank_id, mixture_name, component_generics = row
+            # Use uppercase for display name
+            display_name = ' + '.join(sorted([n.upper() for n in unique]))
+            return {
+                'drugbank_id': drugbank_id,
+                'generic_name': display_name,
+                'mixture_name': mixture_name,
+                'atc_code': None,
+                'source': 'drugbank_mixture',
+                'reference_text': component_generics,
+            }
         
         return None
     
@@ -365,7 +749,7 @@ class UnifiedTagger:
             self.load()
         
         results = self._tag_batch([text], [0])
-        return results[0] if results else {
+        return results.row(0) if len(results) else {
             "atc_code": None,
             "drugbank_id": None,
             "generic_name": None,
@@ -395,8 +779,7 @@ class UnifiedTagger:
         else:
             ids = list(range(len(df)))
         
-        results = self._tag_batch(texts, ids)
-        return pd.DataFrame(results)
+        return self._tag_batch(texts, ids).to_frame()
     
     def tag_batch(
         self,
@@ -406,6 +789,8 @@ class UnifiedTagger:
         chunk_size: int = 10000,
         show_progress: bool = True,
         deduplicate: bool = True,
+        workers: Optional[int] = 1,
+        use_result_cache: bool = False,
     ) -> pd.DataFrame:
         """
         Tag descriptions in a DataFrame using chunked processing.
@@ -413,13 +798,23 @@ class UnifiedTagger:
         Processes data in chunks of `chunk_size` rows for better memory
         efficiency and progress reporting on large datasets.
         
+        With workers > 1, reference data is loaded once and chunks are tagged
+        in forked processes that share the tagger's structures copy-on-write.
+        Results keep input order. Falls back to serial where fork is unavailable.
+        
         Args:
             df: Input DataFrame
             text_column: Column containing drug descriptions
             id_column: Optional column for row IDs
             chunk_size: Number of rows per chunk (default 10K)
             show_progress: Whether to print progress updates
-            deduplicate: If True, deduplicate by text_column before tagging (default True)
+            deduplicate: If True, tag the first text of each dedup class of
+                text_column once (see canonicalize_description) and fan the
+                result out to every unique text (default True)
+            workers: Worker processes (default 1 = serial; None = size by
+                workload; ESOA_MAX_WORKERS overrides both)
+            use_result_cache: Reuse results for texts tagged in earlier runs
+                against the same reference data and code (see result_cache)
         
         Returns:
             DataFrame with tagging results
@@ -433,12 +828,22 @@ class UnifiedTagger:
         if original_rows == 0:
             return pd.DataFrame()
         
+        timer = self.stage_timer
+        
         # Deduplicate by text column to avoid redundant work
+        class_codes = None
         if deduplicate:
+            t0 = timer.clock()
             unique_texts = df[[text_column]].drop_duplicates()
-            total_rows = len(unique_texts)
-            texts = unique_texts[text_column].fillna("").astype(str).tolist()
+            raw_texts = unique_texts[text_column].fillna("").astype(str).tolist()
+            # Tag the first text of each dedup class once (fanned back out below)
+            class_codes, _ = pd.factorize(
+                pd.Series([canonicalize_description(t) for t in raw_texts], dtype=object)
+            )
+            texts = [raw_texts[k] for k in pd.Series(class_codes).drop_duplicates().index]
+            total_rows = len(texts)
             ids = list(range(total_rows))
+            timer.add("canonicalize", timer.clock() - t0, len(raw_texts))
         else:
             total_rows = original_rows
             texts = df[text_column].fillna("").astype(str).tolist()
@@ -447,44 +852,75 @@ class UnifiedTagger:
             else:
                 ids = list(range(total_rows))
         
+        # Only tag texts without a persisted result
+        all_texts, all_ids = texts, ids
+        cached_results: Dict[str, Dict[str, Any]] = {}
+        if use_result_cache and self.result_cache is not None:
+            t0 = timer.clock()
+            cached_results = self.result_cache.get_many(texts)
+            if cached_results:
+                pending = [k for k, text in enumerate(texts) if text not in cached_results]
+                texts = [all_texts[k] for k in pending]
+                ids = [all_ids[k] for k in pending]
+                total_rows = len(texts)
+            timer.add("result_cache", timer.clock() - t0, len(all_texts))
+        
         # Process in chunks
-        all_results = []
+        all_results = ResultColumns()
         num_chunks = (total_rows + chunk_size - 1) // chunk_size
         start_time = time.time()
         last_rate: float = 0.0  # rows/s from previous chunk
         
-        for i in range(0, total_rows, chunk_size):
-            chunk_num = i // chunk_size + 1
-            end_idx = min(i + chunk_size, total_rows)
-            
-            chunk_texts = texts[i:end_idx]
-            chunk_ids = ids[i:end_idx]
-            
-            if show_progress:
-                rows_in_chunk = len(chunk_texts)
-                est_time = rows_in_chunk / last_rate if last_rate > 0 else 0.0
+        if workers != 1:
+            workers = min(resolve_worker_count(explicit=workers, task_size=total_rows), num_chunks)
+            if "fork" not in multiprocessing.get_all_start_methods():
+                workers = 1
+        
+        if workers > 1:
+            bounds = [(i, min(i + chunk_size, total_rows)) for i in range(0, total_rows, chunk_size)]
+            all_results = self._tag_chunks_parallel(texts, ids, bounds, workers, show_progress)
+        else:
+            for i in range(0, total_rows, chunk_size):
+                chunk_num = i // chunk_size + 1
+                end_idx = min(i + chunk_size, total_rows)
                 
-                def make_label(elapsed: float, n: int = rows_in_chunk, c: int = chunk_num, t: int = num_chunks, est: float = est_time) -> str:
-                    if est > 0:
-                        eta = est - elapsed
-                        return f"Chunk {c:02d}/{t:02d} (ETA {eta:7.2f}s)"
-                    return f"Chunk {c:02d}/{t:02d}"
+                chunk_texts = texts[i:end_idx]
+                chunk_ids = ids[i:end_idx]
                 
-                completion = lambda elapsed, n=rows_in_chunk, c=chunk_num, t=num_chunks: f"Chunk {c:02d}/{t:02d}: {n/elapsed:,.0f} rows/s"
-                chunk_results = run_with_spinner(
-                    make_label,
-                    lambda t=chunk_texts, ids=chunk_ids: self._tag_batch(t, ids),
-                    completion_label=completion,
-                )
-                # Update rate for next chunk's ETA
-                chunk_time = time.time() - start_time - sum(r.get("_elapsed", 0) for r in all_results[:i] if isinstance(r, dict))
-            else:
-                chunk_results = self._tag_batch(chunk_texts, chunk_ids)
-            all_results.extend(chunk_results)
-            # Track rate after each chunk
-            elapsed_so_far = time.time() - start_time
-            rows_so_far = end_idx
-            last_rate = rows_so_far / elapsed_so_far if elapsed_so_far > 0 else 0
+                if show_progress:
+                    rows_in_chunk = len(chunk_texts)
+                    est_time = rows_in_chunk / last_rate if last_rate > 0 else 0.0
+                    
+                    def make_label(elapsed: float, n: int = rows_in_chunk, c: int = chunk_num, t: int = num_chunks, est: float = est_time) -> str:
+                        if est > 0:
+                            eta = est - elapsed
+                            return f"Chunk {c:02d}/{t:02d} (ETA {eta:7.2f}s)"
+                        return f"Chunk {c:02d}/{t:02d}"
+                    
+                    completion = lambda elapsed, n=rows_in_chunk, c=chunk_num, t=num_chunks: f"Chunk {c:02d}/{t:02d}: {n/elapsed:,.0f} rows/s"
+                    chunk_results = run_with_spinner(
+                        make_label,
+                        lambda t=chunk_texts, ids=chunk_ids: self._tag_batch(t, ids),
+                        completion_label=completion,
+                    )
+                else:
+                    chunk_results = self._tag_batch(chunk_texts, chunk_ids)
+                all_results.extend(chunk_results)
+                # Track rate after each chunk
+                elapsed_so_far = time.time() - start_time
+                rows_so_far = end_idx
+                last_rate = rows_so_far / elapsed_so_far if elapsed_so_far > 0 else 0
+        
+        if use_result_cache and self.result_cache is not None:
+            t0 = timer.clock()
+            self.result_cache.put_many(all_results.columns)
+            all_results = _merge_cached_results(all_texts, all_ids, all_results, cached_results, chunk_size)
+            timer.add("result_cache", timer.clock() - t0, 0)
+        
+        if class_codes is not None:
+            t0 = timer.clock()
+            all_results = _fan_out_results(raw_texts, class_codes, all_results, chunk_size)
+            timer.add("fan_out", timer.clock() - t0, len(raw_texts))
         
         total_time = time.time() - start_time
         if show_progress:
@@ -493,8 +929,155 @@ class UnifiedTagger:
                 f"⣿ {total_time:7.2f}s "
                 f"Total: {total_rows:,} rows ({rate:.0f} rows/s)"
             )
+            if class_codes is not None and len(raw_texts) != len(all_texts):
+                print(f"  Dedup: {len(raw_texts):,} unique texts -> {len(all_texts):,} classes")
+            if cached_results:
+                print(f"  Result cache: {len(all_texts) - total_rows:,} of {len(all_texts):,} rows reused")
+            cache_stats = self.lookup_cache.stats()
+            if cache_stats["hits"] or cache_stats["misses"]:
+                print(
+                    f"  Lookup cache: {cache_stats['hits']:,} hits "
+                    f"({cache_stats['negative_hits']:,} negative), "
+                    f"{cache_stats['misses']:,} misses, {cache_stats['size']:,} entries"
+                )
+            memo_hits = memo_misses = 0
+            for stats in self.helper_memo_stats().values():
+                memo_hits += stats["hits"]
+                memo_misses += stats["misses"]
+            if memo_hits or memo_misses:
+                print(
+                    f"  Helper memos: {memo_hits:,} hits, {memo_misses:,} misses "
+                    f"({100 * memo_hits / (memo_hits + memo_misses):.1f}% hit rate)"
+                )
+            fuzzy_stats = self.fuzzy_matcher.stats()
+            if fuzzy_stats["queries"]:
+                print(
+                    f"  Fuzzy: {fuzzy_stats['queries']:,} tokens, "
+                    f"{fuzzy_stats['comparisons']:,} comparisons "
+                    f"({fuzzy_stats['skipped_comparisons']:,} skipped by length/character bounds)"
+                )
+            if timer.seconds:
+                print("  Stage timings (all calls on this tagger):")
+                for line in timer.table(indent="    "):
+                    print(line)
+        
+        return all_results.to_frame()
+    
+    def tag_stream(
+        self,
+        batches: Iterable[Any],
+        text_column: str,
+        id_column: Optional[str] = None,
+        chunk_size: int = 10000,
+        deduplicate: bool = True,
+        use_result_cache: bool = False,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Tag a stream of input batches, yielding one result frame per chunk.
+        
+        Only one chunk of input and results is held at a time, so callers
+        can write each frame out as it arrives. Deduplication is per chunk;
+        repeats across chunks are served by the lookup (and result) caches.
         
-        return pd.DataFrame(all_results)
+        Args:
+            batches: Iterable of pandas DataFrames, pyarrow RecordBatches or
+                Tables (e.g. pd.read_csv(..., chunksize=N) or a RecordBatchReader)
+            text_column: Column containing drug descriptions
+            id_column: Optional column for row IDs (used when deduplicate=False)
+            chunk_size: Max rows per yielded chunk (larger batches are split)
+            deduplicate: Collapse canonical duplicates within each chunk
+            use_result_cache: Reuse results persisted by earlier runs
+        
+        Yields:
+            DataFrame of tagging results per chunk (same columns as tag_batch)
+        """
+        if not self._loaded:
+            self.load()
+        
+        for batch in batches:
+            df = batch if isinstance(batch, pd.DataFrame) else batch.to_pandas()
+            for start in range(0, len(df), chunk_size):
+                yield self.tag_batch(
+                    df.iloc[start:start + chunk_size],
+                    text_column,
+                    id_column=id_column,
+                    chunk_size=chunk_size,
+                    show_progress=False,
+                    deduplicate=deduplicate,
+                    use_result_cache=use_result_cache,
+                )
+    
+    def _prepare_for_fork(self) -> None:
+        """Materialize every table and lookup structure the workers read."""
+        self._ensure_table(GENERIC_ATC_TABLE)
+        self._ensure_table("mixtures")
+        for key in _EMPTY_STRUCTURES:
+            self._structure(key)
+    
+    def _open_worker_connection(self, db_path: Path) -> None:
+        """
+        Replace the inherited DuckDB handle with a fresh read-only one on
+        db_path. DuckDB state does not survive fork(), so the inherited
+        handle is parked in _WORKER_STATE and never used or closed.
+        """
+        _WORKER_STATE["inherited_con"] = self.con
+        self.con = open_reference_db(db_path)
+        # Tables the parent never materialized are unavailable, not ingested
+        self._attached = True
+    
+    def _tag_chunks_parallel(
+        self,
+        texts: List[str],
+        ids: List[Any],
+        bounds: List[tuple],
+        workers: int,
+        show_progress: bool,
+    ) -> ResultColumns:
+        """Tag (start, end) chunks of texts in forked workers, in input order."""
+        self._prepare_for_fork()
+        # Workers open the reference database read-only; without one, the
+        # in-memory tables are exported to a temporary file for them
+        tmp_dir = None
+        db_path = self._db_path
+        if db_path is None:
+            tmp_dir = tempfile.mkdtemp(prefix="unified_tagger_")
+            db_path = export_database(self.con, Path(tmp_dir) / REFERENCE_DB_NAME)
+        _WORKER_STATE.update(tagger=self, texts=texts, ids=ids, db_path=db_path)
+        # Move everything allocated so far out of the collector's reach so
+        # workers never touch (and un-share) those pages during collection
+        gc.collect()
+        gc.freeze()
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_tag_worker,
+            ) as executor:
+                # Submit from this thread: workers fork before the spinner starts
+                futures = [executor.submit(_tag_worker_chunk, b) for b in bounds]
+                def collect() -> ResultColumns:
+                    results = ResultColumns()
+                    for future in futures:
+                        chunk_results, chunk_timer = future.result()
+                        results.extend(chunk_results)
+                        self.stage_timer.merge(chunk_timer)
+                    return results
+                
+                if not show_progress:
+                    return collect()
+                total = bounds[-1][1]
+                return run_with_spinner(
+                    f"Tagging {len(bounds)} chunks on {workers} workers",
+                    collect,
+                    completion_label=lambda elapsed: (
+                        f"{len(bounds)} chunks on {workers} workers: {total/elapsed:,.0f} rows/s"
+                    ),
+                )
+        finally:
+            gc.unfreeze()
+            _WORKER_STATE.clear()
+            if tmp_dir is not None:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
     
     def benchmark(
         self,
@@ -561,19 +1144,40 @@ class UnifiedTagger:
         self,
         texts: List[str],
         ids: List[Any],
-    ) -> List[Dict[str, Any]]:
-        """Tag a batch of texts."""
+    ) -> ResultColumns:
+        """Tag a batch of texts (one result row per text, in order)."""
         total = len(texts)
+        # Stage timings are summed locally and recorded once per batch
+        clock = self.stage_timer.clock
+        t_details = t_vaccine = t_tokenize = t_mixture = t_scoring = 0.0
+        mixture_calls = scoring_calls = 0
         
         # Pre-process all texts
-        all_tokens = []
+        all_analyses: List[TokenAnalysis] = []  # Tokens + categories of each text, reused for scoring
         all_generic_tokens = []
         all_brand_swaps = []  # Track which tokens were brand-swapped
         all_drug_details = []  # Store extracted details for later use
+        all_type_details = []  # Type detail of each text (before vaccine details are appended)
+        # Molecule signature of each text (None when the resolution cache is off)
+        signatures: List[Optional[tuple]] = []
+        resolutions = self._resolution_cache
+        
+        # Each distinct string (original or cleaned) is tokenized once per batch
+        analyses: Dict[str, TokenAnalysis] = {}
+        
+        def analyze(s: str) -> TokenAnalysis:
+            analysis = analyses.get(s)
+            if analysis is None:
+                analysis = analyses[s] = analyze_generic_tokens(s, self.multiword_scanner)
+            return analysis
         
         for text in texts:
+            t0 = clock()
             # Pre-process: extract parentheticals and qualifiers into separate fields
             drug_details = extract_drug_details(text)
+            all_type_details.append(drug_details["type_details"])
+            t1 = clock()
+            t_details += t1 - t0
             
             # Check if this is a vaccine and normalize
             vaccine_name, vaccine_details = normalize_vaccine_name(text)
@@ -599,11 +1203,14 @@ class UnifiedTagger:
                 is_vaccine = True
             
             all_drug_details.append(drug_details)
+            t2 = clock()
+            t_vaccine += t2 - t1
             
             # Use cleaned generic name for tokenization
             clean_text = drug_details["generic_name"]
             # But also keep the original for dose/form extraction
-            tokens, generic_tokens = extract_generic_tokens(text, self.multiword_generics)
+            analysis = analyze(text)
+            generic_tokens = analysis.generic_tokens
             
             # For vaccines, prepend the canonical vaccine name as the primary token
             if is_vaccine and vaccine_name:
@@ -614,7 +1221,7 @@ class UnifiedTagger:
             clean_generic_tokens = []
             if drug_details["generic_name"] and drug_details["generic_name"] != text.upper():
                 # Also extract from the cleaned version
-                _, clean_generic_tokens = extract_generic_tokens(clean_text, self.multiword_generics)
+                clean_generic_tokens = analyze(clean_text).generic_tokens
                 # Merge: prefer clean tokens but keep unique from original
                 generic_tokens = list(dict.fromkeys(clean_generic_tokens + generic_tokens))
             
@@ -630,26 +1237,32 @@ class UnifiedTagger:
                 if was_swapped:
                     brand_swaps.append((g, swapped))
             
-            all_tokens.append(tokens)
+            all_analyses.append(analysis)
             all_generic_tokens.append(swapped_generics)
             all_brand_swaps.append(brand_swaps)
+            signatures.append(self._resolution_signature(
+                text, swapped_generics, drug_details, analysis.categories,
+            ) if self._resolution_cache_size else None)
+            t_tokenize += clock() - t2
         
         # Collect unique generics for batch lookup
+        t0 = clock()
         unique_generics: Set[str] = set()
+        keyed: Set[tuple] = set()
         for idx, gt in enumerate(all_generic_tokens):
+            # Keys are needed once per molecule signature still to be resolved
+            signature = signatures[idx]
+            if signature is not None:
+                if signature in resolutions or signature in keyed:
+                    continue
+                keyed.add(signature)
             # Normalize each component through synonyms
             normalized_components = []
             for g in gt:
-                if g.upper() in PURE_SALT_COMPOUNDS:
-                    unique_generics.add(g.upper())
-                    normalized_components.append(g.upper())
-                else:
-                    base, _ = self._strip_salt(g)
-                    unique_generics.add(base)
-                    # Apply synonym to get canonical form
-                    canonical = self._apply_synonyms(base)
-                    unique_generics.add(canonical)
-                    normalized_components.append(canonical)
+                base, canonical = self._resolve_generic(g)
+                unique_generics.add(base)
+                unique_generics.add(canonical)
+                normalized_components.append(canonical)
             
             # Add combination keys (sorted for order-independent matching)
             # Build from both original and normalized components for #7 (synonym swapping in mixtures)
@@ -698,32 +1311,46 @@ class UnifiedTagger:
                 unique_generics.add(combo_key)
                 unique_generics.add(f"{combo_key} VACCINE")
         
-        # Batch lookup with cached generics for faster fuzzy matching
-        generic_cache = batch_lookup_generics(
-            unique_generics, self.con, self.synonyms,
-            enable_fuzzy=True, cached_generics=self.cached_generics_list
-        )
+        t1 = clock()
         
-        # Process each text
-        results = []
-        for i, text in enumerate(texts):
-            tokens = all_tokens[i]
+        # Resolve only tokens not already in the cross-chunk lookup cache
+        generic_cache, uncached = self.lookup_cache.get_many(unique_generics)
+        if uncached:
+            # Batch lookup with cached generics for faster fuzzy matching
+            self._ensure_table(GENERIC_ATC_TABLE)
+            resolved = batch_lookup_generics(
+                uncached, self.con, self.synonyms,
+                enable_fuzzy=True, cached_generics=self.cached_generics_list,
+                generic_index=self.generic_index,
+                fuzzy_matcher=self.fuzzy_matcher,
+            )
+            self.lookup_cache.put_many(resolved, uncached)
+            generic_cache.update(resolved)
+        t2 = clock()
+        
+        def resolve(i: int) -> tuple:
+            """
+            Generic/ATC resolution of texts[i] as (result fields, whether the
+            row also gets its own dose/form/route/details). Reads nothing that
+            _resolution_signature leaves out, so equal signatures resolve alike.
+            """
+            nonlocal t_mixture, mixture_calls, t_scoring, scoring_calls
+            text = texts[i]
+            tokens = all_analyses[i].tokens  # unused by select_best_candidate
             generic_tokens = all_generic_tokens[i]
             
             # Get stripped generics with defensive filtering
             stripped_generics = []
             for g in generic_tokens:
-                if g.upper() in PURE_SALT_COMPOUNDS:
-                    stripped_generics.append(g.upper())
-                else:
-                    base, _ = self._strip_salt(g)
-                    # Defensive filtering: exclude known formulation markers and junk
-                    if (base and 
-                        base.upper() not in {"FC", "EC", "SR", "XR", "ER", "DR", 
-                                           "NON-PNF", "NONPNF", "MG", "ML", 
-                                           "TABLET", "CAPSULE", "SOLUTION"} and
-                        len(base.strip()) > 1):
-                        stripped_generics.append(base)
+                base, _ = self._resolve_generic(g)
+                # Defensive filtering: exclude known formulation markers and junk
+                # (pure salt compounds always pass)
+                if (base and 
+                    base.upper() not in {"FC", "EC", "SR", "XR", "ER", "DR", 
+                                       "NON-PNF", "NONPNF", "MG", "ML", 
+                                       "TABLET", "CAPSULE", "SOLUTION"} and
+                    len(base.strip()) > 1):
+                    stripped_generics.append(base)
             
             # Collect matches - COMBO MATCHES FIRST for priority (e.g., ETHYL ALCOHOL -> ETHANOL)
             generic_matches = []
@@ -783,102 +1410,56 @@ class UnifiedTagger:
                 # Check if any synonym maps to a mixture name (e.g., CO-AMOXICLAV -> AMOXICILLIN AND CLAVULANATE POTASSIUM)
                 for sg in stripped_generics:
                     syn = self._apply_synonyms(sg)
-                    if syn != sg and self._mixtures_loaded:
-                        # Try to find the synonym in mixtures table by name
-                        try:
-                            mixture_result = self.con.execute("""
-                                SELECT mixture_name, drugbank_id, component_key
-                                FROM mixtures
-                                WHERE UPPER(mixture_name) = ?
-                                LIMIT 1
-                            """, [syn.upper()]).fetchone()
-                            if mixture_result:
-                                unique_matches.append({
-                                    "generic_name": mixture_result[0],
-                                    "drugbank_id": mixture_result[1],
-                                    "atc_code": None,  # Mixtures often don't have ATC
-                                    "source": "mixtures",
-                                    "reference_text": mixture_result[0],
-                                })
-                        except Exception:
-                            pass
+                    if syn != sg:
+                        # Try to find the synonym in mixtures by name
+                        tm = clock()
+                        mixture_result = self.mixture_index.by_name(syn.upper())
+                        t_mixture += clock() - tm
+                        mixture_calls += 1
+                        if mixture_result:
+                            drugbank_id, mixture_name, _ = mixture_result
+                            unique_matches.append({
+                                "generic_name": mixture_name,
+                                "drugbank_id": drugbank_id,
+                                "atc_code": None,  # Mixtures often don't have ATC
+                                "source": "mixtures",
+                                "reference_text": mixture_name,
+                            })
             
             if not unique_matches:
                 # Try mixture lookup for multi-generic inputs
                 if len(stripped_generics) >= 2:
+                    tm = clock()
                     mixture_match = self._lookup_mixture(stripped_generics)
+                    t_mixture += clock() - tm
+                    mixture_calls += 1
                     if mixture_match:
-                        results.append(_build_result_dict(
-                            row_id=ids[i],
-                            input_text=text,
-                            row_idx=i,
-                            drug_details=all_drug_details[i],
-                            atc_code=mixture_match.get("atc_code"),
-                            drugbank_id=mixture_match.get("drugbank_id"),
-                            generic_name=mixture_match.get("generic_name"),
-                            reference_text=mixture_match.get("reference_text"),
-                            match_score=100,
-                            match_reason="matched",
-                            sources=mixture_match.get("source", ""),
-                        ))
-                        continue
+                        return {
+                            "atc_code": mixture_match.get("atc_code"),
+                            "drugbank_id": mixture_match.get("drugbank_id"),
+                            "generic_name": mixture_match.get("generic_name"),
+                            "reference_text": mixture_match.get("reference_text"),
+                            "match_score": 100,
+                            "match_reason": "matched",
+                            "sources": mixture_match.get("source", ""),
+                        }, False
                 
-                results.append(_build_result_dict(
-                    row_id=ids[i],
-                    input_text=text,
-                    row_idx=i,
-                    drug_details=all_drug_details[i],
-                    generic_name="|".join(stripped_generics) if stripped_generics else None,
-                    match_reason="no_candidates",
-                ))
-                continue
+                return {
+                    "generic_name": "|".join(stripped_generics) if stripped_generics else None,
+                    "match_reason": "no_candidates",
+                }, False
             
             # Build candidates
-            categories = categorize_tokens(tokens)
+            categories = all_analyses[i].categories
             candidates = []
             for gm in unique_matches:
-                atc_codes = str(gm.get("atc_code", "")).split("|")
-                atc_codes = sort_atc_codes(atc_codes)
-                atc_codes = [a for a in atc_codes if a]  # Filter empty
-                
-                # For entries with ATC codes, add one candidate per ATC
-                if atc_codes:
-                    for atc in atc_codes:
-                        candidates.append({
-                            "atc_code": atc,
-                            "drugbank_id": gm.get("drugbank_id"),
-                            "generic_name": gm.get("generic_name"),
-                            "reference_text": gm.get("reference_text"),
-                            "source": gm.get("source"),
-                            "form": None,
-                            "route": None,
-                            "doses": None,
-                        })
-                else:
-                    # For mixtures without ATC codes, add candidate with drugbank_id only
-                    # This allows matching combination drugs that don't have specific ATC codes
-                    if gm.get("drugbank_id"):
-                        candidates.append({
-                            "atc_code": None,
-                            "drugbank_id": gm.get("drugbank_id"),
-                            "generic_name": gm.get("generic_name"),
-                            "reference_text": gm.get("reference_text"),
-                            "source": gm.get("source"),
-                            "form": None,
-                            "route": None,
-                            "doses": None,
-                        })
+                candidates.extend(self._candidates_for(gm))
             
             if not candidates:
-                results.append(_build_result_dict(
-                    row_id=ids[i],
-                    input_text=text,
-                    row_idx=i,
-                    drug_details=all_drug_details[i],
-                    generic_name="|".join(stripped_generics) if stripped_generics else None,
-                    match_reason="no_candidates",
-                ))
-                continue
+                return {
+                    "generic_name": "|".join(stripped_generics) if stripped_generics else None,
+                    "match_reason": "no_candidates",
+                }, False
             
             # Normalize input generics
             # Include fuzzy-matched names so scoring works with misspellings
@@ -920,6 +1501,7 @@ class UnifiedTagger:
             is_single_drug = num_input == 1
             
             # Select best candidate, using extracted details for tie-breaking
+            ts = clock()
             best = select_best_candidate(
                 candidates=candidates,
                 input_tokens=tokens,
@@ -932,23 +1514,8 @@ class UnifiedTagger:
                 apply_synonyms_fn=self._apply_synonyms,
                 input_details=all_drug_details[i],
             )
-            
-            # Extract categorized tokens for output
-            input_doses = list(categories.get(CATEGORY_DOSE, {}).keys())
-            input_forms = list(categories.get(CATEGORY_FORM, {}).keys())
-            input_routes = list(categories.get(CATEGORY_ROUTE, {}).keys())
-            
-            # Extract type detail from input text (before tokenization)
-            _, type_detail = extract_type_detail(text)
-            
-            # Extract release/form details from the full token list
-            # Join tokens to reconstruct text for detail extraction
-            token_text = " ".join(tokens)
-            _, release_detail = extract_release_detail(token_text)
-            _, form_detail = extract_form_detail(token_text) if not release_detail else (None, None)
-            
-            # Use normalized form from categories
-            base_form = input_forms[0] if input_forms else None
+            t_scoring += clock() - ts
+            scoring_calls += 1
             
             if best:
                 # Use reference_text if available, otherwise use generic_name; always uppercase
@@ -968,64 +1535,96 @@ class UnifiedTagger:
                         generic_name = canonical_vaccine
                         ref_text = canonical_vaccine
                 
-                results.append(_build_result_dict(
-                    row_id=ids[i],
-                    input_text=text,
-                    row_idx=i,
-                    drug_details=all_drug_details[i],
-                    atc_code=best.get("atc_code"),
-                    drugbank_id=best.get("drugbank_id"),
-                    generic_name=generic_name,
-                    reference_text=ref_text,
-                    dose="|".join(input_doses) if input_doses else None,
-                    form=base_form,
-                    route="|".join(input_routes) if input_routes else None,
-                    type_details=type_detail,
-                    release_details=release_detail,
-                    form_details=form_detail,
-                    match_score=1,
-                    match_reason="matched",
-                    sources=best.get("source"),
-                ))
+                return {
+                    "atc_code": best.get("atc_code"),
+                    "drugbank_id": best.get("drugbank_id"),
+                    "generic_name": generic_name,
+                    "reference_text": ref_text,
+                    "match_score": 1,
+                    "match_reason": "matched",
+                    "sources": best.get("source"),
+                }, True
+            
+            # Try mixture lookup for multi-generic inputs when scoring fails
+            if is_combination and len(stripped_generics) >= 2:
+                tm = clock()
+                mixture_match = self._lookup_mixture(stripped_generics)
+                t_mixture += clock() - tm
+                mixture_calls += 1
+                if mixture_match:
+                    return {
+                        "atc_code": mixture_match.get("atc_code"),
+                        "drugbank_id": mixture_match.get("drugbank_id"),
+                        "generic_name": mixture_match.get("generic_name"),
+                        "reference_text": mixture_match.get("reference_text"),
+                        "match_score": 100,
+                        "match_reason": "matched",
+                        "sources": mixture_match.get("source"),
+                    }, True
+            
+            return {"match_reason": "no_match"}, True
+        
+        # Process each text: resolve each molecule signature once, then add
+        # the row's own dose/form/route and details
+        stats = self._resolution_stats
+        batch_resolutions: Dict[tuple, tuple] = {}
+        results = ResultColumns()
+        for i, text in enumerate(texts):
+            signature = signatures[i]
+            resolution = None
+            if signature is not None:
+                resolution = batch_resolutions.get(signature) or resolutions.get(signature)
+            if resolution is None:
+                resolution = resolve(i)
+                if signature is not None:
+                    stats["misses"] += 1
+                    batch_resolutions[signature] = resolution
+                    if len(resolutions) < self._resolution_cache_size:
+                        resolutions[signature] = resolution
             else:
-                # Try mixture lookup for multi-generic inputs when scoring fails
-                if is_combination and len(stripped_generics) >= 2:
-                    mixture_match = self._lookup_mixture(stripped_generics)
-                    if mixture_match:
-                        results.append(_build_result_dict(
-                            row_id=ids[i],
-                            input_text=text,
-                            row_idx=i,
-                            drug_details=all_drug_details[i],
-                            atc_code=mixture_match.get("atc_code"),
-                            drugbank_id=mixture_match.get("drugbank_id"),
-                            generic_name=mixture_match.get("generic_name"),
-                            reference_text=mixture_match.get("reference_text"),
-                            dose="|".join(input_doses) if input_doses else None,
-                            form=base_form,
-                            route="|".join(input_routes) if input_routes else None,
-                            type_details=type_detail,
-                            release_details=release_detail,
-                            form_details=form_detail,
-                            match_score=100,
-                            match_reason="matched",
-                            sources=mixture_match.get("source"),
-                        ))
-                        continue
-                
-                results.append(_build_result_dict(
-                    row_id=ids[i],
-                    input_text=text,
-                    row_idx=i,
-                    drug_details=all_drug_details[i],
-                    dose="|".join(input_doses) if input_doses else None,
-                    form=base_form,
-                    route="|".join(input_routes) if input_routes else None,
-                    type_details=type_detail,
-                    release_details=release_detail,
-                    form_details=form_detail,
-                    match_reason="no_match",
-                ))
+                stats["hits"] += 1
+            fields, with_details = resolution
+            if not with_details:
+                results.append(row_id=ids[i], input_text=text, row_idx=i, drug_details=all_drug_details[i], **fields)
+                continue
+            
+            # Extract categorized tokens for output
+            categories = all_analyses[i].categories
+            input_doses = list(categories.get(CATEGORY_DOSE, {}).keys())
+            input_forms = list(categories.get(CATEGORY_FORM, {}).keys())
+            input_routes = list(categories.get(CATEGORY_ROUTE, {}).keys())
+            
+            # Extract release/form details from the full token list
+            # Join tokens to reconstruct text for detail extraction
+            token_text = " ".join(all_analyses[i].tokens)
+            release_detail, form_detail = extract_release_and_form_detail(token_text)
+            
+            results.append(
+                row_id=ids[i],
+                input_text=text,
+                row_idx=i,
+                drug_details=all_drug_details[i],
+                dose="|".join(input_doses) if input_doses else None,
+                # Use normalized form from categories
+                form=input_forms[0] if input_forms else None,
+                route="|".join(input_routes) if input_routes else None,
+                # Type detail from input text (before tokenization)
+                type_details=all_type_details[i],
+                release_details=release_detail,
+                form_details=form_detail,
+                **fields,
+            )
+        
+        timer = self.stage_timer
+        timer.add("details", t_details, total)
+        timer.add("vaccine", t_vaccine, total)
+        timer.add("tokenize", t_tokenize, total)
+        timer.add("keys", t1 - t0, total)
+        timer.add("lookup", t2 - t1, len(unique_generics))
+        timer.add("mixture", t_mixture, mixture_calls)
+        timer.add("scoring", t_scoring, scoring_calls)
+        # Matching against the lookup results, candidate building and result rows
+        timer.add("results", clock() - t2 - t_mixture - t_scoring, total)
         
         return results
     
@@ -1035,6 +1634,16 @@ class UnifiedTagger:
             self.con.close()
             self.con = None
             self._loaded = False
+        self._structures = {}
+        self._clear_map_memos()
+        self._snapshot_pending = False
+        self._tables = set()
+        self._missing_tables = set()
+        self._attached = False
+        self.lookup_cache.clear()
+        if self._result_cache is not None:
+            self._result_cache.close()
+            self._result_cache = None
 
 
 # Convenience functions
@@ -5,7 +5,16 @@ Tokenization and normalization functions for drug descriptions.
 from __future__ import annotations
 
 import re
-from typing import Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    ahocorasick = None
 
 from .unified_constants import (
     CATEGORY_DOSE, CATEGORY_FORM, CATEGORY_GENERIC, CATEGORY_OTHER,
@@ -21,6 +30,10 @@ GENERIC_JUNK_TOKENS = STOPWORDS
 # Pre-sorted salt tokens for faster lookup (sorted by length descending)
 _SALT_TOKENS_SORTED: List[str] = sorted(SALT_TOKENS, key=len, reverse=True)
 
+# Entries kept per memoized string helper (functools.lru_cache; see
+# cache_info()). Distinct generic tokens in an eSOA run are far fewer.
+HELPER_MEMO_SIZE = 65_536
+
 
 # Regex patterns
 _DOSE_PATTERN = re.compile(
@@ -87,68 +100,67 @@ def _extract_type_detail_impl(text: str) -> Tuple[str, Optional[str]]:
     return base, after_comma
 
 
-def _extract_release_detail_impl(form_text: str) -> Tuple[str, Optional[str]]:
-    """Internal: Extract release modifier from form text."""
+def _prepare_detail_text(form_text: str) -> tuple:
+    """Uppercased text, its words and the comma split shared by the release/form scans."""
     form_upper = form_text.upper()
-    form_words = form_upper.split()
+    comma = None
     if "," in form_text:
         parts = form_text.split(",", 1)
-        base = parts[0].strip()
         after_comma = parts[1].strip() if len(parts) > 1 else ""
         after_upper = after_comma.upper()
-        after_words = set(after_upper.split())
-        for kw in _RELEASE_KEYWORDS:
-            if kw in after_upper:
-                return base, after_comma
-        if after_words & _RELEASE_ABBREVS:
-            return base, after_comma
-    for kw in _RELEASE_KEYWORDS:
-        if f" {kw}" in form_upper or form_upper.endswith(f" {kw}"):
-            idx = form_upper.find(kw)
-            base = form_text[:idx].strip()
-            release = form_text[idx:].strip()
-            if base:
-                return base, release
-    if len(form_words) >= 2 and form_words[-1] in _RELEASE_ABBREVS:
-        base = " ".join(form_text.split()[:-1])
-        return base, form_words[-1]
-    for word in form_words:
-        if word in _RELEASE_ABBREVS:
-            return form_text, word
-    return form_text, None
+        comma = (parts[0].strip(), after_comma, after_upper, set(after_upper.split()))
+    return form_text, form_upper, form_upper.split(), comma
 
 
-def _extract_form_detail_impl(form_text: str) -> Tuple[str, Optional[str]]:
-    """Internal: Extract form modifier (non-release) from form text."""
-    form_upper = form_text.upper()
-    form_words = form_upper.split()
-    if "," in form_text:
-        parts = form_text.split(",", 1)
-        base = parts[0].strip()
-        after_comma = parts[1].strip() if len(parts) > 1 else ""
-        after_upper = after_comma.upper()
-        after_words = set(after_upper.split())
-        for kw in _FORM_DETAIL_KEYWORDS:
+def _keyword_detail(prepared: tuple, keywords: Set[str], abbrevs: Set[str]) -> Tuple[str, Optional[str]]:
+    """Split a release or form modifier (keyword or abbreviation) off prepared form text."""
+    form_text, form_upper, form_words, comma = prepared
+    if comma is not None:
+        base, after_comma, after_upper, after_words = comma
+        for kw in keywords:
             if kw in after_upper:
                 return base, after_comma
-        if after_words & _FORM_DETAIL_ABBREVS:
+        if after_words & abbrevs:
             return base, after_comma
-    for kw in _FORM_DETAIL_KEYWORDS:
+    for kw in keywords:
         if f" {kw}" in form_upper or form_upper.endswith(f" {kw}"):
             idx = form_upper.find(kw)
             base = form_text[:idx].strip()
             detail = form_text[idx:].strip()
             if base:
                 return base, detail
-    if len(form_words) >= 2 and form_words[-1] in _FORM_DETAIL_ABBREVS:
+    if len(form_words) >= 2 and form_words[-1] in abbrevs:
         base = " ".join(form_text.split()[:-1])
         return base, form_words[-1]
     for word in form_words:
-        if word in _FORM_DETAIL_ABBREVS:
+        if word in abbrevs:
             return form_text, word
     return form_text, None
 
 
+def _extract_release_detail_impl(form_text: str) -> Tuple[str, Optional[str]]:
+    """Internal: Extract release modifier from form text."""
+    return _keyword_detail(_prepare_detail_text(form_text), _RELEASE_KEYWORDS, _RELEASE_ABBREVS)
+
+
+def _extract_form_detail_impl(form_text: str) -> Tuple[str, Optional[str]]:
+    """Internal: Extract form modifier (non-release) from form text."""
+    return _keyword_detail(_prepare_detail_text(form_text), _FORM_DETAIL_KEYWORDS, _FORM_DETAIL_ABBREVS)
+
+
+def extract_release_and_form_detail(form_text: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    (release_detail, form_detail) of form text in one pass over it.
+    
+    The form detail is only looked for when there is no release detail.
+    """
+    prepared = _prepare_detail_text(form_text)
+    _, release = _keyword_detail(prepared, _RELEASE_KEYWORDS, _RELEASE_ABBREVS)
+    if release:
+        return release, None
+    return release, _keyword_detail(prepared, _FORM_DETAIL_KEYWORDS, _FORM_DETAIL_ABBREVS)[1]
+
+
 # ============================================================================
 # DOSE PARSING - Structured extraction of dose values and units
 # ============================================================================
@@ -327,6 +339,133 @@ def calculate_iv_amounts(
     return result
 
 
+# ============================================================================
+# EXTRACT_DRUG_DETAILS PATTERNS - compiled once, applied in the order below
+# ============================================================================
+
+# IV solution diluent from "X% DRUG IN Y% DILUENT" patterns
+# Common diluents: WATER, SODIUM CHLORIDE (saline), LACTATED/ACETATED RINGER'S
+_IV_DILUENT_PATTERN = re.compile(
+    r'\bIN\s+'
+    r'(?:(\d+(?:\.\d+)?\s*%)\s+)?'  # Optional concentration (e.g., "0.9%")
+    r'(WATER|SODIUM\s+CHLORIDE|LACTATED\s+RINGER[\'\'`]?S?(?:\s+SOLUTION)?|'
+    r'ACETATED\s+RINGER[\'\'`]?S?(?:\s+SOLUTION)?|RINGER[\'\'`]?S?\s+(?:SOLUTION|LACTATE))'
+    r'(?:\s+SOLUTION)?',
+    re.IGNORECASE
+)
+_RINGER_APOSTROPHE = re.compile(r"RINGER[\'\'`]?S?")
+_PERCENT_START = re.compile(r'^(\d+(?:\.\d+)?)\s*%\s+(.+)$')
+# Whitespace just inside parentheses: "( as X )" -> "(as X)"
+_PAREN_INNER_SPACE = re.compile(r"(\()\s+|\s+(\))")
+
+_DILUENT_KEYWORDS = (
+    r"diluent|solvent|reconstitution\s+fluid|sterile\s+water|"
+    r"water\s+for\s+injection|w\.?f\.?i\.?"
+)
+# Every diluent pattern needs one of these words; rows without them skip the diluent passes
+_DILUENT_KEYWORD_GATE = re.compile(r"DILUENT|SOLVENT|RECONSTITUTION|WATER|W\.?F\.?I", re.IGNORECASE)
+
+# Diluent volumes: "+ X mL diluent", "+ X mL LYOPHILIZED POWDER + DILUENT", "X mg/Y mL + Diluent"
+_DILUENT_VOLUME_AFTER_PLUS = re.compile(
+    r"\+\s*(\d+(?:[.,]\d+)?)\s*(m?L)\s*(?:" + _DILUENT_KEYWORDS + r")",
+    re.IGNORECASE
+)
+_DILUENT_VOLUME_BEFORE_POWDER = re.compile(
+    r"\+\s*(\d+(?:[.,]\d+)?)\s*(m?L)\s+(?:LYOPHILIZED|FREEZE-?DRIED)\s+POWDER\s*\+\s*(?:" + _DILUENT_KEYWORDS + r")",
+    re.IGNORECASE
+)
+_DILUENT_VOLUME_FROM_RATIO = re.compile(
+    r"(\d+(?:[.,]\d+)?)\s*(?:mg|g|mcg|iu)\s*/\s*(\d+(?:[.,]\d+)?)\s*(m?L)\s*\+\s*(?:" + _DILUENT_KEYWORDS + r")",
+    re.IGNORECASE
+)
+# "+ Diluent" without volume (also covers "LYOPHILIZED POWDER + DILUENT")
+_DILUENT_PRESENT = re.compile(r"\+\s*(?:" + _DILUENT_KEYWORDS + r")", re.IGNORECASE)
+
+# Diluent stripping passes, in order
+_MONODOSE_DILUENT = re.compile(
+    r"\s+(?:mono|multi)?dose\s+vial\s*\+\s*\d+(?:[.,]\d+)?\s*m?L?\s*" + _DILUENT_KEYWORDS + r".*$",
+    re.IGNORECASE
+)
+_LYOPH_DILUENT = re.compile(
+    r"\s+(?:LYOPHILIZED|FREEZE-?DRIED)\s+POWDER\s*\+\s*(?:" + _DILUENT_KEYWORDS + r").*$",
+    re.IGNORECASE
+)
+_ML_LYOPH_DILUENT = re.compile(
+    r"\s*\+\s*\d+(?:[.,]\d+)?\s*m?L?\s+(?:LYOPHILIZED|FREEZE-?DRIED)\s+POWDER\s*\+\s*(?:" + _DILUENT_KEYWORDS + r").*$",
+    re.IGNORECASE
+)
+_PLUS_VOLUME_DILUENT = re.compile(
+    r"\s*\+\s*\d+(?:[.,]\d+)?\s*m?L?\s+" + _DILUENT_KEYWORDS,
+    re.IGNORECASE
+)
+_DOSE_PLUS_VOLUME_DILUENT = re.compile(
+    r"(\d+(?:[.,]\d+)?\s*(?:mg|g|mcg|iu|units?))\s*\+\s*\d+(?:[.,]\d+)?\s*m?L?\s*" + _DILUENT_KEYWORDS + r".*$",
+    re.IGNORECASE
+)
+_PLUS_DILUENT_PACKAGING = re.compile(
+    r"\s*\+\s*" + _DILUENT_KEYWORDS + r"\s+(?:SOLUTION|SUSPENSION|POWDER)?\s*(?:VIAL|AMPULE?|BOTTLE)?.*$",
+    re.IGNORECASE
+)
+_PLUS_DILUENT = re.compile(
+    r"\s*\+\s*" + _DILUENT_KEYWORDS + r"(?:\s+(?:VIAL|AMPULE?|BOTTLE))?\s*",
+    re.IGNORECASE
+)
+_LEFTOVER_PLUS_VOLUME = re.compile(r"\s*\+\s*\d+(?:[.,]\d+)?\s*m?L?\s*(?=\s|$)", re.IGNORECASE)
+# Vaccine potency info: "1000 DL 50 mouse min", "not less than X PFU" (not regular mg/mcg doses)
+_VACCINE_POTENCY = re.compile(
+    r"\s+\d+(?:[.,]\d+)?\s*(?:DL|LD)(?:\s+\d+)?(?:\s+(?:mouse|mice))?\s*(?:min|minimum)?\s*",
+    re.IGNORECASE
+)
+_POTENCY_QUALIFIER = re.compile(
+    r"\s+not\s+less\s+than(?:\s+\d+(?:[.,]\d+)?\s*(?:PFU)?)?\s*",
+    re.IGNORECASE
+)
+_FREEZE_DRIED_VIAL = re.compile(
+    r"\s+freeze-?dried\s+powder\s+(?:mono|multi)?dose\s+vial.*$",
+    re.IGNORECASE
+)
+_FORM_PLUS_DILUENT = re.compile(
+    r"\s*\+\s*(?:\d+(?:[.,]\d+)?\s*(?:mL|g)\s+)?" + _DILUENT_KEYWORDS,
+    re.IGNORECASE
+)
+_DOSE_PLUS_DILUENT = re.compile(
+    r"\b(?:\d+\s+)?dose\s*\+\s*(?:\d+(?:[.,]\d+)?\s*m?L?\s+)?" + _DILUENT_KEYWORDS,
+    re.IGNORECASE
+)
+_STANDALONE_DILUENT = re.compile(
+    r"\s+(?:PRE-?FILLED\s+)?(?:SYRINGE\s+)?DILUENT\b",
+    re.IGNORECASE
+)
+_TRAILING_PACKAGING = re.compile(
+    r"\s+(?:mono|multi)?dose\s+(?:vial|ampoule?|syringe)(?:\s+SOLUTION\s+(?:VIAL|AMPOULE?|BOTTLE))?\s*$",
+    re.IGNORECASE
+)
+_TRAILING_FORM = re.compile(
+    r"\s+(?:SOLUTION|SUSPENSION|POWDER|FREEZE-?DRIED(?:\s+POWDER)?|LYOPHILIZED(?:\s+POWDER)?)"
+    r"(?:\s+(?:VIAL|AMPOULE?|BOTTLE|DRUM|BAG))?\s*$",
+    re.IGNORECASE
+)
+
+_SOLUTIONS_FOR = re.compile(r"\bSOLUTIONS?\s+FOR\s+(\w+(?:\s+\w+){0,3})", re.IGNORECASE)
+_PAREN_CONTENT = re.compile(r"\(([^)]+)\)")
+_LEADING_DIGITS = re.compile(r"^\d+")
+_AND_WORD = re.compile(r"\bAND\b", re.IGNORECASE)
+_WHITESPACE_RUN = re.compile(r"\s+")
+# Where numeric dose info starts: "70 MG + 2800 IU TABLET" -> " 70 MG"
+_DOSE_START = re.compile(r"\s+\d+(?:\.\d+)?\s*(?:MG|G|MCG|UG|IU|ML|L|UNITS?|%)", re.IGNORECASE)
+
+_TRAILING_SALT_SUFFIXES = [
+    "SODIUM PHOSPHATE", "DISODIUM PHOSPHATE", "SODIUM SUCCINATE",
+    "SODIUM SULFATE", "SODIUM CHLORIDE", "POTASSIUM PHOSPHATE",
+    "CALCIUM PHOSPHATE", "MAGNESIUM SULFATE",
+]
+
+
+def _diluent_volume(vol: str, unit: str) -> str:
+    vol = vol.replace(",", ".")
+    return f"{vol} L" if unit.upper() == "L" else f"{vol} mL"
+
+
 def extract_drug_details(drug_name: str) -> Dict[str, Optional[str]]:
     """
     Extract parentheticals and qualifiers from a drug name into separate fields.
@@ -375,22 +514,13 @@ def extract_drug_details(drug_name: str) -> Dict[str, Optional[str]]:
     working = drug_name.strip()
     
     # Extract IV solution diluent from "X% DRUG IN Y% DILUENT" patterns
-    # Common diluents: WATER, SODIUM CHLORIDE (saline), LACTATED/ACETATED RINGER'S
-    iv_diluent_pattern = re.compile(
-        r'\bIN\s+'
-        r'(?:(\d+(?:\.\d+)?\s*%)\s+)?'  # Optional concentration (e.g., "0.9%")
-        r'(WATER|SODIUM\s+CHLORIDE|LACTATED\s+RINGER[\'\'`]?S?(?:\s+SOLUTION)?|'
-        r'ACETATED\s+RINGER[\'\'`]?S?(?:\s+SOLUTION)?|RINGER[\'\'`]?S?\s+(?:SOLUTION|LACTATE))'
-        r'(?:\s+SOLUTION)?',
-        re.IGNORECASE
-    )
-    iv_match = iv_diluent_pattern.search(working)
+    iv_match = _IV_DILUENT_PATTERN.search(working)
     if iv_match:
         diluent_amount = iv_match.group(1)  # e.g., "0.9%" or None
         diluent_type = iv_match.group(2).upper()  # e.g., "SODIUM CHLORIDE"
         
         # Normalize apostrophe variants in RINGER'S
-        diluent_type = re.sub(r"RINGER[\'\'`]?S?", "RINGER'S", diluent_type)
+        diluent_type = _RINGER_APOSTROPHE.sub("RINGER'S", diluent_type)
         # Ensure SOLUTION suffix is included if present
         if 'SOLUTION' not in diluent_type and ('RINGER' in diluent_type or iv_match.group(0).upper().endswith('SOLUTION')):
             if 'LACTATED' in diluent_type or 'ACETATED' in diluent_type:
@@ -402,7 +532,7 @@ def extract_drug_details(drug_name: str) -> Dict[str, Optional[str]]:
     
     # Handle drug names starting with percentage (e.g., "0.9% SODIUM CHLORIDE")
     # Move the percentage to dose position and keep the drug name
-    pct_start_match = re.match(r'^(\d+(?:\.\d+)?)\s*%\s+(.+)$', working)
+    pct_start_match = _PERCENT_START.match(working)
     if pct_start_match:
         pct_value = pct_start_match.group(1)
         rest = pct_start_match.group(2)
@@ -410,185 +540,62 @@ def extract_drug_details(drug_name: str) -> Dict[str, Optional[str]]:
         working = f"{rest} {pct_value}%"
     
     # Normalize: remove whitespace after opening parenthesis and before closing
-    working = re.sub(r"\(\s+", "(", working)
-    working = re.sub(r"\s+\)", ")", working)
+    working = _PAREN_INNER_SPACE.sub(r"\1\2", working)
     
     # Extract diluent/solvent volume BEFORE stripping
     # Diluent volume = base solution volume for concentration calculation
     # e.g., "250 mg + 5 mL diluent" → dose=250mg, diluent=5mL → concentration=50mg/mL
-    diluent_keywords = (
-        r"diluent|solvent|reconstitution\s+fluid|sterile\s+water|"
-        r"water\s+for\s+injection|w\.?f\.?i\.?"
-    )
-    
-    # Extract diluent volume patterns
-    diluent_volumes = []
-    
-    # Pattern 1: "+ X mL diluent" (explicit diluent after +)
-    diluent_vol_pattern1 = re.compile(
-        r"\+\s*(\d+(?:[.,]\d+)?)\s*(m?L)\s*(?:" + diluent_keywords + r")",
-        re.IGNORECASE
-    )
-    for match in diluent_vol_pattern1.finditer(working):
-        vol = match.group(1).replace(",", ".")
-        unit = match.group(2).upper()
-        if unit == "L":
-            diluent_volumes.append(f"{vol} L")
-        else:
-            diluent_volumes.append(f"{vol} mL")
-    
-    # Pattern 2: "+ X mL LYOPHILIZED/FREEZE-DRIED POWDER + DILUENT" - volume before form word
-    diluent_vol_pattern2 = re.compile(
-        r"\+\s*(\d+(?:[.,]\d+)?)\s*(m?L)\s+(?:LYOPHILIZED|FREEZE-?DRIED)\s+POWDER\s*\+\s*(?:" + diluent_keywords + r")",
-        re.IGNORECASE
-    )
-    for match in diluent_vol_pattern2.finditer(working):
-        vol = match.group(1).replace(",", ".")
-        unit = match.group(2).upper()
-        if unit == "L":
-            diluent_volumes.append(f"{vol} L")
-        else:
-            diluent_volumes.append(f"{vol} mL")
-    
-    # Pattern 3: "X mg/Y mL + Diluent" - dose/volume ratio before diluent
-    # e.g., "METHYLPREDNISOLONE 1 g/16 mL + Diluent" → diluent is 16 mL
-    diluent_vol_pattern3 = re.compile(
-        r"(\d+(?:[.,]\d+)?)\s*(?:mg|g|mcg|iu)\s*/\s*(\d+(?:[.,]\d+)?)\s*(m?L)\s*\+\s*(?:" + diluent_keywords + r")",
-        re.IGNORECASE
-    )
-    for match in diluent_vol_pattern3.finditer(working):
-        vol = match.group(2).replace(",", ".")
-        unit = match.group(3).upper()
-        if unit == "L":
-            diluent_volumes.append(f"{vol} L")
-        else:
-            diluent_volumes.append(f"{vol} mL")
-    
-    # Pattern 4: "+ Diluent" without volume (just note presence)
-    if re.search(r"\+\s*(?:" + diluent_keywords + r")", working, re.IGNORECASE):
-        if not diluent_volumes:
-            diluent_volumes.append("with diluent")
-    
-    # Pattern 5: "LYOPHILIZED POWDER + DILUENT/SOLVENT" without volume
-    if re.search(r"(?:LYOPHILIZED|FREEZE-?DRIED)\s+POWDER\s*\+\s*(?:" + diluent_keywords + r")", working, re.IGNORECASE):
-        if not diluent_volumes:
+    has_diluent_keyword = _DILUENT_KEYWORD_GATE.search(working) is not None
+    
+    if has_diluent_keyword:
+        # "+ X mL diluent", then "+ X mL LYOPHILIZED POWDER + DILUENT", then "X mg/Y mL + Diluent"
+        diluent_volumes = [
+            _diluent_volume(m.group(1), m.group(2))
+            for m in _DILUENT_VOLUME_AFTER_PLUS.finditer(working)
+        ]
+        diluent_volumes += [
+            _diluent_volume(m.group(1), m.group(2))
+            for m in _DILUENT_VOLUME_BEFORE_POWDER.finditer(working)
+        ]
+        diluent_volumes += [
+            _diluent_volume(m.group(2), m.group(3))
+            for m in _DILUENT_VOLUME_FROM_RATIO.finditer(working)
+        ]
+        # "+ Diluent" without volume (just note presence)
+        if not diluent_volumes and _DILUENT_PRESENT.search(working):
             diluent_volumes.append("with diluent")
-    
-    if diluent_volumes:
-        result["diluent_details"] = "|".join(diluent_volumes)
-    
-    # Now strip diluent patterns from working string
-    # Pattern 0: Strip "monodose vial + X mL diluent" and "multidose vial + X mL diluent" entirely
-    monodose_diluent = re.compile(
-        r"\s+(?:mono|multi)?dose\s+vial\s*\+\s*\d+(?:[.,]\d+)?\s*m?L?\s*" + diluent_keywords + r".*$",
-        re.IGNORECASE
-    )
-    working = monodose_diluent.sub("", working)
-    
-    # Pattern 0b: Strip trailing "LYOPHILIZED POWDER + DILUENT VIAL" etc.
-    lyoph_diluent = re.compile(
-        r"\s+(?:LYOPHILIZED|FREEZE-?DRIED)\s+POWDER\s*\+\s*(?:" + diluent_keywords + r").*$",
-        re.IGNORECASE
-    )
-    working = lyoph_diluent.sub("", working)
-    
-    # Pattern 0c: Strip "+ X mL LYOPHILIZED POWDER + DILUENT" patterns
-    ml_lyoph_pattern = re.compile(
-        r"\s*\+\s*\d+(?:[.,]\d+)?\s*m?L?\s+(?:LYOPHILIZED|FREEZE-?DRIED)\s+POWDER\s*\+\s*(?:" + diluent_keywords + r").*$",
-        re.IGNORECASE
-    )
-    working = ml_lyoph_pattern.sub("", working)
-    
-    # Pattern 1a: "+ X mL diluent" - explicit volume before keyword  
-    diluent_pattern1a = re.compile(
-        r"\s*\+\s*\d+(?:[.,]\d+)?\s*m?L?\s+" + diluent_keywords,
-        re.IGNORECASE
-    )
-    working = diluent_pattern1a.sub("", working)
-    
-    # Pattern 1a2: "X mg + Y mL diluent" - dose before +, volume after
-    # This catches "250 mg + 5 mL diluent SOLUTION VIAL"
-    diluent_pattern1a2 = re.compile(
-        r"(\d+(?:[.,]\d+)?\s*(?:mg|g|mcg|iu|units?))\s*\+\s*\d+(?:[.,]\d+)?\s*m?L?\s*" + diluent_keywords + r".*$",
-        re.IGNORECASE
-    )
-    working = diluent_pattern1a2.sub(r"\1", working)
-    
-    # Pattern 1a3: "X IU + Y mL + Z mL" multi-part patterns with trailing packaging
-    # This catches "100 IU/g + diluent SOLUTION VIAL"
-    diluent_pattern1a3 = re.compile(
-        r"\s*\+\s*" + diluent_keywords + r"\s+(?:SOLUTION|SUSPENSION|POWDER)?\s*(?:VIAL|AMPULE?|BOTTLE)?.*$",
-        re.IGNORECASE
-    )
-    working = diluent_pattern1a3.sub("", working)
-    
-    # Pattern 1b: "+ diluent" without volume (also handle "+ diluent vial")
-    diluent_pattern1b = re.compile(
-        r"\s*\+\s*" + diluent_keywords + r"(?:\s+(?:VIAL|AMPULE?|BOTTLE))?\s*",
-        re.IGNORECASE
-    )
-    working = diluent_pattern1b.sub("", working)
+        
+        if diluent_volumes:
+            result["diluent_details"] = "|".join(diluent_volumes)
+        
+        # Now strip diluent patterns from working string
+        working = _MONODOSE_DILUENT.sub("", working)
+        working = _LYOPH_DILUENT.sub("", working)
+        working = _ML_LYOPH_DILUENT.sub("", working)
+        working = _PLUS_VOLUME_DILUENT.sub("", working)
+        working = _DOSE_PLUS_VOLUME_DILUENT.sub(r"\1", working)
+        working = _PLUS_DILUENT_PACKAGING.sub("", working)
+        working = _PLUS_DILUENT.sub("", working)
     
     # Also strip leftover "+ X mL" patterns (orphaned after diluent stripped)
-    leftover_ml_pattern = re.compile(r"\s*\+\s*\d+(?:[.,]\d+)?\s*m?L?\s*(?=\s|$)", re.IGNORECASE)
-    working = leftover_ml_pattern.sub("", working)
-    
-    # Strip vaccine-specific potency info: "1000 DL 50 mouse min", "X PFU" (not regular mg/mcg doses)
-    # Only strip DL/LD (lethal dose) and PFU (plaque-forming units) patterns
-    vaccine_potency_pattern = re.compile(
-        r"\s+\d+(?:[.,]\d+)?\s*(?:DL|LD)(?:\s+\d+)?(?:\s+(?:mouse|mice))?\s*(?:min|minimum)?\s*",
-        re.IGNORECASE
-    )
-    working = vaccine_potency_pattern.sub(" ", working)
+    working = _LEFTOVER_PLUS_VOLUME.sub("", working)
     
-    # Strip "not less than X PFU" patterns from vaccines
-    potency_qualifier_pattern = re.compile(
-        r"\s+not\s+less\s+than(?:\s+\d+(?:[.,]\d+)?\s*(?:PFU)?)?\s*",
-        re.IGNORECASE
-    )
-    working = potency_qualifier_pattern.sub(" ", working)
+    # Strip vaccine-specific potency info (DL/LD lethal dose, "not less than X PFU")
+    working = _VACCINE_POTENCY.sub(" ", working)
+    working = _POTENCY_QUALIFIER.sub(" ", working)
     
     # Strip "freeze-dried powder monodose vial" patterns
-    freeze_dried_pattern = re.compile(
-        r"\s+freeze-?dried\s+powder\s+(?:mono|multi)?dose\s+vial.*$",
-        re.IGNORECASE
-    )
-    working = freeze_dried_pattern.sub("", working)
+    working = _FREEZE_DRIED_VIAL.sub("", working)
     
-    # Pattern 2: "POWDER + DILUENT", "SOLUTION + DILUENT" 
-    diluent_pattern2 = re.compile(
-        r"\s*\+\s*(?:\d+(?:[.,]\d+)?\s*(?:mL|g)\s+)?" + diluent_keywords,
-        re.IGNORECASE
-    )
-    working = diluent_pattern2.sub("", working)
+    if has_diluent_keyword:
+        # "POWDER + DILUENT", "dose + X mL diluent", "VIAL + PRE-FILLED SYRINGE DILUENT"
+        working = _FORM_PLUS_DILUENT.sub("", working)
+        working = _DOSE_PLUS_DILUENT.sub("", working)
+        working = _STANDALONE_DILUENT.sub("", working)
     
-    # Pattern 3: "dose + X mL diluent"
-    diluent_pattern3 = re.compile(
-        r"\b(?:\d+\s+)?dose\s*\+\s*(?:\d+(?:[.,]\d+)?\s*m?L?\s+)?" + diluent_keywords,
-        re.IGNORECASE
-    )
-    working = diluent_pattern3.sub("", working)
-    
-    # Pattern 4: Standalone diluent references like "VIAL + PRE-FILLED SYRINGE DILUENT"
-    diluent_pattern4 = re.compile(
-        r"\s+(?:PRE-?FILLED\s+)?(?:SYRINGE\s+)?DILUENT\b",
-        re.IGNORECASE
-    )
-    working = diluent_pattern4.sub("", working)
-    
-    # Pattern 5: Strip trailing packaging/form words like "monodose vial", "multidose vial", "SOLUTION VIAL"
-    packaging_pattern = re.compile(
-        r"\s+(?:mono|multi)?dose\s+(?:vial|ampoule?|syringe)(?:\s+SOLUTION\s+(?:VIAL|AMPOULE?|BOTTLE))?\s*$",
-        re.IGNORECASE
-    )
-    working = packaging_pattern.sub("", working)
-    # Also strip trailing form words: "SOLUTION VIAL", "SOLUTION BOTTLE", etc.
-    trailing_form_pattern = re.compile(
-        r"\s+(?:SOLUTION|SUSPENSION|POWDER|FREEZE-?DRIED(?:\s+POWDER)?|LYOPHILIZED(?:\s+POWDER)?)"
-        r"(?:\s+(?:VIAL|AMPOULE?|BOTTLE|DRUM|BAG))?\s*$",
-        re.IGNORECASE
-    )
-    working = trailing_form_pattern.sub("", working)
+    # Strip trailing packaging/form words like "monodose vial", "SOLUTION VIAL", "SOLUTION BOTTLE"
+    working = _TRAILING_PACKAGING.sub("", working)
+    working = _TRAILING_FORM.sub("", working)
     
     # Extract salt forms: ( as SODIUM SALT), ( as SULFATE), etc.
     salt_matches = _SALT_PARENTHETICAL.findall(working)
@@ -607,18 +614,18 @@ def extract_drug_details(drug_name: str) -> Dict[str, Optional[str]]:
             working = working[:indication_match.start()] + working[indication_match.end():]
     
     # Also check for "SOLUTIONS FOR X" pattern
-    solutions_match = re.search(r"\bSOLUTIONS?\s+FOR\s+(\w+(?:\s+\w+){0,3})", working, re.IGNORECASE)
+    solutions_match = _SOLUTIONS_FOR.search(working)
     if solutions_match and not result["indication_details"]:
         result["indication_details"] = solutions_match.group(0).strip().upper()
         working = working[:solutions_match.start()] + "SOLUTIONS" + working[solutions_match.end():]
     
     # Extract remaining parentheticals as aliases (but not doses)
-    remaining_parens = re.findall(r"\(([^)]+)\)", working)
+    remaining_parens = _PAREN_CONTENT.findall(working)
     aliases = []
     for paren in remaining_parens:
         paren_upper = paren.strip().upper()
         # Skip if it looks like a dose
-        if re.match(r"^\d+", paren_upper) or any(u in paren_upper for u in ["MG", "ML", "MCG", "IU", "%"]):
+        if _LEADING_DIGITS.match(paren_upper) or any(u in paren_upper for u in ["MG", "ML", "MCG", "IU", "%"]):
             continue
         # Skip if it's a salt we already captured
         if paren_upper.startswith("AS "):
@@ -640,13 +647,13 @@ def extract_drug_details(drug_name: str) -> Dict[str, Optional[str]]:
         
         # Check if this looks like a multi-ingredient comma list (A, B AND C)
         remaining = ",".join(parts[1:]).strip()
-        is_multi_ingredient = bool(re.search(r"\bAND\b", remaining, re.IGNORECASE)) or "+" in remaining
+        is_multi_ingredient = bool(_AND_WORD.search(remaining)) or "+" in remaining
         
         if not is_multi_ingredient and len(parts) > 1:
             # Everything after first comma is detail
             comma_details = [p.strip().upper() for p in parts[1:] if p.strip()]
             # Filter out dose-like details
-            comma_details = [d for d in comma_details if not re.match(r"^\d+", d)]
+            comma_details = [d for d in comma_details if not _LEADING_DIGITS.match(d)]
             
             if comma_details:
                 if result["alias_details"]:
@@ -656,12 +663,12 @@ def extract_drug_details(drug_name: str) -> Dict[str, Optional[str]]:
                 working = first_part
     
     # Clean up generic name
-    working = re.sub(r"\s+", " ", working).strip().upper()
+    working = _WHITESPACE_RUN.sub(" ", working).strip().upper()
     
     # Strip dose/form info from the end
     # Match patterns like "70 MG + 2800 IU TABLET" or "400 UNITS + 5 MG + 5000 UNITS OINTMENT"
     # Find where numeric dose info starts (number followed by unit)
-    dose_start = re.search(r"\s+\d+(?:\.\d+)?\s*(?:MG|G|MCG|UG|IU|ML|L|UNITS?|%)", working, re.IGNORECASE)
+    dose_start = _DOSE_START.search(working)
     if dose_start:
         working = working[:dose_start.start()].strip()
     
@@ -673,12 +680,7 @@ def extract_drug_details(drug_name: str) -> Dict[str, Optional[str]]:
     
     # Strip trailing salt suffixes (SODIUM PHOSPHATE, SODIUM SUCCINATE, etc.)
     # This handles ESOA-style "DEXAMETHASONE SODIUM PHOSPHATE" pattern
-    trailing_salt_suffixes = [
-        "SODIUM PHOSPHATE", "DISODIUM PHOSPHATE", "SODIUM SUCCINATE",
-        "SODIUM SULFATE", "SODIUM CHLORIDE", "POTASSIUM PHOSPHATE",
-        "CALCIUM PHOSPHATE", "MAGNESIUM SULFATE",
-    ]
-    for suffix in trailing_salt_suffixes:
+    for suffix in _TRAILING_SALT_SUFFIXES:
         if working.endswith(" " + suffix):
             base = working[:-len(suffix)-1].strip()
             # Only strip if there's still a meaningful base name
@@ -692,16 +694,14 @@ def extract_drug_details(drug_name: str) -> Dict[str, Optional[str]]:
     
     # Normalize "DRUG+DRUG" to "DRUG + DRUG" (add spaces around +)
     if "+" in working and " + " not in working:
-        working = re.sub(r"\+", " + ", working)
-        working = re.sub(r"\s+", " ", working).strip()
+        working = _WHITESPACE_RUN.sub(" ", working.replace("+", " + ")).strip()
     
     result["generic_name"] = working if working else drug_name.strip().upper()
     
     # Extract type/release/form details from original text
     # These functions are defined later in this module
     _, type_det = _extract_type_detail_impl(drug_name)
-    _, release_det = _extract_release_detail_impl(drug_name)
-    _, form_det = _extract_form_detail_impl(drug_name) if not release_det else (None, None)
+    release_det, form_det = extract_release_and_form_detail(drug_name)
     
     result["type_details"] = type_det
     result["release_details"] = release_det
@@ -894,6 +894,24 @@ def extract_form_detail(form_text: str) -> Tuple[str, Optional[str]]:
     return _extract_form_detail_impl(form_text)
 
 
+def canonicalize_description(text: str) -> str:
+    """
+    Key under which UnifiedTagger.tag_batch deduplicates descriptions.
+
+    Only folds leading and trailing whitespace, which extract_drug_details
+    strips and tokenization splits away, so every text with the same key
+    tags identically. Case, inner whitespace, "+" spacing, number-unit
+    spacing and trailing periods all reach the output (form_details,
+    type_details, dose strings, vaccine and mixture matching) and are kept.
+    Idempotent.
+
+    Examples:
+        "  PARACETAMOL 500 MG TAB " -> "PARACETAMOL 500 MG TAB"
+        "paracetamol 500 mg tab"   -> "paracetamol 500 mg tab"
+    """
+    return text.strip()
+
+
 def split_with_parentheses(text: str) -> List[str]:
     """
     Split text into tokens, preserving parenthetical content as single tokens.
@@ -954,10 +972,67 @@ def detect_compound_salts(tokens: List[str], original_text: str) -> List[str]:
     return result
 
 
+class MultiwordScanner:
+    """
+    Finds every multiword generic occurring in a text in one pass.
+    
+    Built once per multiword set (Aho-Corasick automaton when pyahocorasick
+    is installed, linear substring scan otherwise). Matching is plain
+    substring matching, like the ``mw in text`` scans it replaces, and
+    matches are reported longest first in the order of
+    ``sorted(words, key=len, reverse=True)``.
+    
+    Usage:
+        scanner = MultiwordScanner(multiword_generics)
+        for mw, pos in scanner.find(text_upper):   # pos = first occurrence
+            ...
+    """
+    
+    def __init__(self, words: Iterable[str], use_automaton: bool = True):
+        self._ordered: List[str] = sorted(words, key=len, reverse=True)
+        self.rank: Dict[str, int] = {mw: i for i, mw in enumerate(self._ordered)}
+        self._automaton = None
+        if use_automaton and AHOCORASICK_AVAILABLE and self._ordered:
+            automaton = ahocorasick.Automaton()
+            for mw, i in self.rank.items():
+                automaton.add_word(mw, (i, len(mw)))
+            automaton.make_automaton()
+            self._automaton = automaton
+    
+    def __len__(self) -> int:
+        return len(self._ordered)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ordered)
+    
+    def __contains__(self, word: object) -> bool:
+        return word in self.rank
+    
+    def find(self, text: str) -> List[Tuple[str, int]]:
+        """(multiword, first start position) for each multiword in text, longest first."""
+        if self._automaton is None:
+            return [(mw, text.find(mw)) for mw in self._ordered if mw in text]
+        # Hits arrive by end position, so the first hit per word is its first occurrence
+        first: Dict[int, int] = {}
+        for end, (i, length) in self._automaton.iter(text):
+            if i not in first:
+                first[i] = end - length + 1
+        return [(self._ordered[i], first[i]) for i in sorted(first)]
+
+
+def _as_multiword_scanner(
+    multiword_generics: Optional[Union[Set[str], MultiwordScanner]],
+) -> MultiwordScanner:
+    """Use a prebuilt scanner as-is; scan plain sets linearly (no automaton build per call)."""
+    if isinstance(multiword_generics, MultiwordScanner):
+        return multiword_generics
+    return MultiwordScanner(multiword_generics or (), use_automaton=False)
+
+
 def normalize_tokens(
     tokens: List[str],
     drop_stopwords: bool = True,
-    multiword_generics: Optional[Set[str]] = None,
+    multiword_generics: Optional[Union[Set[str], MultiwordScanner]] = None,
     original_text: Optional[str] = None,
 ) -> List[str]:
     """
@@ -967,8 +1042,7 @@ def normalize_tokens(
         original_text: If provided, used to detect "( as ...)" salt patterns
                       so we can exclude multiword matches inside them.
     """
-    if multiword_generics is None:
-        multiword_generics = set()
+    scanner = _as_multiword_scanner(multiword_generics)
     
     result = []
     text = " ".join(tokens).upper()
@@ -1002,7 +1076,12 @@ def normalize_tokens(
         return False
     
     # First, extract multi-word generics (but exclude those inside salt patterns)
-    for mwg in sorted(multiword_generics, key=len, reverse=True):
+    pending = [mwg for mwg, _ in scanner.find(text)]
+    seen = set(pending)
+    i = 0
+    while i < len(pending):
+        mwg = pending[i]
+        i += 1
         if mwg in text:
             # Skip if this multiword is inside a salt pattern
             if any(mwg in sc or sc in mwg for sc in salt_pattern_content):
@@ -1012,6 +1091,12 @@ def normalize_tokens(
                 continue
             result.append(mwg)
             text = text.replace(mwg, " ")
+            # The replacement can join text into shorter multiwords not seen before
+            rank = scanner.rank[mwg]
+            joined = [mw for mw, _ in scanner.find(text) if mw not in seen and scanner.rank[mw] > rank]
+            if joined:
+                seen.update(joined)
+                pending[i:] = sorted(pending[i:] + joined, key=scanner.rank.__getitem__)
     
     # Then split remaining text
     remaining = re.split(r"[\s,;]+", text)
@@ -1034,6 +1119,51 @@ def normalize_tokens(
     return result
 
 
+# Placeholder category for element drugs in SALT_TOKENS: GENERIC as the first
+# token, SALT anywhere else (resolved per call in categorize_tokens).
+_ELEMENT_SALT = "ELEMENT_SALT"
+_DESCRIPTOR_TOKENS = frozenset({'GENERIC', 'OP', 'GRAM', '100S'})
+
+
+def _categorize_token(tok_upper: str) -> Tuple[str, str]:
+    """(category, counted value) of an uppercase token, ignoring its position."""
+    # _DOSE_PATTERN can only match from a leading digit
+    if (tok_upper[:1].isdigit() and _DOSE_PATTERN.match(tok_upper)) or tok_upper in UNIT_TOKENS:
+        return CATEGORY_DOSE, tok_upper
+    if tok_upper in FORM_CANON:
+        return CATEGORY_FORM, FORM_CANON[tok_upper]
+    if tok_upper in ROUTE_CANON:
+        return CATEGORY_ROUTE, ROUTE_CANON[tok_upper]
+    if tok_upper in SALT_TOKENS:
+        return (_ELEMENT_SALT if tok_upper in ELEMENT_DRUGS else CATEGORY_SALT), tok_upper
+    # Pure number (dose without unit)
+    if tok_upper.replace(".", "").isdigit():
+        return CATEGORY_DOSE, tok_upper
+    if tok_upper in GENERIC_JUNK_TOKENS:
+        return CATEGORY_OTHER, tok_upper
+    # Strict validation for generic tokens: reasonable length, some letters,
+    # no asterisks, and not a descriptor
+    stripped = tok_upper.strip()
+    if (len(stripped) < 2 or
+        not any(c.isalpha() for c in tok_upper) or
+        '*' in tok_upper or
+        tok_upper in _DESCRIPTOR_TOKENS):
+        return CATEGORY_OTHER, tok_upper
+    return CATEGORY_GENERIC, tok_upper
+
+
+# Token -> (category, counted value), precomputed for every constant token so
+# categorize_tokens does one dict probe per token. Other tokens (doses, generic
+# names) are added as they are seen, up to _TOKEN_CATEGORIES_LIMIT entries.
+_TOKEN_CATEGORIES: Dict[str, Tuple[str, str]] = {
+    tok: _categorize_token(tok)
+    for vocabulary in (UNIT_TOKENS, FORM_CANON, ROUTE_CANON, SALT_TOKENS, GENERIC_JUNK_TOKENS, _DESCRIPTOR_TOKENS)
+    for tok in vocabulary
+    if tok == tok.upper()
+}
+_TOKEN_CATEGORIES_LIMIT = len(_TOKEN_CATEGORIES) + HELPER_MEMO_SIZE
+
+
 def categorize_tokens(tokens: List[str]) -> Dict[str, Dict[str, int]]:
     """
     Categorize tokens into GENERIC, SALT, DOSE, FORM, ROUTE, OTHER.
@@ -1049,81 +1179,60 @@ def categorize_tokens(tokens: List[str]) -> Dict[str, Dict[str, int]]:
         CATEGORY_OTHER: {},
     }
     
+    first = tokens[0] if tokens else None
     for tok in tokens:
         tok_upper = tok.upper()
-        
-        # Check dose pattern
-        if _DOSE_PATTERN.match(tok_upper) or tok_upper in UNIT_TOKENS:
-            categories[CATEGORY_DOSE][tok_upper] = categories[CATEGORY_DOSE].get(tok_upper, 0) + 1
-            continue
-        
-        # Check form
-        if tok_upper in FORM_CANON:
-            canon = FORM_CANON[tok_upper]
-            categories[CATEGORY_FORM][canon] = categories[CATEGORY_FORM].get(canon, 0) + 1
-            continue
-        
-        # Check route
-        if tok_upper in ROUTE_CANON:
-            canon = ROUTE_CANON[tok_upper]
-            categories[CATEGORY_ROUTE][canon] = categories[CATEGORY_ROUTE].get(canon, 0) + 1
-            continue
-        
-        # Check salt (but element drugs can be generics too)
-        if tok_upper in SALT_TOKENS:
-            # If it's an element drug and appears to be the main drug (first token),
-            # treat it as generic instead of salt
-            if tok_upper in ELEMENT_DRUGS:
-                # Check if this is likely the main drug (not a salt modifier)
-                # It's a main drug ONLY if it's the first token in the list
-                tok_idx = tokens.index(tok) if tok in tokens else -1
-                is_main_drug = tok_idx == 0
-                if is_main_drug:
-                    categories[CATEGORY_GENERIC][tok_upper] = categories[CATEGORY_GENERIC].get(tok_upper, 0) + 1
-                    continue
-            categories[CATEGORY_SALT][tok_upper] = categories[CATEGORY_SALT].get(tok_upper, 0) + 1
-            continue
-        
-        # Check if it's a pure number (dose without unit)
-        if tok_upper.replace(".", "").isdigit():
-            categories[CATEGORY_DOSE][tok_upper] = categories[CATEGORY_DOSE].get(tok_upper, 0) + 1
-            continue
-        
-        # Check junk tokens
-        if tok_upper in GENERIC_JUNK_TOKENS:
-            categories[CATEGORY_OTHER][tok_upper] = categories[CATEGORY_OTHER].get(tok_upper, 0) + 1
-            continue
-        
-        # Strict validation for generic tokens
-        # Only allow alphanumeric tokens with reasonable length
-        if (not tok_upper.strip() or 
-            len(tok_upper.strip()) < 2 or
-            not any(c.isalpha() for c in tok_upper) or
-            tok_upper.count('*') > 0 or  # No asterisks in generic names
-            tok_upper in {'GENERIC', 'OP', 'GRAM', '100S'}):  # Descriptors, not drug names
-            categories[CATEGORY_OTHER][tok_upper] = categories[CATEGORY_OTHER].get(tok_upper, 0) + 1
-            continue
-        
-        # Default to generic
-        categories[CATEGORY_GENERIC][tok_upper] = categories[CATEGORY_GENERIC].get(tok_upper, 0) + 1
+        entry = _TOKEN_CATEGORIES.get(tok_upper)
+        if entry is None:
+            entry = _categorize_token(tok_upper)
+            if len(_TOKEN_CATEGORIES) < _TOKEN_CATEGORIES_LIMIT:
+                _TOKEN_CATEGORIES[tok_upper] = entry
+        category, value = entry
+        if category is _ELEMENT_SALT:
+            # Element drugs are the main drug only when the token starts the
+            # list (tokens.index(tok) == 0); elsewhere they are salt modifiers
+            category = CATEGORY_GENERIC if tok == first else CATEGORY_SALT
+        bucket = categories[category]
+        bucket[value] = bucket.get(value, 0) + 1
     
     return categories
 
 
+@dataclass
+class TokenAnalysis:
+    """One tokenization of a description (see analyze_generic_tokens)."""
+    tokens: List[str]
+    categories: Dict[str, Dict[str, int]]  # categorize_tokens(tokens)
+    generic_tokens: List[str]
+
+
 def extract_generic_tokens(
     text: str,
-    multiword_generics: Optional[Set[str]] = None,
+    multiword_generics: Optional[Union[Set[str], MultiwordScanner]] = None,
 ) -> Tuple[List[str], List[str]]:
     """
     Extract generic drug tokens from text.
     
     Returns (all_tokens, generic_tokens).
     """
-    if multiword_generics is None:
-        multiword_generics = set()
+    analysis = analyze_generic_tokens(text, multiword_generics)
+    return analysis.tokens, analysis.generic_tokens
+
+
+def analyze_generic_tokens(
+    text: str,
+    multiword_generics: Optional[Union[Set[str], MultiwordScanner]] = None,
+) -> TokenAnalysis:
+    """
+    Tokenize and categorize text once, returning tokens, categories and generic tokens.
+    
+    Pass a prebuilt MultiwordScanner for batch use; a plain set is scanned
+    linearly on every call.
+    """
+    multiword_generics = _as_multiword_scanner(multiword_generics)
     
     # Check for multiword generics BEFORE tokenizing
-    # Sort by length descending to prefer longer matches and avoid substrings
+    # The scanner reports longest first to prefer longer matches and avoid substrings
     text_upper = text.upper()
     
     # Find "( as ...)" salt pattern ranges to exclude matches inside them
@@ -1169,23 +1278,21 @@ def extract_generic_tokens(
         return False
     
     matched_multiword = []
-    for mw in sorted(multiword_generics, key=len, reverse=True):
-        if mw in text_upper:
-            pos = text_upper.find(mw)
-            # Skip if this multiword is inside a "( as ...)" salt pattern
-            if is_inside_salt_pattern(pos, len(mw)):
-                continue
-            # Skip if this multiword is a trailing salt suffix (DRUG SALT pattern)
-            if is_trailing_salt_suffix(mw):
-                continue
-            # Check if this is a substring of an already-matched multiword
-            is_substring = False
-            for _, existing_mw in matched_multiword:
-                if mw in existing_mw:
-                    is_substring = True
-                    break
-            if not is_substring:
-                matched_multiword.append((pos, mw))
+    for mw, pos in multiword_generics.find(text_upper):
+        # Skip if this multiword is inside a "( as ...)" salt pattern
+        if is_inside_salt_pattern(pos, len(mw)):
+            continue
+        # Skip if this multiword is a trailing salt suffix (DRUG SALT pattern)
+        if is_trailing_salt_suffix(mw):
+            continue
+        # Check if this is a substring of an already-matched multiword
+        is_substring = False
+        for _, existing_mw in matched_multiword:
+            if mw in existing_mw:
+                is_substring = True
+                break
+        if not is_substring:
+            matched_multiword.append((pos, mw))
     # Sort by position in text
     matched_multiword.sort(key=lambda x: x[0])
     
@@ -1389,7 +1496,7 @@ def extract_generic_tokens(
         if filtered_generics:
             generic_tokens = filtered_generics
     
-    return tokens, generic_tokens
+    return TokenAnalysis(tokens, categories, generic_tokens)
 
 
 def strip_salt_suffix(
@@ -1399,22 +1506,31 @@ def strip_salt_suffix(
     """
     Strip salt suffix from a generic name.
     
+    Results for the default SALT_TOKENS are memoized per name.
+    
     Returns (base_name, salt_suffix or None).
     """
+    if salt_suffixes is None:
+        return _strip_default_salt_suffix(generic)
+    return _strip_salt_suffix(generic, sorted(salt_suffixes, key=len, reverse=True), salt_suffixes)
+
+
+@lru_cache(maxsize=HELPER_MEMO_SIZE)
+def _strip_default_salt_suffix(generic: str) -> Tuple[str, Optional[str]]:
+    return _strip_salt_suffix(generic, _SALT_TOKENS_SORTED, SALT_TOKENS)
+
+
+def _strip_salt_suffix(
+    generic: str,
+    suffixes_to_check: List[str],
+    salt_lookup: Set[str],
+) -> Tuple[str, Optional[str]]:
     generic_upper = generic.upper()
     
     # Don't strip from pure salt compounds
     if generic_upper in PURE_SALT_COMPOUNDS:
         return generic_upper, None
     
-    # Use pre-sorted list for default case (fast path)
-    if salt_suffixes is None:
-        suffixes_to_check = _SALT_TOKENS_SORTED
-        salt_lookup = SALT_TOKENS
-    else:
-        suffixes_to_check = sorted(salt_suffixes, key=len, reverse=True)
-        salt_lookup = salt_suffixes
-    
     # Check each salt suffix (longest first)
     for suffix in suffixes_to_check:
         if generic_upper.endswith(" " + suffix):
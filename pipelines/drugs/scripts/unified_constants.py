@@ -9,6 +9,7 @@ Sources: constants.py, combos_drugs.py, text_utils_drugs.py, routes_forms_drugs.
          generic_normalization.py, scoring.py, and debug/old_files/*.py
 """
 
+import re as _re
 from typing import Any, Dict, List, Optional, Set, Tuple
 
 # ============================================================================
@@ -1378,6 +1379,17 @@ VACCINE_CANONICAL: Dict[str, Dict[str, Any]] = {
     },
 }
 
+# Canonical -> [(pattern, compiled pattern)]; patterns match as substrings
+# or as regexes (e.g. "HEPATITIS B.*HAEMOPHILUS")
+_VACCINE_CANONICAL_PATTERNS: Dict[str, List[Tuple[str, _re.Pattern]]] = {
+    canonical: [(pattern, _re.compile(pattern, _re.IGNORECASE)) for pattern in info["patterns"]]
+    for canonical, info in VACCINE_CANONICAL.items()
+}
+_VACCINE_VALENCY = _re.compile(r'(\d+)-?VALENT')
+_VACCINE_TYPE = _re.compile(r'\(TYPE[S]?\s+([^)]+)\)')
+_VACCINE_GROUP = _re.compile(r'(?:GROUP|SEROGROUP)\s+([A-Z,\s\+]+?)(?:\s|$|\))')
+
+
 # Helper function to normalize vaccine names
 def normalize_vaccine_name(text: str) -> Tuple[Optional[str], Optional[str]]:
     """
@@ -1392,25 +1404,24 @@ def normalize_vaccine_name(text: str) -> Tuple[Optional[str], Optional[str]]:
         return None, None
     
     # Try to match against patterns
-    import re
-    for canonical, info in VACCINE_CANONICAL.items():
-        for pattern in info["patterns"]:
-            if pattern in text_upper or re.search(pattern, text_upper, re.IGNORECASE):
+    for canonical, patterns in _VACCINE_CANONICAL_PATTERNS.items():
+        for literal, pattern in patterns:
+            if literal in text_upper or pattern.search(text_upper):
                 # Extract details (valency, strains, etc.)
                 details = []
                 
                 # Valency
-                valency_match = re.search(r'(\d+)-?VALENT', text_upper)
+                valency_match = _VACCINE_VALENCY.search(text_upper)
                 if valency_match:
                     details.append(f"{valency_match.group(1)}-valent")
                 
                 # Type/strain info in parentheses
-                type_match = re.search(r'\(TYPE[S]?\s+([^)]+)\)', text_upper)
+                type_match = _VACCINE_TYPE.search(text_upper)
                 if type_match:
                     details.append(f"Type {type_match.group(1)}")
                 
                 # Group/serogroup
-                group_match = re.search(r'(?:GROUP|SEROGROUP)\s+([A-Z,\s\+]+?)(?:\s|$|\))', text_upper)
+                group_match = _VACCINE_GROUP.search(text_upper)
                 if group_match:
                     details.append(f"Group {group_match.group(1).strip()}")
                 
@@ -1615,6 +1626,24 @@ def _build_components_to_acronym() -> Dict[str, str]:
 # Reverse mapping: sorted component key → acronym
 VACCINE_COMPONENTS_TO_ACRONYM: Dict[str, str] = _build_components_to_acronym()
 
+# Acronyms and component keywords in match priority order (longest first)
+_VACCINE_ACRONYMS = sorted(VACCINE_ACRONYM_TO_COMPONENTS, key=len, reverse=True)
+_VACCINE_ACRONYM_RANK = {acronym: rank for rank, acronym in enumerate(_VACCINE_ACRONYMS)}
+_VACCINE_COMPONENT_KEYWORDS = sorted(VACCINE_COMPONENT_KEYWORDS.items(), key=lambda x: -len(x[0]))
+
+# Every standalone acronym in a text: the lookahead reports the highest-priority
+# acronym starting at each word boundary, even where matches overlap
+_VACCINE_ACRONYM_PATTERN = _re.compile(
+    r"\b(?=(" + "|".join(_re.escape(a) for a in _VACCINE_ACRONYMS) + r")\b)"
+)
+
+# Texts matching neither an acronym nor a component keyword are not vaccines
+# for match_vaccine_text (one scan instead of a pass per acronym and keyword)
+_VACCINE_TEXT_GATE = _re.compile(
+    "|".join(_re.escape(keyword) for keyword, _ in _VACCINE_COMPONENT_KEYWORDS)
+    + r"|\b(?:" + "|".join(_re.escape(a) for a in _VACCINE_ACRONYMS) + r")\b"
+)
+
 
 def normalize_vaccine_components(text: str) -> List[str]:
     """
@@ -1626,7 +1655,7 @@ def normalize_vaccine_components(text: str) -> List[str]:
     components = []
     
     # Check for each component keyword
-    for keyword, normalized in sorted(VACCINE_COMPONENT_KEYWORDS.items(), key=lambda x: -len(x[0])):
+    for keyword, normalized in _VACCINE_COMPONENT_KEYWORDS:
         if keyword in text_upper:
             if normalized not in components:
                 components.append(normalized)
@@ -1690,13 +1719,14 @@ def match_vaccine_text(text: str) -> Tuple[Optional[str], Optional[List[str]]]:
         (acronym, components) tuple, or (None, None) if no match
     """
     text_upper = text.upper()
+    if not _VACCINE_TEXT_GATE.search(text_upper):
+        return None, None
     
-    # Check if text starts with or contains a known acronym
-    for acronym in sorted(VACCINE_ACRONYM_TO_COMPONENTS.keys(), key=len, reverse=True):
-        # Check for acronym as standalone word
-        import re
-        if re.search(rf'\b{re.escape(acronym)}\b', text_upper):
-            return acronym, VACCINE_ACRONYM_TO_COMPONENTS[acronym]
+    # Check if text starts with or contains a known acronym (longest wins)
+    acronyms = _VACCINE_ACRONYM_PATTERN.findall(text_upper)
+    if acronyms:
+        acronym = min(acronyms, key=_VACCINE_ACRONYM_RANK.__getitem__)
+        return acronym, VACCINE_ACRONYM_TO_COMPONENTS[acronym]
     
     # Extract components from text
     components = normalize_vaccine_components(text)
@@ -1790,7 +1820,6 @@ MULTIWORD_GENERICS: Set[str] = {
 # These are included here so submodules only need to import unified_constants.py
 # ============================================================================
 
-import re as _re
 import unicodedata as _unicodedata
 
 # Pre-compiled patterns for normalize_text
@@ -117,6 +117,15 @@ def _format_reason_lines(reason_counts: Mapping[str, int], total: int, prefix: s
         lines.append(f"  - {reason}: {count:,} ({pct:.1f}%)")
     return lines
 
+
+def _format_stage_lines(stage_timings: Mapping[str, Mapping[str, float]], prefix: str = "- Stage timings:") -> list[str]:
+    if not stage_timings:
+        return []
+    lines = [prefix]
+    for stage, row in sorted(stage_timings.items(), key=lambda item: item[1]["seconds"], reverse=True):
+        lines.append(f"  - {stage}: {row['seconds']:.2f}s ({row['pct']:.1f}%, {row['count']:,} items)")
+    return lines
+
 # Regex to match dated files: name_YYYY-MM-DD.ext or name_YYYY-MM-DD_*.ext
 DATED_FILE_PATTERN = re.compile(r"^(.+?)_(\d{4}-\d{2}-\d{2})(?:_.*)?(\.\w+)$")
 
@@ -608,6 +617,12 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
         default=8,
         help="Number of parallel workers for Part 2 (default: 8).",
     )
+    parser.add_argument(
+        "--esoa-workers",
+        type=int,
+        default=1,
+        help="Worker processes for Part 3 tagging (default: 1 = serial; 0 = size by workload).",
+    )
     parser.add_argument(
         "--use-threads",
         action="store_true",
@@ -672,6 +687,21 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
         default=False,
         help="Enable HTML scraping fallback for FDA food.",
     )
+    parser.add_argument(
+        "--result-cache",
+        action="store_true",
+        help="Reuse Part 3 results for descriptions tagged in earlier runs.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read, tag and write the Part 3 eSOA in chunks to keep memory flat (serial).",
+    )
+    parser.add_argument(
+        "--profile-stages",
+        action="store_true",
+        help="Time each Part 3 tagging stage and add the breakdown to the run summary.",
+    )
     args = parser.parse_args(list(argv) if argv is not None else None)
 
     _ensure_inputs_dir()
@@ -742,7 +772,15 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
         print("=" * 60)
         from pathlib import Path
         esoa_path = Path(args.esoa) if args.esoa else None
-        part3_stats = run_esoa_tagging(esoa_path=esoa_path, verbose=False, show_progress=True)
+        part3_stats = run_esoa_tagging(
+            esoa_path=esoa_path,
+            verbose=False,
+            show_progress=True,
+            workers=args.esoa_workers or None,
+            use_result_cache=args.result_cache,
+            stream=args.stream,
+            profile_stages=args.profile_stages,
+        )
         lines = [
             f"- Total rows: {part3_stats['total']:,}",
             f"- Matched ATC: {part3_stats['matched_atc']:,} ({part3_stats['matched_atc_pct']:.1f}%)",
@@ -750,6 +788,7 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
             f"- Output: {part3_stats['output_path']}",
         ]
         lines.extend(_format_reason_lines(part3_stats.get("reason_counts", {}), part3_stats["total"]))
+        lines.extend(_format_stage_lines(part3_stats.get("stage_timings", {})))
         add_run_summary("Part 3: Match ESOA with ATC/DrugBank IDs", lines)
 
     if 4 in parts_to_run:
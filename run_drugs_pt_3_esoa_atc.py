@@ -20,12 +20,52 @@ if _VENV_PYTHON.exists() and sys.executable != str(_VENV_PYTHON):
     os.execv(str(_VENV_PYTHON), [str(_VENV_PYTHON), __file__] + sys.argv[1:])
 # === End auto-activate ===
 
+import argparse
+from typing import Optional, Sequence
+
 # Sync shared scripts to submodules before running
 from pipelines.drugs.scripts.sync_to_submodules import sync_all
 sync_all()
 
 from pipelines.drugs.scripts.runners import run_esoa_tagging
 
-if __name__ == "__main__":
-    run_esoa_tagging()
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Part 3: Match ESOA rows to ATC codes and DrugBank IDs."
+    )
+    parser.add_argument(
+        "--esoa",
+        metavar="PATH",
+        help="Path to eSOA CSV. Defaults to inputs/drugs.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        default=1,
+        help="Worker processes for tagging (default: 1 = serial; 0 = size by workload).",
+    )
+    parser.add_argument(
+        "--result-cache",
+        action="store_true",
+        help="Reuse results for descriptions tagged in earlier runs (outputs/drugs/tag_result_cache.duckdb).",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read, tag and write the eSOA in chunks to keep memory flat (serial).",
+    )
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    run_esoa_tagging(
+        esoa_path=Path(args.esoa) if args.esoa else None,
+        workers=args.workers or None,
+        use_result_cache=args.result_cache,
+        stream=args.stream,
+    )
     print("\nNext: Run Part 4 to bridge ESOA to Annex F Drug Codes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for tokenizer.extract_drug_details on eSOA descriptions.
+
+Times the current implementation per call and, with --baseline, the same
+function from an earlier git revision, checking that both return identical
+results for every description.
+
+Usage examples:
+    python scripts/benchmark_extract_drug_details.py
+    python scripts/benchmark_extract_drug_details.py --baseline HEAD~1
+    python scripts/benchmark_extract_drug_details.py --esoa inputs/drugs/esoa_combined.csv --limit 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_DIR))
+
+import pandas as pd
+
+from pipelines.drugs.scripts.tokenizer import extract_drug_details
+
+DEFAULT_ESOA = PROJECT_DIR / "inputs" / "drugs" / "esoa_combined.csv"
+TEXT_COLUMNS = ["raw_text", "ITEM_DESCRIPTION", "DESCRIPTION", "Drug Description", "description"]
+TOKENIZER_PATH = "pipelines/drugs/scripts/tokenizer.py"
+
+# Used when no eSOA file is available (covers IV, diluent, vaccine, salt and alias paths)
+SAMPLE_DESCRIPTIONS = [
+    "PARACETAMOL 500 MG TABLET",
+    "AMOXICILLIN + CLAVULANIC ACID 625 mg TABLET",
+    "5% DEXTROSE IN 0.9% SODIUM CHLORIDE 1 L",
+    "0.9% SODIUM CHLORIDE 500 mL SOLUTION BOTTLE",
+    "5% DEXTROSE IN LACTATED RINGERS 1000 mL",
+    "CEFTRIAXONE 1 g + 10 mL diluent SOLUTION VIAL",
+    "METHYLPREDNISOLONE 1 g/16 mL + Diluent",
+    "RABIES VACCINE 2.5 IU freeze-dried powder monodose vial + 0.5 mL diluent",
+    "MEASLES VACCINE 1000 DL 50 mouse min LYOPHILIZED POWDER + DILUENT",
+    "YELLOW FEVER VACCINE not less than 1000 PFU",
+    "ALENDRONATE + CHOLECALCIFEROL (VIT. D3) ( as SODIUM SALT) 70 MG + 2800 IU TABLET",
+    "AMINO ACID SOLUTIONS FOR HEPATIC FAILURE",
+    "NIFEDIPINE 30 mg MR TABLET",
+    "VITAMIN A, RETINOL 10000 IU CAPSULE",
+    "DEXAMETHASONE SODIUM PHOSPHATE 4 mg/mL AMPULE",
+    "LOSARTAN POTASSIUM 50 MG FILM COATED TABLET",
+    "IBUPROFEN+PARACETAMOL 200MG/325MG",
+    "OMEPRAZOLE (as sodium) 40 mg powder for injection + 10 mL WFI",
+    "CETIRIZINE (Zyrtec) 10 MG TAB",
+    "COTRIMOXAZOLE 200 mg/40 mg per 5 mL SUSPENSION 60 mL",
+]
+
+
+def load_descriptions(esoa_path: Path, limit: int) -> List[str]:
+    if not esoa_path.exists():
+        print(f"{esoa_path} not found; using {len(SAMPLE_DESCRIPTIONS)} built-in descriptions")
+        return SAMPLE_DESCRIPTIONS * max(1, limit // len(SAMPLE_DESCRIPTIONS))
+    columns = pd.read_csv(esoa_path, nrows=0).columns
+    text_column = next((c for c in TEXT_COLUMNS if c in columns), None)
+    if text_column is None:
+        raise ValueError(f"No text column found. Columns: {list(columns)}")
+    texts = pd.read_csv(esoa_path, usecols=[text_column], nrows=limit)[text_column]
+    return texts.dropna().astype(str).tolist()
+
+
+def load_baseline(revision: str) -> Callable[[str], dict]:
+    """extract_drug_details as of a git revision (imported alongside the current package)."""
+    source = subprocess.run(
+        ["git", "show", f"{revision}:{TOKENIZER_PATH}"],
+        cwd=PROJECT_DIR, check=True, capture_output=True, text=True,
+    ).stdout
+    name = "pipelines.drugs.scripts._baseline_tokenizer"
+    module = importlib.util.module_from_spec(importlib.util.spec_from_loader(name, loader=None))
+    module.__package__ = "pipelines.drugs.scripts"
+    exec(compile(source, f"{revision}:{TOKENIZER_PATH}", "exec"), module.__dict__)
+    return module.extract_drug_details
+
+
+def time_per_call(func: Callable[[str], dict], texts: List[str], repeat: int) -> float:
+    """Best-of-repeat microseconds per call."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts) * 1e6
+
+
+def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark tokenizer.extract_drug_details on eSOA descriptions.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--esoa", type=Path, default=DEFAULT_ESOA, help="eSOA CSV to read descriptions from.")
+    parser.add_argument("--limit", type=int, default=20000, help="Maximum number of descriptions.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported).")
+    parser.add_argument("--baseline", help="Git revision to compare outputs and timings against.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    args = parse_args(argv)
+    texts = load_descriptions(args.esoa, args.limit)
+    print(f"Descriptions: {len(texts):,}")
+
+    current_us = time_per_call(extract_drug_details, texts, args.repeat)
+    print(f"  current : {current_us:8.1f} us/call")
+    if not args.baseline:
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    mismatches = [
+        text for text in texts
+        if json.dumps(baseline(text), sort_keys=True) != json.dumps(extract_drug_details(text), sort_keys=True)
+    ]
+    baseline_us = time_per_call(baseline, texts, args.repeat)
+    print(f"  {args.baseline:<8}: {baseline_us:8.1f} us/call")
+    print(f"  speedup : {baseline_us / current_us:8.2f}x")
+    print(f"  output mismatches: {len(mismatches):,}")
+    for text in mismatches[:10]:
+        print(f"    {text}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
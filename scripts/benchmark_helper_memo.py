@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Hit rates of the memoized string helpers on an eSOA tagging run.
+
+Tags eSOA descriptions with UnifiedTagger (serially, so every memo lives in
+this process) and reports hits, misses and entries for apply_synonym,
+swap_brand_to_generic, resolve_generic, _singularize, strip_salt_suffix,
+build_combination_keys and the molecule-signature resolution cache, followed
+by the per-stage timing breakdown.
+
+Usage examples:
+    python scripts/benchmark_helper_memo.py
+    python scripts/benchmark_helper_memo.py --esoa inputs/drugs/esoa_combined.csv --limit 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_DIR))
+
+import pandas as pd
+
+from pipelines.drugs.scripts.tagger import OUTPUTS_DIR, UnifiedTagger
+
+DEFAULT_ESOA = PROJECT_DIR / "inputs" / "drugs" / "esoa_combined.csv"
+TEXT_COLUMNS = ["raw_text", "ITEM_DESCRIPTION", "DESCRIPTION", "Drug Description", "description"]
+
+
+def load_esoa(esoa_path: Path, limit: int) -> pd.DataFrame:
+    columns = pd.read_csv(esoa_path, nrows=0).columns
+    text_column = next((c for c in TEXT_COLUMNS if c in columns), None)
+    if text_column is None:
+        raise ValueError(f"No text column found. Columns: {list(columns)}")
+    return pd.read_csv(esoa_path, usecols=[text_column], nrows=limit).rename(columns={text_column: "text"})
+
+
+def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Report memo hit rates of the tagger's string helpers on eSOA descriptions.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--esoa", type=Path, default=DEFAULT_ESOA, help="eSOA CSV to read descriptions from.")
+    parser.add_argument("--outputs", type=Path, default=OUTPUTS_DIR, help="Directory with unified_* reference files.")
+    parser.add_argument("--limit", type=int, default=100000, help="Maximum number of eSOA rows.")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows per tagging chunk.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    args = parse_args(argv)
+    if not args.esoa.exists():
+        print(f"{args.esoa} not found")
+        return 1
+    esoa = load_esoa(args.esoa, args.limit)
+    print(f"Rows: {len(esoa):,}")
+
+    tagger = UnifiedTagger(outputs_dir=args.outputs, profile_stages=True)
+    tagger.load()
+    start = time.perf_counter()
+    tagger.tag_batch(esoa, "text", chunk_size=args.chunk_size, show_progress=False)
+    elapsed = time.perf_counter() - start
+    print(f"Tagged in {elapsed:.2f}s ({len(esoa) / elapsed:,.0f} rows/s)\n")
+
+    print(f"  {'Helper':<24} {'Hits':>12} {'Misses':>10} {'Hit rate':>9} {'Entries':>9}")
+    for name, stats in tagger.helper_memo_stats().items():
+        calls = stats["hits"] + stats["misses"]
+        rate = 100 * stats["hits"] / calls if calls else 0.0
+        print(f"  {name:<24} {stats['hits']:12,} {stats['misses']:10,} {rate:8.1f}% {stats['size']:9,}")
+    print("\nStage timings:")
+    for line in tagger.stage_timer.table():
+        print(line)
+    tagger.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
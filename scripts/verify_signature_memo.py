@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Check that molecule-signature memoization leaves eSOA tagging unchanged.
+
+Tags eSOA descriptions twice with UnifiedTagger: once resolving every
+description on its own (resolution_cache_size=0) and once sharing the
+generic/ATC resolution between descriptions with the same molecule signature
+(descriptions that differ only in strength or pack size). Reports any rows
+that differ, distinct descriptions vs. distinct signatures, and both timings.
+Exits non-zero on a mismatch.
+
+Usage examples:
+    python scripts/verify_signature_memo.py
+    python scripts/verify_signature_memo.py --esoa inputs/drugs/esoa_combined.csv --limit 0
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_DIR))
+
+import pandas as pd
+
+from pipelines.drugs.scripts.tagger import OUTPUTS_DIR, UnifiedTagger
+
+DEFAULT_ESOA = PROJECT_DIR / "inputs" / "drugs" / "esoa_combined.csv"
+TEXT_COLUMNS = ["raw_text", "ITEM_DESCRIPTION", "DESCRIPTION", "Drug Description", "description"]
+
+
+def load_esoa(esoa_path: Path, limit: int) -> pd.DataFrame:
+    columns = pd.read_csv(esoa_path, nrows=0).columns
+    text_column = next((c for c in TEXT_COLUMNS if c in columns), None)
+    if text_column is None:
+        raise ValueError(f"No text column found. Columns: {list(columns)}")
+    return pd.read_csv(esoa_path, usecols=[text_column], nrows=limit or None).rename(columns={text_column: "text"})
+
+
+def tag(esoa: pd.DataFrame, outputs_dir: Path, chunk_size: int, resolution_cache_size: int) -> tuple:
+    """Tag every distinct description serially; return (results, seconds, memo stats)."""
+    tagger = UnifiedTagger(outputs_dir=outputs_dir, resolution_cache_size=resolution_cache_size)
+    tagger.load()
+    try:
+        start = time.perf_counter()
+        results = tagger.tag_batch(esoa, "text", chunk_size=chunk_size, show_progress=False, deduplicate=False)
+        elapsed = time.perf_counter() - start
+        stats = tagger.helper_memo_stats()["molecule_signature"]
+    finally:
+        tagger.close()
+    return results, elapsed, stats
+
+
+def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare eSOA tagging with and without molecule-signature memoization.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--esoa", type=Path, default=DEFAULT_ESOA, help="eSOA CSV to read descriptions from.")
+    parser.add_argument("--outputs", type=Path, default=OUTPUTS_DIR, help="Directory with unified_* reference files.")
+    parser.add_argument("--limit", type=int, default=0, help="Maximum number of eSOA rows (0 = all).")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows per tagging chunk.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    args = parse_args(argv)
+    if not args.esoa.exists():
+        print(f"{args.esoa} not found")
+        return 1
+    esoa = load_esoa(args.esoa, args.limit)
+    esoa = esoa.drop_duplicates("text", ignore_index=True)
+    print(f"Distinct descriptions: {len(esoa):,}")
+
+    baseline, baseline_seconds, _ = tag(esoa, args.outputs, args.chunk_size, resolution_cache_size=0)
+    memoized, memo_seconds, stats = tag(esoa, args.outputs, args.chunk_size, resolution_cache_size=len(esoa))
+    print(f"Distinct molecule signatures: {stats['misses']:,} ({stats['hits']:,} descriptions reused one)")
+    print(f"Per description: {baseline_seconds:.2f}s  Per signature: {memo_seconds:.2f}s")
+
+    differs = ~((baseline == memoized) | (baseline.isna() & memoized.isna())).all(axis=1)
+    if differs.any():
+        print(f"\n{int(differs.sum()):,} rows differ, e.g.:")
+        print(pd.concat([baseline[differs].head(5), memoized[differs].head(5)], keys=["per description", "per signature"]))
+        return 1
+    print("Results are identical.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
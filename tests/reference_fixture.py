@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Minimal unified_* reference tables shared by the tagger test suites."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+
+
+def write_reference_tables(outputs_dir: Path, generics: List[str]) -> None:
+    """
+    Write unified_generics.csv and unified_atc.csv for generics, one DrugBank
+    id (DB00000, DB00001, ...) and ATC code (X01AA00, X01AA01, ...) each.
+    """
+    ids = [f"DB{i:05d}" for i in range(len(generics))]
+    pd.DataFrame({"drugbank_id": ids, "generic_name": generics, "source": "drugbank"}).to_csv(
+        outputs_dir / "unified_generics.csv", index=False)
+    pd.DataFrame({"drugbank_id": ids, "generic_name": generics,
+                  "atc_code": [f"X01AA{i:02d}" for i in range(len(generics))]}).to_csv(
+        outputs_dir / "unified_atc.csv", index=False)
+
+
+class ReferenceTablesTestCase(unittest.TestCase):
+    """Writes GENERICS as reference tables into cls.outputs_dir for the class."""
+
+    GENERICS: List[str] = []
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.outputs_dir = Path(cls._tmp.name)
+        write_reference_tables(cls.outputs_dir, cls.GENERICS)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._tmp.cleanup()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for precomputed candidate features in scoring.select_best_candidate."""
+
+from __future__ import annotations
+
+import unittest
+
+from pipelines.drugs.scripts.scoring import candidate_features, generics_match, select_best_candidate
+
+
+SYNONYMS = {"PARACETAMOL": "ACETAMINOPHEN", "CLAVULANATE": "CLAVULANIC ACID"}
+
+
+def apply_synonyms(generic: str) -> str:
+    return SYNONYMS.get(generic.upper(), generic.upper())
+
+
+def _candidate(generic, atc, reference=None):
+    return {"generic_name": generic, "atc_code": atc, "reference_text": reference or generic,
+            "source": "drugbank", "form": None, "route": None, "doses": None}
+
+
+class CandidateFeaturesTests(unittest.TestCase):
+    def test_combination_parts_are_normalized(self) -> None:
+        features = candidate_features(_candidate("Amoxicillin and Clavulanate", "J01CR02"), apply_synonyms)
+        self.assertTrue(features.is_combo)
+        self.assertEqual(features.parts_normalized, {"AMOXICILLIN", "CLAVULANIC ACID"})
+        self.assertTrue(candidate_features(_candidate("X", "C09DA01"), apply_synonyms).atc_is_combo)
+
+    def test_subtype_split(self) -> None:
+        features = candidate_features(_candidate("VITAMIN INTRAVENOUS, FAT-SOLUBLE", "B05XC"), apply_synonyms)
+        self.assertEqual((features.base, features.subtype), ("VITAMIN INTRAVENOUS", "FAT-SOLUBLE"))
+        self.assertEqual(generics_match({"VITAMIN INTRAVENOUS, FAT-SOLUBLE"}, features.generic, apply_synonyms),
+                         (True, "exact_with_subtype"))
+
+
+class SelectBestCandidateTests(unittest.TestCase):
+    def _select(self, candidates, generics, **kwargs):
+        return select_best_candidate(
+            candidates=candidates,
+            input_tokens=[],
+            input_categories={},
+            input_generics_normalized=generics,
+            is_single_drug=len(generics) == 1,
+            is_combination=kwargs.pop("is_combination", False),
+            is_iv_solution=False,
+            stripped_generics=sorted(generics),
+            apply_synonyms_fn=apply_synonyms,
+            **kwargs,
+        )
+
+    def test_precomputed_features_give_the_same_choice(self) -> None:
+        candidates = [
+            _candidate("ACETAMINOPHEN + CODEINE", "N02AJ06"),
+            _candidate("ACETAMINOPHEN", "N02BE51"),
+            _candidate("ACETAMINOPHEN", "N02BE01", "ACETAMINOPHEN MR TABLET"),
+        ]
+        precomputed = [dict(c, _features=candidate_features(c, apply_synonyms)) for c in candidates]
+        details = {"release_details": "MR"}
+        best = self._select(candidates, {"PARACETAMOL"}, input_details=details)
+        self.assertEqual(best["atc_code"], "N02BE01")
+        self.assertEqual(self._select(precomputed, {"PARACETAMOL"}, input_details=details)["atc_code"], "N02BE01")
+
+    def test_ties_keep_input_order(self) -> None:
+        first, second = _candidate("IBUPROFEN", "M01AE01"), _candidate("IBUPROFEN", "M01AE01")
+        self.assertIs(self._select([first, second], {"IBUPROFEN"}), first)
+
+    def test_combination_requires_combo_candidate(self) -> None:
+        candidates = [_candidate("AMOXICILLIN", "J01CA04"), _candidate("AMOXICILLIN + CLAVULANIC ACID", "J01CR02")]
+        best = self._select(candidates, {"AMOXICILLIN", "CLAVULANIC ACID"}, is_combination=True)
+        self.assertEqual(best["atc_code"], "J01CR02")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Equivalence tests for canonical deduplication in UnifiedTagger.tag_batch."""
+
+from __future__ import annotations
+
+import random
+import re
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from pipelines.drugs.scripts.tagger import UnifiedTagger
+from pipelines.drugs.scripts.tokenizer import canonicalize_description
+from tests.reference_fixture import ReferenceTablesTestCase
+
+
+GENERICS = [
+    "PARACETAMOL", "AMOXICILLIN", "CLAVULANIC ACID", "IBUPROFEN", "METFORMIN",
+    "AMLODIPINE", "SODIUM CHLORIDE", "SALBUTAMOL", "IPRATROPIUM", "LOSARTAN POTASSIUM",
+    "HEPATITIS B VACCINE", "CEFUROXIME", "ASCORBIC ACID", "ZINC", "ZINC SULFATE",
+]
+
+DESCRIPTIONS = [
+    "PARACETAMOL 500 MG TABLET",
+    "paracetamol 500 mg tab.",
+    "AMOXICILLIN + CLAVULANIC ACID 625MG TABLET",
+    "AMOXICILLIN+CLAVULANIC ACID 625 MG TAB",
+    "ASCORBIC ACID + ZINC 500 MG/10 MG",
+    "PARACETMOL 250MG/5ML SYRUP",
+    "IBUPROFEN 200 MG/5 ML SUSPENSION",
+    "ZINC SULFATE 20 MG/5 ML SYRUP",
+    "SODIUM CHLORIDE 0.9% 1L IV SOLUTION",
+    "SODIUM CHLORIDE 0.9 % 1 L",
+    "SALBUTAMOL+IPRATROPIUM NEBULE",
+    "LOSARTAN POTASSIUM 50 MG FILM COATED TABLET",
+    "HEPATITIS B VACCINE 10MCG/0.5ML",
+    "HEPATITIS  B  VACCINE",
+    "AMLODIPINE 5MG TAB (Norvasc)",
+    "CEFUROXIME 750MG VIAL IM/IV",
+    "METFORMIN 500 mg ER tab.",
+    "XYZZY 10 MG",
+]
+
+
+def _spellings(text: str) -> list:
+    """Near-duplicate spellings of text (case, spacing, units, trailing period)."""
+    outside, _, paren = text.partition("(")
+    paren = f"({paren}" if paren else ""
+    return [
+        outside.lower() + paren,
+        outside.title() + paren,
+        text.replace(" ", "   "),
+        text.replace(" ", "\t"),
+        re.sub(r"(\d)\s*(MG|ML|MCG|G)\b", r"\1 \2", text, flags=re.IGNORECASE),
+        re.sub(r"(\d)\s+(MG|ML|MCG|G)\b", r"\1\2", text, flags=re.IGNORECASE),
+        text + ".",
+        text.replace("+", " + "),
+        text.replace("(", "( ").replace(")", " )"),
+    ]
+
+
+def _padded(text: str, rng: random.Random) -> str:
+    """text with random leading and trailing whitespace."""
+    return rng.choice(["", " ", "  ", "\t"]) + text + rng.choice([" ", "\t", " \n", "   "])
+
+
+class CanonicalizeDescriptionTests(unittest.TestCase):
+    def test_idempotent(self) -> None:
+        rng = random.Random(3)
+        for text in DESCRIPTIONS:
+            for variant in _spellings(text):
+                once = canonicalize_description(_padded(variant, rng))
+                self.assertEqual(canonicalize_description(once), once, variant)
+
+    def test_only_outer_whitespace_is_folded(self) -> None:
+        rng = random.Random(5)
+        for text in DESCRIPTIONS:
+            self.assertEqual(canonicalize_description(_padded(text, rng)), text)
+            for variant in _spellings(text):
+                self.assertEqual(canonicalize_description(variant) == text, variant == text, variant)
+
+
+class CanonicalDedupTaggingTests(ReferenceTablesTestCase):
+    GENERICS = GENERICS
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.tagger = UnifiedTagger(outputs_dir=cls.outputs_dir)
+        cls.tagger.load()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.tagger.close()
+        super().tearDownClass()
+
+    def test_dedup_matches_tagging_each_raw_text(self) -> None:
+        rng = random.Random(11)
+        texts = [v for text in DESCRIPTIONS for v in [text] + _spellings(text)]
+        texts += [_padded(rng.choice(texts), rng) for _ in range(len(texts))]
+        rng.shuffle(texts)
+        unique_texts = list(dict.fromkeys(texts))
+
+        tagged: list = []
+        tag_batch = UnifiedTagger._tag_batch
+
+        def record(tagger: UnifiedTagger, batch: list, ids: list):
+            tagged.extend(batch)
+            return tag_batch(tagger, batch, ids)
+
+        with mock.patch.object(UnifiedTagger, "_tag_batch", autospec=True, side_effect=record):
+            results = self.tagger.tag_batch(
+                pd.DataFrame({"desc": texts}), "desc", chunk_size=7, show_progress=False,
+            )
+        self.assertEqual(len(tagged), len({t.strip() for t in unique_texts}))
+        self.assertLess(len(tagged), len(unique_texts))
+        self.assertEqual(results["input_text"].tolist(), unique_texts)
+
+        # Every raw text tagged on its own, exactly as given
+        for row in results.to_dict("records"):
+            expected = self.tagger.tag_single(row["input_text"])
+            for column in results.columns.drop(["id", "row_idx"]):
+                self.assertEqual(
+                    pd.Series([row[column]]).to_json(),
+                    pd.Series([expected[column]]).to_json(),
+                    (row["input_text"], column),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
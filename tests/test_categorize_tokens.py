@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the precomputed token-category table behind tokenizer.categorize_tokens."""
+
+from __future__ import annotations
+
+import unittest
+
+from pipelines.drugs.scripts.tokenizer import categorize_tokens
+
+
+class CategorizeTokensTests(unittest.TestCase):
+    def test_categories_and_canonical_values(self) -> None:
+        categories = categorize_tokens(["PARACETAMOL", "500MG", "500", "tab", "ORAL", "SODIUM", "GENERIC", "*X"])
+        self.assertEqual(categories["generic"], {"PARACETAMOL": 1})
+        self.assertEqual(categories["dose"], {"500MG": 1, "500": 1})
+        self.assertEqual(categories["salt"], {"SODIUM": 1})
+        self.assertEqual(categories["other"], {"GENERIC": 1, "*X": 1})
+        self.assertEqual(len(categories["form"]), 1)
+        self.assertEqual(len(categories["route"]), 1)
+
+    def test_element_drug_is_generic_only_as_first_token(self) -> None:
+        self.assertEqual(categorize_tokens(["ZINC", "SULFATE"])["generic"], {"ZINC": 1})
+        self.assertEqual(categorize_tokens(["GLUCONATE", "ZINC"])["salt"], {"GLUCONATE": 1, "ZINC": 1})
+        # Repeats of the first token count as the main drug as well
+        self.assertEqual(categorize_tokens(["ZINC", "ZINC"])["generic"], {"ZINC": 2})
+
+    def test_repeated_calls_are_stable(self) -> None:
+        tokens = ["AMOXICILLIN", "250MG", "CAPSULE"]
+        self.assertEqual(categorize_tokens(tokens), categorize_tokens(list(tokens)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Equivalence tests for the batched fuzzy matcher."""
+
+from __future__ import annotations
+
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from pipelines.drugs.scripts.fuzzy import RAPIDFUZZ_AVAILABLE, FuzzyMatcher
+from pipelines.drugs.scripts.tagger import UnifiedTagger
+
+if RAPIDFUZZ_AVAILABLE:
+    from rapidfuzz import fuzz, process
+
+
+@unittest.skipUnless(RAPIDFUZZ_AVAILABLE, "rapidfuzz not installed")
+class FuzzyMatcherTests(unittest.TestCase):
+    NAMES = [
+        "PARACETAMOL", "AMOXICILLIN", "IBUPROFEN", "METFORMIN", "AMLODIPINE",
+        "ACETYLSALICYLIC ACID", "CLAVULANIC ACID", "SODIUM CHLORIDE",
+        "POTASSIUM CHLORIDE", "ABCE", "ABCF", "ABCD",
+    ]
+
+    def assertMatchesExtract(self, names, queries, threshold=85) -> None:
+        matcher = FuzzyMatcher(names, threshold=threshold)
+        got = matcher.best_many(queries)
+        for query in queries:
+            hits = process.extract(query, names, scorer=fuzz.ratio, limit=1, score_cutoff=threshold)
+            expected = (hits[0][0], hits[0][1]) if hits else None
+            self.assertEqual(got.get(query), expected, query)
+
+    def test_misspellings(self) -> None:
+        self.assertMatchesExtract(
+            self.NAMES,
+            ["PARACETMOL", "AMOXICILIN", "IBUPROFIN", "METFORMINE", "XYZZYDRUG", "SODIUM CHLORID"],
+        )
+
+    def test_ties_resolve_to_earliest_name(self) -> None:
+        self.assertMatchesExtract(self.NAMES, ["ABCX"], threshold=70)
+
+    def test_randomized_equivalence(self) -> None:
+        rng = random.Random(7)
+        alphabet = "ABCDEILMNOPRSTU -"
+        names = list(dict.fromkeys(
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(3, 18)))
+            for _ in range(2000)
+        ))
+        queries = []
+        for _ in range(300):
+            chars = list(rng.choice(names))
+            for _ in range(rng.randint(0, 2)):
+                chars.insert(rng.randrange(len(chars) + 1), rng.choice(alphabet))
+            queries.append("".join(chars))
+        self.assertMatchesExtract(names, queries)
+
+    def test_stats_count_skipped_comparisons(self) -> None:
+        matcher = FuzzyMatcher(self.NAMES)
+        matcher.best_many(["PARACETMOL"])
+        stats = matcher.stats()
+        self.assertEqual(stats["queries"], 1)
+        self.assertEqual(stats["comparisons"] + stats["skipped_comparisons"], len(self.NAMES))
+        self.assertGreater(stats["skipped_comparisons"], 0)
+
+
+class TaggerFuzzyMatcherTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._tmp = tempfile.TemporaryDirectory()
+        out = Path(cls._tmp.name)
+        pd.DataFrame({"drugbank_id": ["DB00001"], "generic_name": ["PARACETAMOL"], "source": "drugbank"}).to_csv(
+            out / "unified_generics.csv", index=False)
+        cls.tagger = UnifiedTagger(outputs_dir=out)
+        cls.tagger.load()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.tagger.close()
+        cls._tmp.cleanup()
+
+    def test_generic_list_setter_rebuilds_fuzzy_matcher(self) -> None:
+        tagger = self.tagger
+        tagger.cached_generics_list = ["PARACETAMOL"]
+        matcher = tagger.fuzzy_matcher
+        tagger.lookup_cache.put_many({}, {"PARACETMOL"})
+        tagger.cached_generics_list = ["PARACETAMOL", "IBUPROFEN"]
+        self.assertIsNot(tagger.fuzzy_matcher, matcher)
+        self.assertEqual(tagger.lookup_cache.stats()["size"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
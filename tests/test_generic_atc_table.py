@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the materialized unified_generic_atc join in reference_store."""
+
+from __future__ import annotations
+
+import unittest
+
+import duckdb
+
+from pipelines.drugs.scripts.reference_store import GENERIC_ATC_TABLE, create_generic_atc_table
+
+
+UNIFIED = [("PARACETAMOL", "DB00316", "drugbank"), ("Paracetamol", "DB00316", "pnf"), ("IBUPROFEN", "DB01050", "drugbank")]
+ATC = [("PARACETAMOL", "N02BE51"), ("PARACETAMOL", "N02BE01"), ("IBUPROFEN", "M01AE01"), ("Paracetamol", None)]
+
+
+def _build(unified, atc) -> list:
+    con = duckdb.connect(":memory:")
+    con.execute("CREATE TABLE unified (generic_name VARCHAR, drugbank_id VARCHAR, source VARCHAR)")
+    con.execute("CREATE TABLE atc (generic_name VARCHAR, atc_code VARCHAR)")
+    con.executemany("INSERT INTO unified VALUES (?, ?, ?)", unified)
+    con.executemany("INSERT INTO atc VALUES (?, ?)", atc)
+    create_generic_atc_table(con)
+    rows = con.execute(f"SELECT * FROM {GENERIC_ATC_TABLE} ORDER BY name_key, seq").fetchall()
+    con.close()
+    return rows
+
+
+class GenericAtcTableTests(unittest.TestCase):
+    def test_seq_does_not_depend_on_source_row_order(self) -> None:
+        rows = _build(UNIFIED, ATC)
+        self.assertEqual(rows, _build(UNIFIED[::-1], ATC[::-1]))
+        paracetamol = [(row[1], row[3]) for row in rows if row[0] == "PARACETAMOL"]
+        self.assertEqual(paracetamol, [("PARACETAMOL", "N02BE01"), ("PARACETAMOL", "N02BE51"), ("Paracetamol", None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
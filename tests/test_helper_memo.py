@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the memoized string helpers and their invalidation in UnifiedTagger."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from pipelines.drugs.scripts.lookup import build_combination_keys
+from pipelines.drugs.scripts.tagger import UnifiedTagger
+from pipelines.drugs.scripts.tokenizer import strip_salt_suffix
+
+
+class MemoizedHelperTests(unittest.TestCase):
+    def test_combination_keys_are_fresh_lists(self) -> None:
+        keys = build_combination_keys(["IBUPROFEN+PARACETAMOL"])
+        keys.append("MUTATED")
+        again = build_combination_keys(["IBUPROFEN+PARACETAMOL"])
+        self.assertNotIn("MUTATED", again)
+        self.assertIn("IBUPROFEN + PARACETAMOL", again)
+        self.assertEqual(build_combination_keys(["IBUPROFEN"]), [])
+
+    def test_custom_salt_suffixes_bypass_memo(self) -> None:
+        self.assertEqual(strip_salt_suffix("LOSARTAN POTASSIUM"), ("LOSARTAN", "POTASSIUM"))
+        self.assertEqual(strip_salt_suffix("LOSARTAN POTASSIUM", {"SODIUM"}), ("LOSARTAN POTASSIUM", None))
+
+
+class TaggerMemoInvalidationTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._tmp = tempfile.TemporaryDirectory()
+        out = Path(cls._tmp.name)
+        pd.DataFrame({"drugbank_id": ["DB00001"], "generic_name": ["PARACETAMOL"], "source": "drugbank"}).to_csv(
+            out / "unified_generics.csv", index=False)
+        cls.tagger = UnifiedTagger(outputs_dir=out)
+        cls.tagger.load()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.tagger.close()
+        cls._tmp.cleanup()
+
+    def test_setters_clear_memos(self) -> None:
+        tagger = self.tagger
+        tagger.synonyms = {"APAP": "PARACETAMOL"}
+        tagger.brand_map = {"BIOGESIC": "PARACETAMOL"}
+        self.assertEqual(tagger._apply_synonyms("APAP"), "PARACETAMOL")
+        self.assertEqual(tagger._swap_brand("BIOGESIC"), ("PARACETAMOL", True))
+        self.assertEqual(tagger.helper_memo_stats()["apply_synonym"]["size"], 1)
+
+        tagger.synonyms = {"APAP": "ACETAMINOPHEN"}
+        tagger.brand_map = {}
+        self.assertEqual(tagger._apply_synonyms("APAP"), "ACETAMINOPHEN")
+        self.assertEqual(tagger._swap_brand("BIOGESIC"), ("BIOGESIC", False))
+
+    def test_generic_resolution_table_follows_setters(self) -> None:
+        tagger = self.tagger
+        tagger.synonyms = {"APAP": "PARACETAMOL"}
+        self.assertEqual(tagger._resolve_generic("APAP"), ("APAP", "PARACETAMOL"))
+        self.assertEqual(tagger.helper_memo_stats()["resolve_generic"]["size"], 0)
+        for surface, resolved in tagger.generic_resolution.items():
+            self.assertEqual(resolved, tagger._resolve_generic_uncached(surface), surface)
+
+        tagger.synonyms = {"APAP": "ACETAMINOPHEN"}
+        self.assertEqual(tagger._resolve_generic("APAP"), ("APAP", "ACETAMINOPHEN"))
+        # Tokens outside the reference data fall back to the memo
+        self.assertEqual(tagger._resolve_generic("BIOGESIC"), ("BIOGESIC", "BIOGESIC"))
+        self.assertEqual(tagger.helper_memo_stats()["resolve_generic"]["size"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
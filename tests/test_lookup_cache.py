@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the cross-chunk generic lookup cache."""
+
+from __future__ import annotations
+
+import unittest
+
+from pipelines.drugs.scripts.lookup import GenericLookupCache
+
+
+class GenericLookupCacheTests(unittest.TestCase):
+    def test_misses_are_cached_as_negative_entries(self) -> None:
+        cache = GenericLookupCache()
+        found, missing = cache.get_many({"paracetamol", "XYZZY"})
+        self.assertEqual(found, {})
+        self.assertEqual(missing, {"PARACETAMOL", "XYZZY"})
+
+        cache.put_many({"PARACETAMOL": [{"generic_name": "PARACETAMOL"}]}, missing)
+        found, missing = cache.get_many({"PARACETAMOL", "XYZZY"})
+        self.assertEqual(missing, set())
+        self.assertEqual(found["XYZZY"], [])
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["negative_hits"], stats["misses"]), (2, 1, 2))
+        self.assertEqual(stats["negative_entries"], 1)
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache = GenericLookupCache(max_size=2)
+        cache.put_many({}, {"A"})
+        cache.put_many({}, {"B"})
+        cache.get_many({"A"})
+        cache.put_many({}, {"C"})
+        self.assertIn("A", cache)
+        self.assertNotIn("B", cache)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_zero_size_disables_caching(self) -> None:
+        cache = GenericLookupCache(max_size=0)
+        cache.put_many({}, {"A"})
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
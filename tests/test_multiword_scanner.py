@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the multiword generic scanner used by extract_generic_tokens."""
+
+from __future__ import annotations
+
+import random
+import unittest
+
+from pipelines.drugs.scripts.tokenizer import (
+    AHOCORASICK_AVAILABLE, MultiwordScanner, extract_generic_tokens, normalize_tokens,
+    split_with_parentheses,
+)
+
+
+MULTIWORDS = {
+    "SODIUM CHLORIDE", "LOSARTAN POTASSIUM", "CLAVULANIC ACID", "ASCORBIC ACID",
+    "DEXAMETHASONE SODIUM PHOSPHATE", "SODIUM PHOSPHATE", "AX Y", "X YB", "A B",
+}
+
+WORDS = sorted(MULTIWORDS) + [
+    "PARACETAMOL", "500MG", "TAB", "(as", ")", "+", "IN", "5%", "DEXTROSE", "AX", "YB",
+    "A", "B", "X", "Y", "DEXAMETHASONE", "SODIUM", "PHOSPHATE", "ACID",
+]
+
+
+class MultiwordScannerTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        rng = random.Random(7)
+        cls.texts = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 7)))
+            for _ in range(2000)
+        ] + ["AX YB 10MG", "5% DEXTROSE IN 0.9% SODIUM CHLORIDE", "LOSARTAN (as LOSARTAN POTASSIUM) 50MG"]
+
+    @unittest.skipUnless(AHOCORASICK_AVAILABLE, "pyahocorasick not installed")
+    def test_automaton_matches_linear_scan(self) -> None:
+        automaton = MultiwordScanner(MULTIWORDS)
+        linear = MultiwordScanner(MULTIWORDS, use_automaton=False)
+        for text in self.texts:
+            self.assertEqual(automaton.find(text), linear.find(text), text)
+
+    def test_scanner_matches_plain_set(self) -> None:
+        scanner = MultiwordScanner(MULTIWORDS)
+        for text in self.texts:
+            self.assertEqual(
+                extract_generic_tokens(text, scanner),
+                extract_generic_tokens(text, MULTIWORDS),
+                text,
+            )
+
+    def test_replacement_can_join_multiwords(self) -> None:
+        # Removing "AX Y" from "AAX YB B" leaves "A B", which is matched as before
+        tokens = normalize_tokens(["AAX", "YB", "B"], multiword_generics=MultiwordScanner({"AX Y", "A B"}))
+        self.assertEqual(tokens[:2], ["AX Y", "A B"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests that forked tag_batch workers give the same results as serial tagging."""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from pipelines.drugs.scripts.reference_store import write_reference_db
+from pipelines.drugs.scripts.tagger import UnifiedTagger
+from tests.reference_fixture import ReferenceTablesTestCase
+
+
+GENERICS = ["PARACETAMOL", "AMOXICILLIN", "CLAVULANIC ACID", "IBUPROFEN", "SODIUM CHLORIDE", "METFORMIN"]
+
+DESCRIPTIONS = [
+    f"{text} #{k}" for k in range(40) for text in [
+        "PARACETAMOL 500 MG TABLET",
+        "AMOXICILLIN + CLAVULANIC ACID 625MG TABLET",
+        "PARACETMOL 250MG/5ML SYRUP",
+        "IBUPROFEN 200 MG/5 ML SUSPENSION",
+        "SODIUM CHLORIDE 0.9% 1L IV SOLUTION",
+        "METFORMIN 500 mg ER tab.",
+        "XYZZY 10 MG",
+    ]
+]
+
+
+@unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "fork not available")
+class ParallelTaggingTests(ReferenceTablesTestCase):
+    GENERICS = GENERICS
+
+    def _tag(self, workers: int) -> pd.DataFrame:
+        tagger = UnifiedTagger(outputs_dir=self.outputs_dir)
+        tagger.load()
+        # Report enough CPUs for workers > 1 to take effect on small machines
+        with mock.patch("pipelines.drugs.scripts.concurrency._available_cpus", return_value=4), \
+                mock.patch.dict(os.environ, {"ESOA_MAX_WORKERS": ""}), \
+                mock.patch.object(UnifiedTagger, "_tag_chunks_parallel", autospec=True,
+                                  side_effect=UnifiedTagger._tag_chunks_parallel) as parallel:
+            try:
+                results = tagger.tag_batch(pd.DataFrame({"desc": DESCRIPTIONS}), "desc",
+                                           chunk_size=50, show_progress=False, workers=workers)
+            finally:
+                tagger.close()
+        self.assertEqual(parallel.called, workers > 1)
+        return results
+
+    def test_in_memory_tables(self) -> None:
+        self.assertTrue(self._tag(workers=2).equals(self._tag(workers=1)))
+
+    def test_reference_database(self) -> None:
+        tables = {name: pd.read_csv(self.outputs_dir / f"{name}.csv") for name in ("unified_generics", "unified_atc")}
+        db_path = write_reference_db(tables, self.outputs_dir, verbose=False)
+        try:
+            self.assertTrue(self._tag(workers=2).equals(self._tag(workers=1)))
+        finally:
+            db_path.unlink()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the persistent tagging result cache."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import duckdb
+import numpy as np
+
+from pipelines.drugs.scripts.result_cache import TagResultCache
+
+FIELDS = ["id", "input_text", "row_idx", "match_score", "dose_values", "total_volume_ml"]
+
+
+class TagResultCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "cache.duckdb"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    @staticmethod
+    def _columns(*rows: dict) -> dict:
+        return {field: [row.get(field) for row in rows] for field in FIELDS}
+
+    def test_round_trip_across_instances(self) -> None:
+        result = {"id": 0, "input_text": "PARACETAMOL 500 MG", "row_idx": 0, "match_score": 1,
+                  "dose_values": [500.0], "total_volume_ml": None}
+        cache = TagResultCache(self.path, "ref-a", FIELDS, code_version="code-1")
+        cache.put_many(self._columns(result))
+        cache.close()
+
+        cache = TagResultCache(self.path, "ref-a", FIELDS, code_version="code-1")
+        self.assertEqual(cache.get_many(["PARACETAMOL 500 MG", "XYZZY"]), {"PARACETAMOL 500 MG": result})
+        cache.close()
+
+    def test_results_are_stored_as_json(self) -> None:
+        cache = TagResultCache(self.path, "ref-a", FIELDS, code_version="code-1")
+        cache.put_many(self._columns({"input_text": "A", "match_score": np.int64(3), "total_volume_ml": float("nan")}))
+        cache.close()
+
+        with duckdb.connect(str(self.path), read_only=True) as con:
+            (payload,) = con.execute("SELECT result FROM tag_results").fetchone()
+        stored = dict(zip(FIELDS, json.loads(payload)))
+        self.assertEqual(stored["match_score"], 3)
+        self.assertIsInstance(stored["match_score"], int)
+        self.assertNotEqual(stored["total_volume_ml"], stored["total_volume_ml"])
+
+    def test_other_field_order_misses(self) -> None:
+        cache = TagResultCache(self.path, "ref-a", FIELDS, code_version="code-1")
+        cache.put_many(self._columns({"input_text": "A"}))
+        cache.close()
+
+        cache = TagResultCache(self.path, "ref-a", FIELDS[::-1], code_version="code-1")
+        self.assertEqual(cache.get_many(["A"]), {})
+        cache.close()
+
+    def test_other_fingerprints_miss_and_are_pruned(self) -> None:
+        cache = TagResultCache(self.path, "ref-a", FIELDS, code_version="code-1")
+        cache.put_many(self._columns({"input_text": "A"}))
+        cache.close()
+
+        cache = TagResultCache(self.path, "ref-b", FIELDS, code_version="code-1")
+        self.assertEqual(cache.get_many(["A"]), {})
+        cache.put_many(self._columns({"input_text": "B"}))
+        cache.close()
+
+        cache = TagResultCache(self.path, "ref-a", FIELDS, code_version="code-1")
+        self.assertEqual(cache.get_many(["A"]), {})
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
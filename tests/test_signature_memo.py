@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for sharing generic/ATC resolution between descriptions with one molecule signature."""
+
+from __future__ import annotations
+
+import unittest
+
+import pandas as pd
+
+from pipelines.drugs.scripts.tagger import UnifiedTagger
+from tests.reference_fixture import ReferenceTablesTestCase
+
+
+GENERICS = ["AMOXICILLIN", "CLAVULANIC ACID", "PARACETAMOL", "IBUPROFEN"]
+
+DESCRIPTIONS = [
+    "AMOXICILLIN 500MG CAP",
+    "AMOXICILLIN 250MG CAP",
+    "AMOXICILLIN 250MG/5ML SUSPENSION",
+    "AMOXICILLIN + CLAVULANIC ACID 625MG TABLET",
+    "AMOXICILLIN + CLAVULANIC ACID 1G TABLET",
+    "PARACETAMOL 500 MG TABLET",
+    "PARACETAMOL 325 MG TABLET",
+    "IBUPROFEN 200 MG TABLET",
+    "XYZZY 10 MG",
+    "XYZZY 20 MG",
+]
+
+
+class SignatureMemoTests(ReferenceTablesTestCase):
+    GENERICS = GENERICS
+
+    def _tag(self, resolution_cache_size: int) -> tuple:
+        tagger = UnifiedTagger(outputs_dir=self.outputs_dir, resolution_cache_size=resolution_cache_size)
+        tagger.load()
+        try:
+            results = tagger.tag_batch(pd.DataFrame({"desc": DESCRIPTIONS}), "desc",
+                                       chunk_size=4, show_progress=False, deduplicate=False)
+        finally:
+            tagger.close()
+        return results, tagger.helper_memo_stats()["molecule_signature"]
+
+    def test_dose_variants_share_resolution(self) -> None:
+        baseline, off_stats = self._tag(resolution_cache_size=0)
+        memoized, stats = self._tag(resolution_cache_size=100)
+        self.assertTrue(baseline.equals(memoized))
+        self.assertEqual(off_stats["hits"] + off_stats["misses"], 0)
+        # Strength variants reuse a resolution; the suspension has its own form
+        self.assertGreaterEqual(stats["hits"], 4)
+        self.assertEqual(stats["hits"] + stats["misses"], len(DESCRIPTIONS))
+        amoxicillin = memoized[memoized["input_text"].str.startswith("AMOXICILLIN 2")]
+        self.assertEqual(amoxicillin["dose"].nunique(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
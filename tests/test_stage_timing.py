@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for per-stage timing in UnifiedTagger.tag_batch."""
+
+from __future__ import annotations
+
+import unittest
+
+import pandas as pd
+
+from pipelines.drugs.scripts.stage_timing import StageTimer
+from pipelines.drugs.scripts.tagger import UnifiedTagger
+from tests.reference_fixture import ReferenceTablesTestCase
+
+
+GENERICS = ["PARACETAMOL", "AMOXICILLIN", "CLAVULANIC ACID", "IBUPROFEN", "SODIUM CHLORIDE"]
+
+DESCRIPTIONS = [
+    "PARACETAMOL 500 MG TABLET",
+    "AMOXICILLIN + CLAVULANIC ACID 625MG TABLET",
+    "IBUPROFEN 200 MG/5 ML SUSPENSION",
+    "SODIUM CHLORIDE 0.9% 1L IV SOLUTION",
+    "HEPATITIS B VACCINE 10MCG/0.5ML",
+    "XYZZY 10 MG",
+] * 3
+
+
+class StageTimerTests(unittest.TestCase):
+    def test_disabled_timer_records_nothing(self) -> None:
+        timer = StageTimer(enabled=False)
+        timer.add("details", timer.clock() - timer.clock(), 10)
+        self.assertEqual(timer.stats(), {})
+        self.assertEqual(timer.table(), [])
+
+    def test_merge_sums_stages(self) -> None:
+        a, b = StageTimer(), StageTimer()
+        a.add("details", 1.0, 10)
+        b.add("details", 0.5, 5)
+        b.add("lookup", 0.5, 2)
+        a.merge(b)
+        self.assertEqual(a.seconds, {"details": 1.5, "lookup": 0.5})
+        self.assertEqual(a.counts, {"details": 15, "lookup": 2})
+        self.assertAlmostEqual(a.stats()["details"]["pct"], 75.0)
+
+
+class TagBatchStageTimingTests(ReferenceTablesTestCase):
+    GENERICS = GENERICS
+
+    def _tag(self, profile_stages: bool, workers: int = 1) -> tuple:
+        tagger = UnifiedTagger(outputs_dir=self.outputs_dir, profile_stages=profile_stages)
+        tagger.load()
+        try:
+            results = tagger.tag_batch(
+                pd.DataFrame({"desc": DESCRIPTIONS}), "desc",
+                chunk_size=2, show_progress=False, workers=workers,
+            )
+        finally:
+            tagger.close()
+        return results, tagger.stage_timer
+
+    def test_profiling_does_not_change_results(self) -> None:
+        plain, plain_timer = self._tag(profile_stages=False)
+        profiled, timer = self._tag(profile_stages=True)
+        self.assertTrue(plain.equals(profiled))
+        self.assertEqual(plain_timer.seconds, {})
+        unique = len(set(DESCRIPTIONS))
+        for stage in ("canonicalize", "details", "vaccine", "tokenize", "keys", "lookup", "results", "fan_out"):
+            self.assertIn(stage, timer.seconds)
+        self.assertEqual(timer.counts["details"], unique)
+        self.assertEqual(timer.counts["canonicalize"], unique)
+
+    def test_worker_timings_are_merged(self) -> None:
+        serial, serial_timer = self._tag(profile_stages=True)
+        parallel, timer = self._tag(profile_stages=True, workers=2)
+        self.assertTrue(serial.equals(parallel))
+        self.assertEqual(timer.counts, serial_timer.counts)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for build-time synonym chain resolution in reference_store."""
+
+from __future__ import annotations
+
+import unittest
+
+import duckdb
+
+from pipelines.drugs.scripts.lookup import build_generic_resolution, resolve_generic
+from pipelines.drugs.scripts.reference_store import build_synonym_map, resolve_synonym_chains
+
+
+class ResolveSynonymChainsTests(unittest.TestCase):
+    def test_chains_resolve_to_their_end(self) -> None:
+        resolved, cycles = resolve_synonym_chains({"A": "B", "B": "C", "C": "D", "X": "X"})
+        self.assertEqual(resolved, {"A": "D", "B": "D", "C": "D", "X": "X"})
+        self.assertEqual(cycles, [])
+
+    def test_cycles_are_reported_and_left_direct(self) -> None:
+        resolved, cycles = resolve_synonym_chains({"W": "Z", "Z": "P", "P": "Q", "Q": "P"})
+        self.assertEqual(cycles, [["P", "Q"]])
+        self.assertEqual(resolved, {"W": "P", "Z": "P", "P": "Q", "Q": "P"})
+
+
+class BuildSynonymMapTests(unittest.TestCase):
+    def test_table_synonyms_follow_regional_names(self) -> None:
+        con = duckdb.connect(":memory:")
+        con.execute("CREATE TABLE synonyms (drugbank_id VARCHAR, generic_name VARCHAR, synonyms VARCHAR)")
+        con.execute("INSERT INTO synonyms VALUES ('DB1', 'Paracetamol', 'TYLENOL|APAP'), ('DB2', 'Ibuprofen', 'APAP')")
+        report: dict = {}
+        synonyms = build_synonym_map(con, report)
+        con.close()
+        # PARACETAMOL -> ACETAMINOPHEN (regional) carries TYLENOL along
+        self.assertEqual(synonyms["TYLENOL"], synonyms["PARACETAMOL"])
+        self.assertEqual(synonyms["APAP"], "IBUPROFEN")
+        self.assertIn(("APAP", "PARACETAMOL", "IBUPROFEN"), report["conflicts"])
+        self.assertEqual(report["cycles"], [])
+
+
+class GenericResolutionTableTests(unittest.TestCase):
+    def test_table_matches_per_token_resolution(self) -> None:
+        synonyms = {"APAP": "ACETAMINOPHEN", "PARACETAMOL": "ACETAMINOPHEN", "LOSARTAN": "LOSARTAN"}
+        brand_map = {"BIOGESIC": "PARACETAMOL", "COZAAR": "LOSARTAN POTASSIUM"}
+        multiword = {"ISOSORBIDE DINITRATE"}
+        table = build_generic_resolution(
+            ["Paracetamol", "LOSARTAN POTASSIUM", "SODIUM CHLORIDE", "VITAMINS"],
+            synonyms, brand_map, multiword,
+        )
+        self.assertEqual(table["LOSARTAN POTASSIUM"], ("LOSARTAN", "LOSARTAN"))
+        self.assertEqual(table["PARACETAMOL"], ("PARACETAMOL", "ACETAMINOPHEN"))
+        self.assertIn("ISOSORBIDE DINITRATE", table)
+        self.assertNotIn("BIOGESIC", table)
+        for surface, resolved in table.items():
+            self.assertEqual(resolved, resolve_generic(surface, synonyms, multiword), surface)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Streamed tagging (UnifiedTagger.tag_stream and run_esoa_tagging(stream=True))."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from pipelines.drugs.scripts import runners
+from pipelines.drugs.scripts.tagger import UnifiedTagger
+from tests.reference_fixture import ReferenceTablesTestCase, write_reference_tables
+
+GENERICS = ["PARACETAMOL", "AMLODIPINE", "LOSARTAN", "METFORMIN", "SODIUM CHLORIDE"]
+
+DESCRIPTIONS = [
+    "PARACETAMOL 500MG TABLET",
+    "paracetamol 500 mg tab.",
+    "AMLODIPINE 5MG (Norvasc)",
+    "LOSARTAN POTASSIUM 50 MG TABLET",
+    "METFORMIN 500MG",
+    "SODIUM CHLORIDE 0.9 % 1 L",
+    "UNKNOWN SYRUP 60ML",
+    "",
+]
+
+# Repeats within and across stream chunks
+ESOA_TEXTS = [DESCRIPTIONS[(7 * k) % len(DESCRIPTIONS)] for k in range(40)]
+
+
+class TagStreamTests(ReferenceTablesTestCase):
+    GENERICS = GENERICS
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.tagger = UnifiedTagger(outputs_dir=cls.outputs_dir)
+        cls.tagger.load()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.tagger.close()
+        super().tearDownClass()
+
+    def test_concatenated_frames_match_tag_batch(self) -> None:
+        df = pd.DataFrame({"row": range(24), "desc": DESCRIPTIONS * 3})
+        # Batch boundaries on chunk boundaries, so row_idx lines up too
+        batches = [df.iloc[:12], df.iloc[12:]]
+        frames = list(self.tagger.tag_stream(batches, "desc", id_column="row", chunk_size=4, deduplicate=False))
+        self.assertEqual([len(frame) for frame in frames], [4] * 6)
+        expected = self.tagger.tag_batch(
+            df, "desc", id_column="row", chunk_size=4, show_progress=False, deduplicate=False,
+        )
+        # Columns that are all None in a chunk infer a different dtype (and NaN)
+        self.assertEqual(
+            pd.concat(frames, ignore_index=True).to_json(orient="records"),
+            expected.to_json(orient="records"),
+        )
+
+
+class StreamedEsoaTaggingTests(unittest.TestCase):
+    def _run(self, stream: bool) -> pd.DataFrame:
+        with tempfile.TemporaryDirectory() as tmp:
+            outputs_dir = Path(tmp)
+            write_reference_tables(outputs_dir, GENERICS)
+            esoa_path = outputs_dir / "esoa.csv"
+            pd.DataFrame({
+                "ITEM_NUMBER": range(len(ESOA_TEXTS)),
+                "ITEM_DESCRIPTION": ESOA_TEXTS,
+            }).to_csv(esoa_path, index=False)
+            output_path = outputs_dir / "esoa_with_atc.csv"
+            with mock.patch.object(runners, "PIPELINE_OUTPUTS_DIR", outputs_dir), \
+                    mock.patch.object(runners, "PIPELINE_INPUTS_DIR", outputs_dir), \
+                    mock.patch.object(runners, "ESOA_STREAM_ROWS", 6):
+                runners.run_esoa_tagging(
+                    esoa_path=esoa_path, output_path=output_path,
+                    verbose=False, show_progress=False, workers=1, stream=stream,
+                )
+            return pd.read_csv(output_path)
+
+    def test_streamed_output_matches_batch_output(self) -> None:
+        streamed = self._run(stream=True)
+        self.assertEqual(streamed["ITEM_NUMBER"].tolist(), list(range(len(ESOA_TEXTS))))
+        pd.testing.assert_frame_equal(streamed, self._run(stream=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
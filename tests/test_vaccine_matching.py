@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the precompiled vaccine matchers in unified_constants."""
+
+from __future__ import annotations
+
+import unittest
+
+from pipelines.drugs.scripts.unified_constants import (
+    VACCINE_ACRONYM_TO_COMPONENTS, match_vaccine_text, normalize_vaccine_name,
+)
+
+
+class MatchVaccineTextTests(unittest.TestCase):
+    def test_non_vaccine_text(self) -> None:
+        self.assertEqual(match_vaccine_text("PARACETAMOL 500 MG TABLET"), (None, None))
+        self.assertEqual(match_vaccine_text(""), (None, None))
+
+    def test_longest_acronym_wins_anywhere_in_text(self) -> None:
+        # Shorter acronyms (DTP, HIB, HEPA) also occur as words in these texts
+        for text, acronym in [
+            ("DTP-HIB VACCINE", "DTP-HIB"),
+            ("HIB + DTAP-IPV-HIB 0.5 ML", "DTAP-IPV-HIB"),
+            ("HEPA-HEPB VACCINE", "HEPA-HEPB"),
+            ("dtp vaccine", "DTP"),
+        ]:
+            self.assertEqual(
+                match_vaccine_text(text), (acronym, VACCINE_ACRONYM_TO_COMPONENTS[acronym]), text,
+            )
+
+    def test_components_map_to_acronym(self) -> None:
+        self.assertEqual(
+            match_vaccine_text("DIPHTHERIA, TETANUS, PERTUSSIS VACCINE"),
+            ("DTP", ["DIPHTHERIA", "PERTUSSIS", "TETANUS"]),
+        )
+        self.assertEqual(match_vaccine_text("PNEUMOCOCCAL CONJUGATE"), (None, ["PNEUMOCOCCAL"]))
+
+
+class NormalizeVaccineNameTests(unittest.TestCase):
+    def test_literal_and_regex_patterns(self) -> None:
+        # "+" is matched literally; the pentavalent pattern is a regex
+        self.assertEqual(normalize_vaccine_name("HEPATITIS A + B VACCINE")[0], "HEPATITIS A + B VACCINE")
+        self.assertEqual(
+            normalize_vaccine_name("DIPHTHERIA, TETANUS, PERTUSSIS, HEPATITIS B AND HAEMOPHILUS VACCINE")[0],
+            "DTP VACCINE",
+        )
+
+    def test_details(self) -> None:
+        self.assertEqual(
+            normalize_vaccine_name("PNEUMOCOCCAL CONJUGATE VACCINE 13-VALENT"),
+            ("PNEUMOCOCCAL VACCINE", "13-valent"),
+        )
+        self.assertEqual(normalize_vaccine_name("PARACETAMOL 500 MG"), (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()